@@ -19,6 +19,7 @@ DROP VIEW IF EXISTS gtd_tasks_summary CASCADE;
 DROP VIEW IF EXISTS gtd_completion_daily CASCADE;
 DROP VIEW IF EXISTS gtd_completion_weekly CASCADE;
 DROP VIEW IF EXISTS gtd_project_completion_stats CASCADE;
+DROP VIEW IF EXISTS gtd_project_progress CASCADE;
 
 -- Drop any functions/triggers
 DROP TRIGGER IF EXISTS trigger_gtd_users_updated_at ON gtd_users;
@@ -171,6 +172,26 @@ CREATE INDEX idx_gtd_tasks_done_at ON gtd_tasks(done_at);
 CREATE INDEX idx_gtd_tasks_do_today ON gtd_tasks(do_today);
 CREATE INDEX idx_gtd_tasks_do_this_week ON gtd_tasks(do_this_week);
 
+-- Task and project list filters and sort orders (see create_list_query_indexes.sql)
+CREATE INDEX idx_gtd_tasks_user_do_on_date ON gtd_tasks(user_id, do_on_date, id)
+    WHERE deleted_at IS NULL;
+CREATE INDEX idx_gtd_tasks_open_do_on_date ON gtd_tasks(user_id, do_on_date)
+    WHERE deleted_at IS NULL AND done_at IS NULL AND do_on_date IS NOT NULL;
+CREATE INDEX idx_gtd_tasks_user_priority ON gtd_tasks(user_id, priority, id)
+    WHERE deleted_at IS NULL;
+CREATE INDEX idx_gtd_tasks_user_created_desc ON gtd_tasks(user_id, created_at DESC NULLS LAST, id)
+    WHERE deleted_at IS NULL;
+CREATE INDEX idx_gtd_tasks_user_last_edited_desc ON gtd_tasks(user_id, last_edited DESC NULLS LAST, id)
+    WHERE deleted_at IS NULL;
+CREATE INDEX idx_gtd_projects_name ON gtd_projects(project_name, id)
+    WHERE deleted_at IS NULL;
+CREATE INDEX idx_gtd_projects_updated_desc ON gtd_projects(updated_at DESC NULLS LAST, id)
+    WHERE deleted_at IS NULL;
+
+-- ETag change markers (see create_change_marker_function.sql)
+CREATE INDEX idx_gtd_tasks_user_updated_at ON gtd_tasks(user_id, updated_at);
+CREATE INDEX idx_gtd_projects_user_updated_at ON gtd_projects(user_id, updated_at);
+
 -- =========================================
 -- Step 7: Create update triggers
 -- =========================================
@@ -274,6 +295,19 @@ LEFT JOIN gtd_tasks t ON u.id = t.user_id AND t.deleted_at IS NULL
 WHERE u.deleted_at IS NULL
 GROUP BY u.id, u.first_name, u.last_name, u.email_address, u.last_login_at, u.created_at;
 
+-- Task counts per project for the backend's project lists
+-- (see create_project_progress_view.sql)
+CREATE OR REPLACE VIEW gtd_project_progress
+WITH (security_invoker = true) AS
+SELECT
+    project_id,
+    count(*) FILTER (WHERE done_at IS NULL) AS open_tasks,
+    count(*) FILTER (WHERE done_at IS NOT NULL) AS done_tasks,
+    max(GREATEST(last_edited, done_at, created_at)) AS last_activity
+FROM gtd_tasks
+WHERE deleted_at IS NULL AND project_id IS NOT NULL
+GROUP BY project_id;
+
 -- =========================================
 -- Step 9: Insert Johannes Köppern as first user
 -- =========================================
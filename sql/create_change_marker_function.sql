@@ -0,0 +1,38 @@
+-- Change markers for the ETags of the backend's read endpoints
+-- (If-None-Match on /api/tasks/today, /api/projects/active, /api/dashboard/stats, ...)
+-- Run this in the Supabase SQL Editor after the tables exist.
+--
+-- A marker is the row count and the latest updated_at of one user's rows:
+-- updates and soft deletes bump updated_at, inserts and hard deletes change
+-- the count. With the (user_id, updated_at) indexes both come from an
+-- index-only scan of the user's rows instead of an exact count over the table
+-- through PostgREST. Without this function the backend falls back to that
+-- count (and logs a warning).
+
+CREATE INDEX IF NOT EXISTS idx_gtd_tasks_user_updated_at
+    ON gtd_tasks(user_id, updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_gtd_projects_user_updated_at
+    ON gtd_projects(user_id, updated_at);
+
+CREATE OR REPLACE FUNCTION gtd_change_marker(p_table TEXT, p_user_id UUID)
+RETURNS TEXT AS $$
+    SELECT CASE p_table
+        WHEN 'gtd_tasks' THEN (
+            SELECT count(*) || ':' || COALESCE(max(updated_at)::TEXT, '')
+            FROM gtd_tasks WHERE user_id = p_user_id
+        )
+        WHEN 'gtd_projects' THEN (
+            SELECT count(*) || ':' || COALESCE(max(updated_at)::TEXT, '')
+            FROM gtd_projects WHERE user_id = p_user_id
+        )
+    END
+$$ LANGUAGE sql STABLE;
+
+DO $$
+BEGIN
+    -- Supabase's API role (absent on plain Postgres)
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT EXECUTE ON FUNCTION gtd_change_marker(TEXT, UUID) TO service_role;
+    END IF;
+END $$;
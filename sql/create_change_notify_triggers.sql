@@ -0,0 +1,54 @@
+-- Change feed: NOTIFY on every GTD task/project change
+-- Run this in the Supabase SQL Editor after the tables exist.
+--
+-- Backend replicas LISTEN on the 'gtd_changes' channel (fixed, see CHANNEL in
+-- src/backend/app/change_feed.py) to invalidate caches and push updates to clients, no
+-- matter whether the change came from another replica, the ETL scripts or the
+-- SQL editor. LISTEN needs a direct or session-mode pooler connection.
+--
+-- Payload (compact JSON, well below the 8000 byte NOTIFY limit):
+--   {"e":"task","id":123,"u":"<user uuid>","op":"update"}
+-- op is one of insert, update, delete; a soft delete (deleted_at being set)
+-- is reported as delete.
+
+CREATE OR REPLACE FUNCTION notify_gtd_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed RECORD;
+    operation TEXT := lower(TG_OP);
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND NEW.deleted_at IS NOT NULL AND OLD.deleted_at IS NULL THEN
+        operation := 'delete';
+    END IF;
+
+    PERFORM pg_notify(
+        'gtd_changes',
+        json_build_object(
+            'e', TG_ARGV[0],
+            'id', changed.id,
+            'u', changed.user_id,
+            'op', operation
+        )::text
+    );
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_gtd_tasks_notify ON gtd_tasks;
+CREATE TRIGGER trigger_gtd_tasks_notify
+    AFTER INSERT OR UPDATE OR DELETE ON gtd_tasks
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_gtd_change('task');
+
+DROP TRIGGER IF EXISTS trigger_gtd_projects_notify ON gtd_projects;
+CREATE TRIGGER trigger_gtd_projects_notify
+    AFTER INSERT OR UPDATE OR DELETE ON gtd_projects
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_gtd_change('project');
@@ -0,0 +1,51 @@
+-- Indexes for the task and project list filters and sort orders of the
+-- backend (GET /api/tasks, GET /api/projects)
+-- Run this in the Supabase SQL Editor after the tables exist.
+--
+-- Calendar views (due_after / due_before / due_date) and overdue views
+-- (overdue=true: open and due before today) filter one user's tasks by a
+-- do_on_date range. The indexes are partial, so they only hold the rows the
+-- lists can return and stay small: deleted tasks are always left out, and
+-- done and undated tasks, usually the bulk of the table, are left out of the
+-- open-task index.
+--
+-- The sort indexes match the ORDER BY the backend sends for ?sort=: the
+-- column (empty values last), then id. A page of a sorted list is read off
+-- the index and the scan stops after skip + limit rows.
+
+-- Live tasks by due date: date ranges including done tasks, ?sort=due_date
+CREATE INDEX IF NOT EXISTS idx_gtd_tasks_user_do_on_date
+    ON gtd_tasks(user_id, do_on_date, id)
+    WHERE deleted_at IS NULL;
+
+-- Open tasks with a due date: overdue tasks and open tasks in a date range
+CREATE INDEX IF NOT EXISTS idx_gtd_tasks_open_do_on_date
+    ON gtd_tasks(user_id, do_on_date)
+    WHERE deleted_at IS NULL AND done_at IS NULL AND do_on_date IS NOT NULL;
+
+-- ?sort=priority (1 = most important first)
+CREATE INDEX IF NOT EXISTS idx_gtd_tasks_user_priority
+    ON gtd_tasks(user_id, priority, id)
+    WHERE deleted_at IS NULL;
+
+-- ?sort=-created_at (newest first)
+CREATE INDEX IF NOT EXISTS idx_gtd_tasks_user_created_desc
+    ON gtd_tasks(user_id, created_at DESC NULLS LAST, id)
+    WHERE deleted_at IS NULL;
+
+-- ?sort=-last_edited (recently edited first)
+CREATE INDEX IF NOT EXISTS idx_gtd_tasks_user_last_edited_desc
+    ON gtd_tasks(user_id, last_edited DESC NULLS LAST, id)
+    WHERE deleted_at IS NULL;
+
+-- Projects ?sort=name and ?sort=-updated_at
+CREATE INDEX IF NOT EXISTS idx_gtd_projects_name
+    ON gtd_projects(project_name, id)
+    WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_gtd_projects_updated_desc
+    ON gtd_projects(updated_at DESC NULLS LAST, id)
+    WHERE deleted_at IS NULL;
+
+ANALYZE gtd_tasks;
+ANALYZE gtd_projects;
@@ -0,0 +1,89 @@
+-- Project hierarchy: parent project IDs and a closure table of all
+-- ancestor/descendant pairs, for the backend's project tree endpoints
+-- (GET /api/projects/{id}/tree, /api/projects/{id}/tree/tasks).
+-- Run this in the Supabase SQL Editor after the tables exist, then re-run
+-- etl_projects.py, which resolves the Notion "Mother project" relations into
+-- parent_project_id.
+--
+-- gtd_project_closure holds one row per project and each of its ancestors,
+-- including the project itself at depth 0. A subtree is then a single index
+-- range read (ancestor_id = X) instead of a recursive walk. The trigger keeps
+-- the table in sync with parent_project_id on insert and on every re-parenting,
+-- whether done by the ETL, the API or the SQL editor, and rejects cycles.
+
+ALTER TABLE gtd_projects
+    ADD COLUMN IF NOT EXISTS parent_project_id INTEGER REFERENCES gtd_projects(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_gtd_projects_parent_project_id ON gtd_projects(parent_project_id);
+
+CREATE TABLE IF NOT EXISTS gtd_project_closure (
+    ancestor_id INTEGER NOT NULL REFERENCES gtd_projects(id) ON DELETE CASCADE,
+    descendant_id INTEGER NOT NULL REFERENCES gtd_projects(id) ON DELETE CASCADE,
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id)
+);
+
+-- Ancestors of a project (breadcrumbs, moving subtrees)
+CREATE INDEX IF NOT EXISTS idx_gtd_project_closure_descendant ON gtd_project_closure(descendant_id);
+
+CREATE OR REPLACE FUNCTION maintain_gtd_project_closure()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO gtd_project_closure (ancestor_id, descendant_id, depth)
+        VALUES (NEW.id, NEW.id, 0);
+    ELSIF NEW.parent_project_id IS NOT DISTINCT FROM OLD.parent_project_id THEN
+        RETURN NULL;
+    ELSE
+        IF EXISTS (
+            SELECT 1 FROM gtd_project_closure
+            WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_project_id
+        ) THEN
+            RAISE EXCEPTION 'Project % cannot be moved below its own subproject %', NEW.id, NEW.parent_project_id;
+        END IF;
+
+        -- Detach the subtree from its old ancestors
+        DELETE FROM gtd_project_closure
+        WHERE descendant_id IN (SELECT descendant_id FROM gtd_project_closure WHERE ancestor_id = NEW.id)
+          AND ancestor_id NOT IN (SELECT descendant_id FROM gtd_project_closure WHERE ancestor_id = NEW.id);
+    END IF;
+
+    -- Attach the subtree (just the project on insert) below the new parent
+    IF NEW.parent_project_id IS NOT NULL THEN
+        INSERT INTO gtd_project_closure (ancestor_id, descendant_id, depth)
+        SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+        FROM gtd_project_closure above
+        CROSS JOIN gtd_project_closure below
+        WHERE above.descendant_id = NEW.parent_project_id
+          AND below.ancestor_id = NEW.id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS gtd_projects_closure ON gtd_projects;
+CREATE TRIGGER gtd_projects_closure
+    AFTER INSERT OR UPDATE OF parent_project_id ON gtd_projects
+    FOR EACH ROW EXECUTE FUNCTION maintain_gtd_project_closure();
+
+-- Backfill from existing parent IDs
+TRUNCATE gtd_project_closure;
+INSERT INTO gtd_project_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE paths AS (
+    SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth FROM gtd_projects
+    UNION ALL
+    SELECT paths.ancestor_id, child.id, paths.depth + 1
+    FROM paths
+    JOIN gtd_projects child ON child.parent_project_id = paths.descendant_id
+    WHERE paths.depth < 100
+)
+SELECT ancestor_id, descendant_id, min(depth) FROM paths GROUP BY ancestor_id, descendant_id;
+
+DO $$
+BEGIN
+    -- Supabase's API role (absent on plain Postgres)
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT SELECT ON gtd_project_closure TO service_role;
+    END IF;
+END $$;
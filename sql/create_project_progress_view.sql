@@ -0,0 +1,28 @@
+-- Task counts per project, read by the backend's project lists (GET
+-- /api/projects, /api/projects/active, /api/projects/weekly) in one query for
+-- all listed projects. Run this in the Supabase SQL Editor after the tables
+-- exist.
+--
+-- Deleted tasks are not counted. last_activity is the latest edit, completion
+-- or creation of one of the project's tasks. Filters on project_id are pushed
+-- below the grouping, so a page of projects only reads its own tasks through
+-- idx_gtd_tasks_project_id.
+
+CREATE OR REPLACE VIEW gtd_project_progress
+WITH (security_invoker = true) AS
+SELECT
+    project_id,
+    count(*) FILTER (WHERE done_at IS NULL) AS open_tasks,
+    count(*) FILTER (WHERE done_at IS NOT NULL) AS done_tasks,
+    max(GREATEST(last_edited, done_at, created_at)) AS last_activity
+FROM gtd_tasks
+WHERE deleted_at IS NULL AND project_id IS NOT NULL
+GROUP BY project_id;
+
+DO $$
+BEGIN
+    -- Supabase's API role (absent on plain Postgres)
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT SELECT ON gtd_project_progress TO service_role;
+    END IF;
+END $$;
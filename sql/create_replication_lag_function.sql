@@ -0,0 +1,25 @@
+-- Read replica lag, used by the backend to route reads (replica section of
+-- the backend config). Run this in the Supabase SQL Editor on the primary; it
+-- reaches the read replicas through replication.
+--
+-- Returns the seconds the database lags behind its primary: 0 on the primary
+-- itself and on a replica that has replayed everything it received, else the
+-- age of the last replayed transaction. A write committed before
+-- now() - lag is visible on the replica.
+
+CREATE OR REPLACE FUNCTION gtd_replication_lag()
+RETURNS DOUBLE PRECISION AS $$
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END::DOUBLE PRECISION
+$$ LANGUAGE sql STABLE;
+
+DO $$
+BEGIN
+    -- Supabase's API role (absent on plain Postgres)
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT EXECUTE ON FUNCTION gtd_replication_lag() TO service_role;
+    END IF;
+END $$;
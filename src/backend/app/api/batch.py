@@ -0,0 +1,221 @@
+"""
+Batched read endpoints
+
+Lets the frontend load a whole view in one round trip. Each operation is
+dispatched in-process through the application, so it behaves exactly like
+the standalone GET (validation, ETags, single-flight coalescing), and the
+operations run concurrently.
+"""
+import asyncio
+import json
+import logging
+from typing import Dict, List, Tuple, Union
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Request, Response
+from pydantic import BaseModel, Field, field_validator
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["batch"])
+
+# Maximum number of operations in one batch
+MAX_BATCH_OPERATIONS = 20
+
+# Read endpoints that may be batched (no streams, no nested batches)
+BATCHABLE_PREFIXES = (
+    "/api/tasks",
+    "/api/projects",
+    "/api/dashboard",
+    "/api/fields",
+    "/api/users",
+    "/api/search",
+    "/api/weekly-review",
+)
+
+# Request headers not forwarded to operations
+_DROPPED_HEADERS = {b"content-length", b"content-type", b"if-none-match", b"if-modified-since"}
+
+# Operations of the frontend home view
+HOME_VIEW = [
+    {"id": "stats", "path": "/api/dashboard/stats"},
+    {"id": "today", "path": "/api/tasks/today"},
+    {"id": "week", "path": "/api/tasks/week"},
+    {"id": "weekly_projects", "path": "/api/projects/weekly"},
+    {
+        "id": "inbox",
+        "path": "/api/tasks/",
+        "params": {"limit": 10, "do_today": False, "do_this_week": False, "is_done": False},
+    },
+]
+
+ParamValue = Union[str, int, float, bool, List[Union[str, int, float, bool]]]
+
+
+class BatchOperation(BaseModel):
+    """A single GET request inside a batch"""
+    id: str = Field(..., min_length=1, max_length=64, description="Key of the result")
+    path: str = Field(..., description="Endpoint path, e.g. /api/tasks/today")
+    params: Dict[str, ParamValue] = Field(default_factory=dict, description="Query parameters")
+
+    @field_validator("path")
+    @classmethod
+    def check_path(cls, path: str) -> str:
+        if "?" in path or "#" in path:
+            raise ValueError("pass query parameters in 'params'")
+        if ".." in path or not any(
+            path == prefix or path.startswith(prefix + "/") for prefix in BATCHABLE_PREFIXES
+        ):
+            raise ValueError(f"path must start with one of {', '.join(BATCHABLE_PREFIXES)}")
+        return path
+
+
+class BatchRequest(BaseModel):
+    """Operations to run in one round trip"""
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+    @field_validator("operations")
+    @classmethod
+    def check_unique_ids(cls, operations: List[BatchOperation]) -> List[BatchOperation]:
+        ids = [operation.id for operation in operations]
+        if len(ids) != len(set(ids)):
+            raise ValueError("operation ids must be unique")
+        return operations
+
+
+def _query_string(params: Dict[str, ParamValue]) -> bytes:
+    """Encode query parameters the way a browser would (lowercase booleans)"""
+    def encode(value):
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return value
+
+    items = []
+    for key, value in params.items():
+        values = value if isinstance(value, list) else [value]
+        items.extend((key, encode(v)) for v in values)
+    return urlencode(items).encode("latin-1")
+
+
+async def _dispatch(request: Request, operation: BatchOperation) -> Tuple[int, bytes, bytes, bool]:
+    """
+    Run one operation as an in-process GET through the application
+
+    Returns:
+        Tuple[int, bytes, bytes, bool]: Status code, content type, body and
+        whether the body is a stale fallback (``X-Data-Stale``)
+    """
+    parent = request.scope
+    scope = {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": operation.path,
+        "raw_path": operation.path.encode("utf-8"),
+        "query_string": _query_string(operation.params),
+        "headers": [(k, v) for k, v in parent["headers"] if k not in _DROPPED_HEADERS],
+        "state": dict(parent.get("state", {})),
+        "extensions": {},
+    }
+
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Never report a disconnect; the batch response waits for all operations
+        await asyncio.Event().wait()
+
+    status_code = 500
+    content_type = b""
+    stale = False
+    body = bytearray()
+
+    async def send(message):
+        nonlocal status_code, content_type, stale
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            headers = dict(message.get("headers", []))
+            content_type = headers.get(b"content-type", b"")
+            stale = headers.get(b"x-data-stale") == b"true"
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception as e:
+        logger.error(f"Batch operation {operation.id} ({operation.path}) failed: {e}", exc_info=True)
+        return 500, b"application/json", json.dumps({"detail": "Batch operation failed"}).encode("utf-8"), False
+
+    return status_code, content_type, bytes(body), stale
+
+
+def _render(operations: List[BatchOperation], results: List[Tuple[int, bytes, bytes, bool]]) -> bytes:
+    """
+    Assemble the batch response, splicing JSON bodies in without re-parsing
+
+    Returns:
+        bytes: ``{"results": {id: {"status": ..., "body": ...}}}``, with
+        ``"stale": true`` on results served from a stale fallback
+    """
+    parts = []
+    for operation, (status_code, content_type, body, stale) in zip(operations, results):
+        if not body:
+            body = b"null"
+        elif not content_type.startswith(b"application/json"):
+            body = json.dumps(body.decode("utf-8", "replace")).encode("utf-8")
+        key = json.dumps(operation.id).encode("utf-8")
+        flags = b',"stale":true' if stale else b""
+        parts.append(b'%s:{"status":%d%s,"body":%s}' % (key, status_code, flags, body))
+    return b'{"results":{' + b",".join(parts) + b"}}"
+
+
+async def run_batch(request: Request, operations: List[BatchOperation]) -> Response:
+    """
+    Run operations concurrently and combine their responses
+
+    A failing operation does not fail the batch: every result carries its
+    own status code and body (the error detail for non-2xx statuses).
+    """
+    results = await asyncio.gather(*(_dispatch(request, operation) for operation in operations))
+    return Response(content=_render(operations, results), media_type="application/json")
+
+
+@router.post("/batch")
+async def batch(request: Request, batch_request: BatchRequest) -> Response:
+    """
+    Run several read operations in one request
+
+    Example body::
+
+        {"operations": [
+            {"id": "stats", "path": "/api/dashboard/stats"},
+            {"id": "inbox", "path": "/api/tasks/", "params": {"limit": 10, "is_done": false}}
+        ]}
+
+    Returns:
+        Response: ``{"results": {id: {"status": int, "body": ...}}}``
+    """
+    return await run_batch(request, batch_request.operations)
+
+
+@router.get("/views/home")
+async def get_home_view(request: Request) -> Response:
+    """
+    Get everything the home page shows in one request
+
+    Results: ``stats``, ``today``, ``week``, ``weekly_projects`` and ``inbox``,
+    in the same format as ``POST /api/batch``.
+
+    Returns:
+        Response: Batch results
+    """
+    operations = [BatchOperation(**operation) for operation in HOME_VIEW]
+    return await run_batch(request, operations)
@@ -3,11 +3,13 @@ Dashboard API endpoints with Supabase direct connection
 """
 from datetime import datetime, timedelta, date
 from typing import Dict, Any
-from fastapi import APIRouter, Depends
-from supabase import Client
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
-from app.database import get_db
+from app.database import get_db, Client
 from app.config import get_settings
+from app.etag import ConditionalGet
+from app.circuit import resilient_read
+from app.direct import DirectDatabase, get_direct_db
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
@@ -16,8 +18,167 @@ async def get_dashboard() -> dict:
     """Get dashboard data"""
     return {"message": "Dashboard endpoints not implemented yet"}
 
-@router.get("/stats")
-async def get_dashboard_stats(supabase: Client = Depends(get_db)) -> Dict[str, Any]:
+def compute_dashboard_stats(supabase: Client, default_user_id: str) -> Dict[str, Any]:
+    """
+    Query all dashboard statistics of a user (blocking)
+    
+    Args:
+        supabase: Supabase client
+        default_user_id: User ID
+        
+    Returns:
+        Dict[str, Any]: Dashboard statistics
+    """
+    # Current date calculations
+    today = date.today()
+    week_start = today - timedelta(days=today.weekday())  # Monday of current week
+    seven_days_ago = today - timedelta(days=7)
+    thirty_days_ago = today - timedelta(days=30)
+    
+    # === PROJECT STATISTICS ===
+    
+    # Total projects
+    projects_response = supabase.table("gtd_projects").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").execute()
+    total_projects = len(projects_response.data) if projects_response.data else 0
+    
+    # Active projects (not completed)
+    active_projects_response = supabase.table("gtd_projects").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").eq("done_status", "false").execute()
+    active_projects = len(active_projects_response.data) if active_projects_response.data else 0
+    
+    # === TASK STATISTICS ===
+    
+    # Total tasks
+    tasks_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").execute()
+    total_tasks = len(tasks_response.data) if tasks_response.data else 0
+    
+    # Pending tasks (not completed)
+    pending_tasks_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").is_("done_at", "null").execute()
+    pending_tasks = len(pending_tasks_response.data) if pending_tasks_response.data else 0
+    
+    # Tasks for today
+    tasks_today_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").eq("do_today", "true").execute()
+    tasks_today = len(tasks_today_response.data) if tasks_today_response.data else 0
+    
+    # Tasks for this week
+    tasks_week_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").eq("do_this_week", "true").execute()
+    tasks_this_week = len(tasks_week_response.data) if tasks_week_response.data else 0
+    
+    # Overdue tasks (due date in the past and not completed)
+    overdue_tasks_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").is_("done_at", "null").lt("do_on_date", today.isoformat()).execute()
+    overdue_tasks = len(overdue_tasks_response.data) if overdue_tasks_response.data else 0
+    
+    # === COMPLETION RATES ===
+    
+    # 7-day completion rate
+    tasks_7d_completed_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).gte("done_at", seven_days_ago.isoformat()).execute()
+    tasks_7d_completed = len(tasks_7d_completed_response.data) if tasks_7d_completed_response.data else 0
+    
+    tasks_7d_total_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).gte("created_at", seven_days_ago.isoformat()).execute()
+    tasks_7d_total = len(tasks_7d_total_response.data) if tasks_7d_total_response.data else 0
+    
+    # 30-day completion rate
+    tasks_30d_completed_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).gte("done_at", thirty_days_ago.isoformat()).execute()
+    tasks_30d_completed = len(tasks_30d_completed_response.data) if tasks_30d_completed_response.data else 0
+    
+    tasks_30d_total_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).gte("created_at", thirty_days_ago.isoformat()).execute()
+    tasks_30d_total = len(tasks_30d_total_response.data) if tasks_30d_total_response.data else 0
+    
+    return summarize_dashboard_stats({
+        "total_projects": total_projects,
+        "active_projects": active_projects,
+        "total_tasks": total_tasks,
+        "pending_tasks": pending_tasks,
+        "tasks_today": tasks_today,
+        "tasks_this_week": tasks_this_week,
+        "overdue_tasks": overdue_tasks,
+        "tasks_7d_completed": tasks_7d_completed,
+        "tasks_7d_total": tasks_7d_total,
+        "tasks_30d_completed": tasks_30d_completed,
+        "tasks_30d_total": tasks_30d_total
+    })
+
+
+# All dashboard counts in one round trip (direct query path)
+DASHBOARD_STATS_SQL = """
+SELECT
+    (SELECT count(*) FROM gtd_projects
+     WHERE user_id = $1 AND deleted_at IS NULL) AS total_projects,
+    (SELECT count(*) FROM gtd_projects
+     WHERE user_id = $1 AND deleted_at IS NULL AND done_status = false) AS active_projects,
+    count(*) FILTER (WHERE deleted_at IS NULL) AS total_tasks,
+    count(*) FILTER (WHERE deleted_at IS NULL AND done_at IS NULL) AS pending_tasks,
+    count(*) FILTER (WHERE deleted_at IS NULL AND do_today) AS tasks_today,
+    count(*) FILTER (WHERE deleted_at IS NULL AND do_this_week) AS tasks_this_week,
+    count(*) FILTER (WHERE deleted_at IS NULL AND done_at IS NULL AND do_on_date < $2) AS overdue_tasks,
+    count(*) FILTER (WHERE done_at >= $3::date) AS tasks_7d_completed,
+    count(*) FILTER (WHERE created_at >= $3::date) AS tasks_7d_total,
+    count(*) FILTER (WHERE done_at >= $4::date) AS tasks_30d_completed,
+    count(*) FILTER (WHERE created_at >= $4::date) AS tasks_30d_total
+FROM gtd_tasks
+WHERE user_id = $1
+"""
+
+
+async def fetch_dashboard_stats(db: DirectDatabase, default_user_id: str) -> Dict[str, Any]:
+    """
+    Query all dashboard statistics of a user with one direct query
+    
+    Args:
+        db: Direct query pool
+        default_user_id: User ID
+        
+    Returns:
+        Dict[str, Any]: Dashboard statistics
+    """
+    today = date.today()
+    counts = await db.fetchrow(
+        "dashboard_stats",
+        DASHBOARD_STATS_SQL,
+        default_user_id,
+        today,
+        today - timedelta(days=7),
+        today - timedelta(days=30)
+    )
+    return summarize_dashboard_stats(counts)
+
+
+def summarize_dashboard_stats(counts: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Derive the dashboard statistics from the raw counts
+    
+    Args:
+        counts: Project and task counts
+        
+    Returns:
+        Dict[str, Any]: Dashboard statistics
+    """
+    def rate(completed: int, total: int) -> float:
+        return round(completed / total * 100, 1) if total > 0 else 0
+    
+    return {
+        "total_projects": counts["total_projects"],
+        "active_projects": counts["active_projects"],
+        "completed_projects": counts["total_projects"] - counts["active_projects"],
+        "total_tasks": counts["total_tasks"],
+        "pending_tasks": counts["pending_tasks"],
+        "completed_tasks": counts["total_tasks"] - counts["pending_tasks"],
+        "tasks_today": counts["tasks_today"],
+        "tasks_this_week": counts["tasks_this_week"],
+        "overdue_tasks": counts["overdue_tasks"],
+        "completion_rate_7d": rate(counts["tasks_7d_completed"], counts["tasks_7d_total"]),
+        "completion_rate_30d": rate(counts["tasks_30d_completed"], counts["tasks_30d_total"])
+    }
+
+
+@router.get(
+    "/stats",
+    dependencies=[Depends(ConditionalGet("dashboard:stats", ["gtd_tasks", "gtd_projects"], daily=True))]
+)
+async def get_dashboard_stats(
+    request: Request,
+    response: Response,
+    supabase: Client = Depends(get_db)
+) -> Dict[str, Any]:
     """
     Get dashboard statistics
     
@@ -26,102 +187,25 @@ async def get_dashboard_stats(supabase: Client = Depends(get_db)) -> Dict[str, A
     - Task counts (total, pending, completed)
     - Time-based metrics (today, this week)
     - Completion rates (7d, 30d)
+    
+    While Supabase is unavailable the last known statistics are returned
+    with an ``X-Data-Stale: true`` header.
     """
     try:
         # Get default user ID for RLS compliance
         settings = get_settings()
         default_user_id = settings.gtd.default_user_id
         
-        # Current date calculations
-        today = date.today()
-        week_start = today - timedelta(days=today.weekday())  # Monday of current week
-        seven_days_ago = today - timedelta(days=7)
-        thirty_days_ago = today - timedelta(days=30)
-        
-        # === PROJECT STATISTICS ===
-        
-        # Total projects
-        projects_response = supabase.table("gtd_projects").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").execute()
-        total_projects = len(projects_response.data) if projects_response.data else 0
-        
-        # Active projects (not completed)
-        active_projects_response = supabase.table("gtd_projects").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").eq("done_status", "false").execute()
-        active_projects = len(active_projects_response.data) if active_projects_response.data else 0
-        
-        # Completed projects
-        completed_projects = total_projects - active_projects
-        
-        # === TASK STATISTICS ===
-        
-        # Total tasks
-        tasks_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").execute()
-        total_tasks = len(tasks_response.data) if tasks_response.data else 0
-        
-        # Pending tasks (not completed)
-        pending_tasks_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").is_("done_at", "null").execute()
-        pending_tasks = len(pending_tasks_response.data) if pending_tasks_response.data else 0
-        
-        # Completed tasks
-        completed_tasks = total_tasks - pending_tasks
-        
-        # Tasks for today
-        tasks_today_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").eq("do_today", "true").execute()
-        tasks_today = len(tasks_today_response.data) if tasks_today_response.data else 0
-        
-        # Tasks for this week
-        tasks_week_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").eq("do_this_week", "true").execute()
-        tasks_this_week = len(tasks_week_response.data) if tasks_week_response.data else 0
-        
-        # Overdue tasks (due date in the past and not completed)
-        overdue_tasks_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).is_("deleted_at", "null").is_("done_at", "null").lt("due_date", today.isoformat()).execute()
-        overdue_tasks = len(overdue_tasks_response.data) if overdue_tasks_response.data else 0
-        
-        # === COMPLETION RATES ===
-        
-        # 7-day completion rate
-        tasks_7d_completed_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).gte("done_at", seven_days_ago.isoformat()).execute()
-        tasks_7d_completed = len(tasks_7d_completed_response.data) if tasks_7d_completed_response.data else 0
-        
-        tasks_7d_total_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).gte("created_at", seven_days_ago.isoformat()).execute()
-        tasks_7d_total = len(tasks_7d_total_response.data) if tasks_7d_total_response.data else 0
-        
-        completion_rate_7d = (tasks_7d_completed / tasks_7d_total * 100) if tasks_7d_total > 0 else 0
-        
-        # 30-day completion rate
-        tasks_30d_completed_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).gte("done_at", thirty_days_ago.isoformat()).execute()
-        tasks_30d_completed = len(tasks_30d_completed_response.data) if tasks_30d_completed_response.data else 0
-        
-        tasks_30d_total_response = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).gte("created_at", thirty_days_ago.isoformat()).execute()
-        tasks_30d_total = len(tasks_30d_total_response.data) if tasks_30d_total_response.data else 0
-        
-        completion_rate_30d = (tasks_30d_completed / tasks_30d_total * 100) if tasks_30d_total > 0 else 0
-        
-        return {
-            "total_projects": total_projects,
-            "active_projects": active_projects,
-            "completed_projects": completed_projects,
-            "total_tasks": total_tasks,
-            "pending_tasks": pending_tasks,
-            "completed_tasks": completed_tasks,
-            "tasks_today": tasks_today,
-            "tasks_this_week": tasks_this_week,
-            "overdue_tasks": overdue_tasks,
-            "completion_rate_7d": round(completion_rate_7d, 1),
-            "completion_rate_30d": round(completion_rate_30d, 1)
-        }
+        # Identical concurrent requests share one set of queries
+        direct = get_direct_db()
+        if direct is not None:
+            return await resilient_read(request, response, default_user_id, fetch_dashboard_stats, direct, default_user_id)
+        return await resilient_read(request, response, default_user_id, compute_dashboard_stats, supabase, default_user_id)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        # Return default stats in case of error
-        return {
-            "total_projects": 0,
-            "active_projects": 0,
-            "completed_projects": 0,
-            "total_tasks": 0,
-            "pending_tasks": 0,
-            "completed_tasks": 0,
-            "tasks_today": 0,
-            "tasks_this_week": 0,
-            "overdue_tasks": 0,
-            "completion_rate_7d": 0.0,
-            "completion_rate_30d": 0.0
-        }
\ No newline at end of file
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch dashboard stats: {str(e)}"
+        )
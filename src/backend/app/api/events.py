@@ -0,0 +1,66 @@
+"""
+Real-time change stream (Server-Sent Events)
+"""
+import json
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.config import get_settings
+from app.events import get_change_bus
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("/stream")
+async def stream_changes(request: Request) -> StreamingResponse:
+    """
+    Stream task and project changes of the current user
+
+    Each ``changes`` event carries a batch of coalesced changes
+    (``{"entity", "id", "op"}``). A ``resync`` event means changes were
+    dropped for a slow client and all views should be refetched.
+    Comment lines are sent as keepalive while idle.
+
+    Returns:
+        StreamingResponse: text/event-stream response
+    """
+    settings = get_settings()
+    if not settings.features.real_time_updates:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Real-time updates are disabled"
+        )
+
+    default_user_id = settings.gtd.default_user_id
+    realtime = settings.realtime
+    bus = get_change_bus()
+
+    async def event_stream() -> AsyncIterator[str]:
+        # Subscribed only once the body is iterated: a response that is never
+        # sent (client gone before the body starts) leaves nothing on the bus
+        subscription = bus.subscribe(default_user_id, realtime.max_pending)
+        try:
+            yield f"retry: {realtime.heartbeat_seconds * 1000}\n\n"
+
+            while not await request.is_disconnected():
+                batch = await subscription.next_batch(
+                    coalesce_seconds=realtime.coalesce_ms / 1000,
+                    timeout=realtime.heartbeat_seconds
+                )
+
+                if batch is None:
+                    yield ": keepalive\n\n"
+                elif batch["resync"]:
+                    yield "event: resync\ndata: {}\n\n"
+                else:
+                    yield f"event: changes\ndata: {json.dumps(batch['changes'], separators=(',', ':'))}\n\n"
+        finally:
+            bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
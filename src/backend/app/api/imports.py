@@ -0,0 +1,357 @@
+"""
+Streaming bulk import of Notion task exports (CSV or NDJSON)
+
+The upload is read incrementally and every row is transformed like the
+command line ETL does (see ``app.task_rows``), then inserted in batches. Parsing, transformation and inserts run in a worker
+thread, so the event loop keeps serving other requests during an import.
+"""
+import codecs
+import csv
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database import get_db, Client
+from app.dependencies import get_current_user_id
+from app.events import get_change_bus
+from app.metrics import record_etl_run
+from app.responses import fast_json
+from app.task_rows import TaskRowTransformer
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+# Per-row errors kept in a job report (all errors are counted)
+MAX_REPORTED_ERRORS = 1000
+
+# Finished jobs kept for progress queries
+MAX_FINISHED_JOBS = 50
+
+
+class ImportJob:
+    """Progress and error report of one import"""
+
+    def __init__(self, job_id: str, user_id: str, fmt: str, dry_run: bool):
+        self.id = job_id
+        self.user_id = user_id
+        self.format = fmt
+        self.dry_run = dry_run
+        self.status = "running"
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.rows = 0
+        self.skipped = 0
+        self.inserted = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.message: Optional[str] = None
+
+    def add_error(self, row: int, error: str) -> None:
+        """Record a failed row"""
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": error})
+
+    def finish(self, outcome: str, message: Optional[str] = None) -> None:
+        """Mark the job as completed or failed"""
+        self.status = outcome
+        self.message = message
+        self.finished_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "format": self.format,
+            "dry_run": self.dry_run,
+            "rows": self.rows,
+            "skipped": self.skipped,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "batches": self.batches,
+            "elapsed_seconds": round(end - self.started_at, 3),
+            "message": self.message,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+class ImportJobRegistry:
+    """
+    In-process registry of running and recently finished imports
+
+    Job IDs are chosen by clients, so they are scoped per user: users never
+    see, block or replace each other's jobs.
+    """
+
+    def __init__(self):
+        self._jobs: "OrderedDict[Tuple[str, str], ImportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, user_id: str, fmt: str, dry_run: bool) -> ImportJob:
+        key = (user_id, job_id)
+        with self._lock:
+            existing = self._jobs.get(key)
+            if existing is not None and existing.status == "running":
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Import job {job_id} is already running"
+                )
+
+            job = ImportJob(job_id, user_id, fmt, dry_run)
+            self._jobs.pop(key, None)
+            self._jobs[key] = job
+
+            finished = [key for key, other in self._jobs.items() if other.status != "running"]
+            for key in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[key]
+            return job
+
+    def get(self, user_id: str, job_id: str) -> Optional[ImportJob]:
+        return self._jobs.get((user_id, job_id))
+
+    def for_user(self, user_id: str) -> List[ImportJob]:
+        return [job for job in list(self._jobs.values()) if job.user_id == user_id]
+
+
+# Global job registry
+import_jobs = ImportJobRegistry()
+
+
+def iter_text_lines(next_chunk: Callable[[], Optional[bytes]]) -> Iterator[str]:
+    """
+    Decode a byte stream into lines (line endings kept, BOM stripped)
+
+    Args:
+        next_chunk: Returns the next chunk of the body, None at the end
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+
+    while True:
+        chunk = next_chunk()
+        if chunk is None:
+            break
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def iter_records(lines: Iterator[str], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Parse lines into records
+
+    Yields:
+        (row number, record or None, parse error or None); CSV rows are
+        numbered like the ETL (header is row 1), NDJSON rows by line
+    """
+    if fmt == "csv":
+        # The csv module handles quoted fields spanning several lines
+        for index, record in enumerate(csv.DictReader(lines)):
+            yield index + 2, record, None
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, record, None
+
+
+def run_import(
+    job: ImportJob,
+    transformer: TaskRowTransformer,
+    lines: Iterator[str],
+    source_file: str,
+    batch_size: int
+) -> None:
+    """
+    Transform and load records batch by batch (blocking)
+
+    A failing batch is retried row by row so the report names the rows
+    the database rejected.
+    """
+    batch: List[Tuple[int, dict]] = []
+
+    def table():
+        return transformer.supabase.table(transformer.tasks_table)
+
+    def flush() -> None:
+        job.batches += 1
+        if job.dry_run:
+            job.inserted += len(batch)
+        else:
+            try:
+                table().insert([record for _, record in batch]).execute()
+                job.inserted += len(batch)
+            except Exception as e:
+                logger.warning(f"Import {job.id}: batch {job.batches} failed ({e}), retrying row by row")
+                for row_num, record in batch:
+                    try:
+                        table().insert(record).execute()
+                        job.inserted += 1
+                    except Exception as row_error:
+                        job.add_error(row_num, str(row_error))
+        batch.clear()
+
+    for row_num, record, error in iter_records(lines, job.format):
+        job.rows += 1
+        if error is not None:
+            job.add_error(row_num, error)
+            continue
+
+        # Skip empty rows like the ETL does
+        if not record.get("Task name") and not record.get("🚀Project"):
+            job.skipped += 1
+            continue
+
+        try:
+            batch.append((row_num, transformer.transform_task_row(record, row_num, source_file)))
+        except Exception as e:
+            job.add_error(row_num, f"Transform failed: {e}")
+            continue
+
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+
+@router.post("/tasks")
+async def import_tasks(
+    request: Request,
+    format: Optional[str] = Query(
+        None, pattern="^(csv|ndjson)$",
+        description="Body format (default: from Content-Type, else csv)"
+    ),
+    dry_run: bool = Query(False, description="Validate and transform without inserting"),
+    batch_size: int = Query(500, ge=1, le=5000, description="Rows per insert"),
+    job_id: Optional[str] = Query(
+        None, pattern="^[A-Za-z0-9_-]{8,64}$",
+        description="Client-chosen job ID, to poll progress during the upload"
+    ),
+    filename: str = Query("upload.csv", max_length=255, description="Recorded as source_file"),
+    user_id: str = Depends(get_current_user_id),
+    supabase: Client = Depends(get_db)
+) -> dict:
+    """
+    Import tasks from a Notion CSV export or NDJSON rows with the same keys
+
+    Send the file as the raw request body, e.g.
+    ``curl --data-binary @GTD_Tasks_all.csv -H 'Content-Type: text/csv'``.
+    The body is streamed, never buffered as a whole. Progress of a running
+    import is available at ``GET /api/import/jobs/{job_id}``.
+
+    Returns:
+        dict: Final report with counts and per-row errors
+    """
+    settings = get_settings()
+    if not settings.features.export_import:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import is disabled"
+        )
+
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "json" in content_type else "csv"
+
+    job = import_jobs.create(job_id or uuid.uuid4().hex, user_id, format, dry_run)
+    logger.info(f"Import {job.id} started ({format}, dry_run={dry_run}) for user {user_id}")
+
+    chunks = request.stream().__aiter__()
+
+    async def receive_chunk() -> Optional[bytes]:
+        try:
+            return await chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def next_chunk() -> Optional[bytes]:
+        # Runs in the worker thread; pulls the next body chunk from the loop
+        return anyio.from_thread.run(receive_chunk)
+
+    def work() -> None:
+        transformer = TaskRowTransformer(user_id=user_id, supabase=supabase)
+        run_import(job, transformer, iter_text_lines(next_chunk), Path(filename).name, batch_size)
+
+    try:
+        await run_in_threadpool(work)
+    except UnicodeDecodeError as e:
+        job.finish("failed", f"Body is not valid UTF-8: {e}")
+    except Exception as e:
+        logger.error(f"Import {job.id} failed: {e}", exc_info=True)
+        job.finish("failed", f"Import aborted: {str(e)}")
+    else:
+        job.finish("completed")
+
+    record_etl_run(
+        "tasks", job.status, job.finished_at - job.started_at,
+        job.inserted, job.failed, job.skipped
+    )
+
+    if job.inserted and not dry_run:
+        # Bulk change: drop the user's cached task markers and let their clients refetch
+        get_change_bus().resync_user(user_id, "task")
+
+    logger.info(
+        f"Import {job.id} {job.status}: {job.rows} rows, {job.inserted} inserted, "
+        f"{job.failed} failed, {job.skipped} skipped"
+    )
+    return fast_json(job.to_dict())
+
+
+@router.get("/jobs")
+async def list_import_jobs(user_id: str = Depends(get_current_user_id)) -> List[dict]:
+    """
+    List running and recent imports of the current user (without error rows)
+
+    Jobs are tracked per backend process.
+    """
+    return fast_json([
+        {key: value for key, value in job.to_dict().items() if key != "errors"}
+        for job in import_jobs.for_user(user_id)
+    ])
+
+
+@router.get("/jobs/{job_id}")
+async def get_import_job(job_id: str, user_id: str = Depends(get_current_user_id)) -> dict:
+    """
+    Get progress or the final report of an import
+
+    Args:
+        job_id: Job ID (returned by, or passed to, the import endpoint)
+    """
+    job = import_jobs.get(user_id, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return fast_json(job.to_dict())
@@ -2,22 +2,110 @@
 Project API endpoints with Supabase direct connection
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from supabase import Client
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 
-from app.database import get_db
+from app.database import get_db, Client
+from app.direct import DirectDatabase, get_direct_db, quote_columns
+from app.etag import ConditionalGet
+from app.responses import FastJSONResponse, fast_json
+from app.fieldsets import SparseFields
+from app.schemas import PROJECT, PROJECT_TREE_NODE, PROJECT_WITH_PROGRESS, TASK_SUMMARY, RowMapper
+from app.sorting import PROJECT_SORT_COLUMNS, TASK_SORT_COLUMNS, Ordering, SortOrder
+from app.circuit import resilient_read
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+# Task counts per project (sql/create_project_progress_view.sql)
+PROGRESS_VIEW = "gtd_project_progress"
+PROGRESS_COLUMNS = ("open_tasks", "done_tasks", "last_activity")
 
-@router.get("/")
+# Direct query path: projects and their task counts in one grouped join
+PROJECTS_WITH_PROGRESS_SQL = """
+SELECT {columns},
+       COALESCE(progress.open_tasks, 0) AS open_tasks,
+       COALESCE(progress.done_tasks, 0) AS done_tasks,
+       progress.last_activity
+FROM gtd_projects p
+LEFT JOIN (
+    SELECT project_id,
+           count(*) FILTER (WHERE done_at IS NULL) AS open_tasks,
+           count(*) FILTER (WHERE done_at IS NOT NULL) AS done_tasks,
+           max(GREATEST(last_edited, done_at, created_at)) AS last_activity
+    FROM gtd_tasks
+    WHERE user_id = $1 AND deleted_at IS NULL AND project_id IS NOT NULL
+    GROUP BY project_id
+) progress ON progress.project_id = p.id
+WHERE p.user_id = $1 AND p.deleted_at IS NULL AND p.{flag} = $2
+ORDER BY p.id
+"""
+
+# Ancestor/descendant pairs of the project hierarchy (sql/create_project_hierarchy.sql)
+CLOSURE_TABLE = "gtd_project_closure"
+
+
+def attach_progress(supabase: Client, projects: List[dict]) -> List[dict]:
+    """
+    Add the task counts to project rows, with one query for all projects
+
+    Args:
+        supabase: Supabase client
+        projects: Project rows including their ids
+
+    Returns:
+        List[dict]: The same rows with open_tasks, done_tasks and
+        last_activity (absent for projects without tasks)
+    """
+    ids = [project["id"] for project in projects]
+    if not ids:
+        return projects
+
+    result = supabase.table(PROGRESS_VIEW).select("project_id," + ",".join(PROGRESS_COLUMNS)).in_("project_id", ids).execute()
+    progress = {row["project_id"]: row for row in result.data or []}
+
+    for project in projects:
+        counts = progress.get(project["id"])
+        if counts is not None:
+            for column in PROGRESS_COLUMNS:
+                project[column] = counts[column]
+    return projects
+
+
+async def fetch_projects_with_progress(
+    db: DirectDatabase,
+    name: str,
+    mapper: RowMapper,
+    user_id: str,
+    flag: str,
+    value: bool
+) -> List[dict]:
+    """
+    Get a user's projects with their task counts over the direct query pool
+
+    Args:
+        db: Direct query pool
+        name: Query name for traces and metrics
+        mapper: Project mapper of the request
+        user_id: User ID
+        flag: Boolean project column to filter on
+        value: Required value of the column
+
+    Returns:
+        List[dict]: Mapped projects
+    """
+    query = PROJECTS_WITH_PROGRESS_SQL.format(columns=quote_columns(mapper.select, "p"), flag=flag)
+    return mapper.map(await db.fetch(name, query, user_id, value))
+
+
+@router.get("/", response_class=FastJSONResponse)
 async def get_projects(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    mapper: RowMapper = Depends(SparseFields(PROJECT_WITH_PROGRESS)),
+    ordering: Ordering = Depends(SortOrder(PROJECT_SORT_COLUMNS)),
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
     """
-    Get projects from Supabase
+    Get projects from Supabase, with the task counts of each project
     
     Returns:
         List[dict]: List of project data
@@ -25,33 +113,23 @@ async def get_projects(
     try:
         # Try disabling RLS for this specific query using service role
         # The service role should bypass RLS policies
-        query = supabase.table("gtd_projects").select("*")
+        query = supabase.table("gtd_projects").select(mapper.select)
         
         # Add filters
         query = query.is_("deleted_at", "null")  # Exclude deleted projects
         
-        # Add pagination
+        # Add ordering and pagination
+        query = ordering.apply(query)
         query = query.range(skip, skip + limit - 1)
         
         # Execute query with bypass_rls option if available
         result = query.execute()
         
-        # Transform data to match expected format
-        projects = []
-        for project in result.data:
-            projects.append({
-                "id": project["id"],
-                "name": project["project_name"] or f"Project {project['id']}",
-                "field_id": project["field_id"],
-                "done_status": project["done_status"],
-                "do_this_week": project["do_this_week"],
-                "keywords": project["keywords"],
-                "readings": project["readings"],
-                "created_at": project["created_at"],
-                "updated_at": project["updated_at"]
-            })
+        projects = result.data or []
+        if mapper.computed:
+            projects = attach_progress(supabase, projects)
         
-        return projects
+        return fast_json(mapper.map(projects))
         
     except Exception as e:
         raise HTTPException(
@@ -60,12 +138,15 @@ async def get_projects(
         )
 
 
-@router.get("/weekly")
+@router.get("/weekly", response_class=FastJSONResponse)
 async def get_weekly_projects(
+    request: Request,
+    response: Response,
+    mapper: RowMapper = Depends(SparseFields(PROJECT_WITH_PROGRESS)),
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
     """
-    Get projects marked for this week
+    Get projects marked for this week, with the task counts of each project
     
     Returns:
         List[dict]: List of projects with do_this_week=true
@@ -77,41 +158,58 @@ async def get_weekly_projects(
         default_user_id = settings.gtd.default_user_id
         
         # Query projects for this week
-        query = supabase.table("gtd_projects").select("*")
-        query = query.eq("user_id", default_user_id)
-        query = query.is_("deleted_at", "null")
-        query = query.eq("do_this_week", "true")
+        def fetch_rest():
+            query = supabase.table("gtd_projects").select(mapper.select)
+            query = query.eq("user_id", default_user_id)
+            query = query.is_("deleted_at", "null")
+            query = query.eq("do_this_week", "true")
+            
+            result = query.execute()
+            projects = result.data or []
+            if mapper.computed:
+                projects = attach_progress(supabase, projects)
+            return mapper.map(projects)
         
-        result = query.execute()
-        
-        # Transform data to match expected format
-        projects = []
-        for project in result.data:
-            projects.append({
-                "id": project["id"],
-                "name": project["project_name"] or f"Project {project['id']}",
-                "field_id": project["field_id"],
-                "done_status": project["done_status"],
-                "do_this_week": project["do_this_week"],
-                "keywords": project["keywords"],
-                "readings": project["readings"],
-                "created_at": project["created_at"],
-                "updated_at": project["updated_at"]
-            })
+        direct = get_direct_db()
+
+        # Projects and task counts in one query
+        async def fetch_direct():
+            return await fetch_projects_with_progress(
+                direct, "weekly_projects", mapper, default_user_id, "do_this_week", True
+            )
+
+        if direct is not None:
+            fetch = fetch_direct
+        else:
+            fetch = fetch_rest
+
+        # Identical concurrent requests share one query; stale copy while Supabase is down
+        projects = await resilient_read(request, response, default_user_id, fetch)
         
-        return projects
+        return fast_json(projects, response)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        # Return empty list in case of error
-        return []
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch weekly projects: {str(e)}"
+        )
 
 
-@router.get("/active")
+@router.get(
+    "/active",
+    response_class=FastJSONResponse,
+    dependencies=[Depends(ConditionalGet("projects:active", ["gtd_projects", "gtd_tasks"]))]
+)
 async def get_active_projects(
+    request: Request,
+    response: Response,
+    mapper: RowMapper = Depends(SparseFields(PROJECT_WITH_PROGRESS)),
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
     """
-    Get active (not completed) projects
+    Get active (not completed) projects, with the task counts of each project
     
     Returns:
         List[dict]: List of active projects
@@ -123,38 +221,49 @@ async def get_active_projects(
         default_user_id = settings.gtd.default_user_id
         
         # Query active projects (done_status = false)
-        query = supabase.table("gtd_projects").select("*")
-        query = query.eq("user_id", default_user_id)
-        query = query.is_("deleted_at", "null")
-        query = query.eq("done_status", "false")
+        def fetch_rest():
+            query = supabase.table("gtd_projects").select(mapper.select)
+            query = query.eq("user_id", default_user_id)
+            query = query.is_("deleted_at", "null")
+            query = query.eq("done_status", "false")
+            
+            result = query.execute()
+            projects = result.data or []
+            if mapper.computed:
+                projects = attach_progress(supabase, projects)
+            return mapper.map(projects)
         
-        result = query.execute()
-        
-        # Transform data to match expected format
-        projects = []
-        for project in result.data:
-            projects.append({
-                "id": project["id"],
-                "name": project["project_name"] or f"Project {project['id']}",
-                "field_id": project["field_id"],
-                "done_status": project["done_status"],
-                "do_this_week": project["do_this_week"],
-                "keywords": project["keywords"],
-                "readings": project["readings"],
-                "created_at": project["created_at"],
-                "updated_at": project["updated_at"]
-            })
+        direct = get_direct_db()
+
+        # Projects and task counts in one query
+        async def fetch_direct():
+            return await fetch_projects_with_progress(
+                direct, "active_projects", mapper, default_user_id, "done_status", False
+            )
+
+        if direct is not None:
+            fetch = fetch_direct
+        else:
+            fetch = fetch_rest
+
+        # Identical concurrent requests share one query; stale copy while Supabase is down
+        projects = await resilient_read(request, response, default_user_id, fetch)
         
-        return projects
+        return fast_json(projects, response)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        # Return empty list in case of error
-        return []
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch active projects: {str(e)}"
+        )
 
 
-@router.get("/{project_id}")
+@router.get("/{project_id}", response_class=FastJSONResponse)
 async def get_project(
     project_id: int,
+    mapper: RowMapper = Depends(SparseFields(PROJECT)),
     supabase: Client = Depends(get_db)
 ) -> dict:
     """
@@ -167,7 +276,7 @@ async def get_project(
         dict: Project data
     """
     try:
-        result = supabase.table("gtd_projects").select("*").eq("id", project_id).is_("deleted_at", "null").execute()
+        result = supabase.table("gtd_projects").select(mapper.select).eq("id", project_id).is_("deleted_at", "null").execute()
         
         if not result.data:
             raise HTTPException(
@@ -175,18 +284,7 @@ async def get_project(
                 detail="Project not found"
             )
         
-        project = result.data[0]
-        return {
-            "id": project["id"],
-            "name": project["project_name"] or f"Project {project['id']}",
-            "field_id": project["field_id"],
-            "done_status": project["done_status"],
-            "do_this_week": project["do_this_week"],
-            "keywords": project["keywords"],
-            "readings": project["readings"],
-            "created_at": project["created_at"],
-            "updated_at": project["updated_at"]
-        }
+        return fast_json(mapper.one(result.data[0]))
         
     except HTTPException:
         raise
@@ -194,4 +292,157 @@ async def get_project(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch project: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+def fetch_subtree(supabase: Client, user_id: str, project_id: int, select: str) -> List[dict]:
+    """
+    Get the projects of a subtree, with one closure table and one project query
+
+    Subprojects of a deleted project are left out along with it.
+
+    Args:
+        supabase: Supabase client
+        user_id: User ID
+        project_id: Root of the subtree
+        select: Project columns to select (id, parent_project_id are added)
+
+    Returns:
+        List[dict]: Project rows with their depth below the root, root first
+        and parents before their children; empty if the root does not exist
+    """
+    closure = supabase.table(CLOSURE_TABLE).select("descendant_id,depth").eq("ancestor_id", project_id).execute()
+    depths = {row["descendant_id"]: row["depth"] for row in closure.data or []}
+    if not depths:
+        return []
+
+    if select != "*":
+        select = ",".join(dict.fromkeys(select.split(",") + ["id", "parent_project_id"]))
+    query = supabase.table("gtd_projects").select(select).eq("user_id", user_id).is_("deleted_at", "null")
+    rows = query.in_("id", list(depths)).execute().data or []
+    rows.sort(key=lambda row: (depths[row["id"]], row["id"]))
+
+    subtree = []
+    included = set()
+    for row in rows:
+        if row["id"] == project_id or row.get("parent_project_id") in included:
+            row["depth"] = depths[row["id"]]
+            included.add(row["id"])
+            subtree.append(row)
+    return subtree
+
+
+def roll_up(subtree: List[dict]) -> List[dict]:
+    """
+    Add the task counts of each project and everything below it
+
+    Args:
+        subtree: Rows from ``fetch_subtree`` with ``attach_progress`` applied
+
+    Returns:
+        List[dict]: The same rows with subtree_open_tasks and subtree_done_tasks
+    """
+    by_id = {row["id"]: row for row in subtree}
+    for row in subtree:
+        row["subtree_open_tasks"] = row.get("open_tasks", 0)
+        row["subtree_done_tasks"] = row.get("done_tasks", 0)
+
+    # Children come after their parents: add up from the deepest level
+    for row in reversed(subtree):
+        parent = by_id.get(row.get("parent_project_id")) if row["depth"] else None
+        if parent is not None:
+            parent["subtree_open_tasks"] += row["subtree_open_tasks"]
+            parent["subtree_done_tasks"] += row["subtree_done_tasks"]
+    return subtree
+
+
+@router.get("/{project_id}/tree", response_class=FastJSONResponse)
+async def get_project_tree(
+    project_id: int,
+    mapper: RowMapper = Depends(SparseFields(PROJECT_TREE_NODE)),
+    supabase: Client = Depends(get_db)
+) -> List[dict]:
+    """
+    Get a project and all its subprojects, with task counts rolled up the tree
+    
+    Args:
+        project_id: The root project ID
+        
+    Returns:
+        List[dict]: Projects of the subtree, root first and parents before
+        their children, each with its depth below the root
+    """
+    try:
+        from app.config import get_settings
+        settings = get_settings()
+        default_user_id = settings.gtd.default_user_id
+        
+        subtree = fetch_subtree(supabase, default_user_id, project_id, mapper.select)
+        if not subtree:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+        
+        # Three queries for any tree size: closure, projects, task counts
+        if any(name != "depth" for name in mapper.computed):
+            subtree = roll_up(attach_progress(supabase, subtree))
+        
+        return fast_json(mapper.map(subtree))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch project tree: {str(e)}"
+        )
+
+
+@router.get("/{project_id}/tree/tasks", response_class=FastJSONResponse)
+async def get_project_tree_tasks(
+    project_id: int,
+    include_completed: bool = Query(False, description="Include completed tasks"),
+    mapper: RowMapper = Depends(SparseFields(TASK_SUMMARY)),
+    ordering: Ordering = Depends(SortOrder(TASK_SORT_COLUMNS)),
+    supabase: Client = Depends(get_db)
+) -> List[dict]:
+    """
+    Get the tasks of a project and all its subprojects
+    
+    Args:
+        project_id: The root project ID
+        include_completed: Include completed tasks
+        
+    Returns:
+        List[dict]: List of task data
+    """
+    try:
+        from app.config import get_settings
+        settings = get_settings()
+        default_user_id = settings.gtd.default_user_id
+        
+        subtree = fetch_subtree(supabase, default_user_id, project_id, "id")
+        if not subtree:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+        
+        query = supabase.table("gtd_tasks").select(mapper.select).eq("user_id", default_user_id)
+        query = query.in_("project_id", [row["id"] for row in subtree]).is_("deleted_at", "null")
+        
+        if not include_completed:
+            query = query.is_("done_at", "null")
+        
+        result = ordering.apply(query).execute()
+        
+        return fast_json(mapper.map(result.data))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch project tree tasks: {str(e)}"
+        )
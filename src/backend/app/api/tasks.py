@@ -1,18 +1,28 @@
 """
 Task API endpoints with Supabase direct connection
 """
+import logging
 from typing import List, Optional
 from datetime import datetime, date
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
-from supabase import Client
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query, Body
 
-from app.database import get_db
+from app.database import get_db, Client
 from app.config import get_settings
+from app.direct import get_direct_db, quote_columns
+from app.etag import ConditionalGet
+from app.events import get_change_bus
+from app.responses import FastJSONResponse, fast_json
+from app.fieldsets import SparseFields
+from app.schemas import TASK_DETAIL, TASK_SUMMARY, RowMapper
+from app.sorting import TASK_SORT_COLUMNS, Ordering, SortOrder
+from app.circuit import resilient_read
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
-@router.get("/")
+@router.get("/", response_class=FastJSONResponse)
 async def get_tasks(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
@@ -29,9 +39,13 @@ async def get_tasks(
     priority_min: Optional[int] = Query(None, ge=1, le=5, description="Filter by minimum priority"),
     priority_max: Optional[int] = Query(None, ge=1, le=5, description="Filter by maximum priority"),
     due_date: Optional[date] = Query(None, description="Filter by exact due date"),
-    overdue: Optional[bool] = Query(None, description="Filter by overdue status"),
+    due_after: Optional[date] = Query(None, description="Filter by due date after this date (exclusive)"),
+    due_before: Optional[date] = Query(None, description="Filter by due date before this date (exclusive)"),
+    overdue: Optional[bool] = Query(None, description="Filter by overdue status (open and due before today)"),
     include_deleted: bool = Query(False, description="Include soft-deleted tasks"),
     search: Optional[str] = Query(None, description="Search in task name"),
+    mapper: RowMapper = Depends(SparseFields(TASK_DETAIL)),
+    ordering: Ordering = Depends(SortOrder(TASK_SORT_COLUMNS)),
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
     """
@@ -39,14 +53,23 @@ async def get_tasks(
     
     Returns:
         List[dict]: List of task data
+
+    Raises:
+        HTTPException: 422 if due_after is not before due_before
     """
+    if due_after and due_before and due_after >= due_before:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="due_after must be before due_before"
+        )
+
     try:
         # Get default user ID for RLS compliance
         settings = get_settings()
         default_user_id = settings.gtd.default_user_id
         
         # Query tasks from Supabase
-        query = supabase.table("gtd_tasks").select("*")
+        query = supabase.table("gtd_tasks").select(mapper.select)
         
         # Add user filter for RLS compliance
         query = query.eq("user_id", default_user_id)
@@ -97,47 +120,34 @@ async def get_tasks(
         if due_date:
             query = query.eq("do_on_date", due_date.isoformat())  # Use actual column name
         
+        # Date ranges and overdue tasks are served by the partial indexes on
+        # (user_id, do_on_date) from sql/create_list_query_indexes.sql
+        if due_after:
+            query = query.gt("do_on_date", due_after.isoformat())
+        
+        if due_before:
+            query = query.lt("do_on_date", due_before.isoformat())
+        
+        if overdue is not None:
+            today = date.today().isoformat()
+            if overdue:
+                query = query.is_("done_at", "null").lt("do_on_date", today)
+            else:
+                query = query.or_(f"done_at.not.is.null,do_on_date.is.null,do_on_date.gte.{today}")
+        
         if search:
             query = query.ilike("task_name", f"%{search}%")
         
-        # Add pagination
+        # Add ordering and pagination
+        query = ordering.apply(query)
         query = query.range(skip, skip + limit - 1)
         
         # Execute query
         result = query.execute()
         
-        # Log the response for debugging
-        print(f"Query returned {len(result.data) if result.data else 0} tasks")
-        if not result.data:
-            return []  # Return empty list if no data
-        
-        # Transform data to match expected format
-        tasks = []
-        for task in result.data:
-            try:
-                tasks.append({
-                    "id": task.get("id"),
-                    "name": task.get("task_name") or f"Task {task.get('id', 'Unknown')}",
-                    "project_id": task.get("project_id"),
-                    "field_id": task.get("field_id"),
-                    "done_at": task.get("done_at"),
-                    "do_today": task.get("do_today", False),
-                    "do_this_week": task.get("do_this_week", False),
-                    "is_reading": task.get("is_reading", False),
-                    "wait_for": task.get("wait_for", False),
-                    "postponed": task.get("postponed", False),
-                    "reviewed": task.get("reviewed", False),
-                    "priority": task.get("priority"),
-                    "due_date": task.get("do_on_date"),  # Map do_on_date to due_date
-                    "created_at": task.get("created_at"),
-                    "updated_at": task.get("updated_at")
-                })
-            except Exception as task_error:
-                print(f"Error processing task {task.get('id', 'unknown')}: {task_error}")
-                print(f"Task data: {task}")
-                raise
-        
-        return tasks
+        logger.debug("Query returned %d tasks", len(result.data) if result.data else 0)
+        
+        return fast_json(mapper.map(result.data))
         
     except Exception as e:
         raise HTTPException(
@@ -146,8 +156,15 @@ async def get_tasks(
         )
 
 
-@router.get("/today")
+@router.get(
+    "/today",
+    response_class=FastJSONResponse,
+    dependencies=[Depends(ConditionalGet("tasks:today", ["gtd_tasks"]))]
+)
 async def get_today_tasks(
+    request: Request,
+    response: Response,
+    mapper: RowMapper = Depends(SparseFields(TASK_SUMMARY)),
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
     """
@@ -161,22 +178,17 @@ async def get_today_tasks(
         settings = get_settings()
         default_user_id = settings.gtd.default_user_id
         
-        result = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).eq("do_today", "true").is_("deleted_at", "null").execute()
+        def fetch():
+            result = supabase.table("gtd_tasks").select(mapper.select).eq("user_id", default_user_id).eq("do_today", "true").is_("deleted_at", "null").execute()
+            return mapper.map(result.data)
         
-        if not result.data:
-            return []
-        
-        return [{
-            "id": task.get("id"),
-            "name": task.get("task_name") or f"Task {task.get('id', 'Unknown')}",
-            "project_id": task.get("project_id"),
-            "field_id": task.get("field_id"),
-            "done_at": task.get("done_at"),
-            "do_today": task.get("do_today", True),
-            "created_at": task.get("created_at"),
-            "updated_at": task.get("updated_at")
-        } for task in result.data]
+        # Identical concurrent requests share one query; stale copy while Supabase is down
+        tasks = await resilient_read(request, response, default_user_id, fetch)
+        
+        return fast_json(tasks, response)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -184,8 +196,15 @@ async def get_today_tasks(
         )
 
 
-@router.get("/week")
+@router.get(
+    "/week",
+    response_class=FastJSONResponse,
+    dependencies=[Depends(ConditionalGet("tasks:week", ["gtd_tasks"]))]
+)
 async def get_week_tasks(
+    request: Request,
+    response: Response,
+    mapper: RowMapper = Depends(SparseFields(TASK_SUMMARY)),
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
     """
@@ -199,19 +218,17 @@ async def get_week_tasks(
         settings = get_settings()
         default_user_id = settings.gtd.default_user_id
         
-        result = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).eq("do_this_week", "true").is_("deleted_at", "null").execute()
+        def fetch():
+            result = supabase.table("gtd_tasks").select(mapper.select).eq("user_id", default_user_id).eq("do_this_week", "true").is_("deleted_at", "null").execute()
+            return mapper.map(result.data)
+        
+        # Identical concurrent requests share one query; stale copy while Supabase is down
+        tasks = await resilient_read(request, response, default_user_id, fetch)
         
-        return [{
-            "id": task["id"],
-            "name": task["task_name"] or f"Task {task['id']}",
-            "project_id": task["project_id"],
-            "field_id": task["field_id"],
-            "done_at": task["done_at"],
-            "do_this_week": task["do_this_week"],
-            "created_at": task["created_at"],
-            "updated_at": task["updated_at"]
-        } for task in result.data]
+        return fast_json(tasks, response)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -219,8 +236,9 @@ async def get_week_tasks(
         )
 
 
-@router.get("/waiting")
+@router.get("/waiting", response_class=FastJSONResponse)
 async def get_waiting_tasks(
+    mapper: RowMapper = Depends(SparseFields(TASK_SUMMARY)),
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
     """
@@ -234,18 +252,9 @@ async def get_waiting_tasks(
         settings = get_settings()
         default_user_id = settings.gtd.default_user_id
         
-        result = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).eq("wait_for", "true").is_("deleted_at", "null").execute()
+        result = supabase.table("gtd_tasks").select(mapper.select).eq("user_id", default_user_id).eq("wait_for", "true").is_("deleted_at", "null").execute()
         
-        return [{
-            "id": task["id"],
-            "name": task["task_name"] or f"Task {task['id']}",
-            "project_id": task["project_id"],
-            "field_id": task["field_id"],
-            "done_at": task["done_at"],
-            "wait_for": task["wait_for"],
-            "created_at": task["created_at"],
-            "updated_at": task["updated_at"]
-        } for task in result.data]
+        return fast_json(mapper.map(result.data))
         
     except Exception as e:
         raise HTTPException(
@@ -254,8 +263,9 @@ async def get_waiting_tasks(
         )
 
 
-@router.get("/reading")
+@router.get("/reading", response_class=FastJSONResponse)
 async def get_reading_tasks(
+    mapper: RowMapper = Depends(SparseFields(TASK_SUMMARY)),
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
     """
@@ -269,18 +279,9 @@ async def get_reading_tasks(
         settings = get_settings()
         default_user_id = settings.gtd.default_user_id
         
-        result = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).eq("is_reading", "true").is_("deleted_at", "null").execute()
+        result = supabase.table("gtd_tasks").select(mapper.select).eq("user_id", default_user_id).eq("is_reading", "true").is_("deleted_at", "null").execute()
         
-        return [{
-            "id": task["id"],
-            "name": task["task_name"] or f"Task {task['id']}",
-            "project_id": task["project_id"],
-            "field_id": task["field_id"],
-            "done_at": task["done_at"],
-            "is_reading": task["is_reading"],
-            "created_at": task["created_at"],
-            "updated_at": task["updated_at"]
-        } for task in result.data]
+        return fast_json(mapper.map(result.data))
         
     except Exception as e:
         raise HTTPException(
@@ -335,10 +336,11 @@ async def get_task_stats(
         )
 
 
-@router.get("/by-project/{project_id}")
+@router.get("/by-project/{project_id}", response_class=FastJSONResponse)
 async def get_tasks_by_project(
     project_id: int,
     include_completed: bool = Query(False, description="Include completed tasks"),
+    mapper: RowMapper = Depends(SparseFields(TASK_SUMMARY)),
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
     """
@@ -356,22 +358,14 @@ async def get_tasks_by_project(
         settings = get_settings()
         default_user_id = settings.gtd.default_user_id
         
-        query = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).eq("project_id", project_id).is_("deleted_at", "null")
+        query = supabase.table("gtd_tasks").select(mapper.select).eq("user_id", default_user_id).eq("project_id", project_id).is_("deleted_at", "null")
         
         if not include_completed:
             query = query.is_("done_at", "null")
         
         result = query.execute()
         
-        return [{
-            "id": task["id"],
-            "name": task["task_name"] or f"Task {task['id']}",
-            "project_id": task["project_id"],
-            "field_id": task["field_id"],
-            "done_at": task["done_at"],
-            "created_at": task["created_at"],
-            "updated_at": task["updated_at"]
-        } for task in result.data]
+        return fast_json(mapper.map(result.data))
         
     except Exception as e:
         raise HTTPException(
@@ -380,12 +374,13 @@ async def get_tasks_by_project(
         )
 
 
-@router.get("/search")
+@router.get("/search", response_class=FastJSONResponse)
 async def search_tasks(
     q: Optional[str] = Query(None, min_length=1, description="Search query (alias for query)"),
     query: Optional[str] = Query(None, min_length=1, description="Search query"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(20, ge=1, le=100, description="Maximum number of records to return"),
+    mapper: RowMapper = Depends(SparseFields(TASK_SUMMARY)),
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
     """
@@ -412,18 +407,26 @@ async def search_tasks(
                 detail="Either 'q' or 'query' parameter is required"
             )
         
-        result = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).ilike("task_name", f"%{search_term}%").is_("deleted_at", "null").range(skip, skip + limit - 1).execute()
+        direct = get_direct_db()
+        if direct is not None:
+            tasks = await direct.fetch(
+                "search_tasks",
+                f"SELECT {quote_columns(mapper.select)} FROM gtd_tasks "
+                "WHERE user_id = $1 AND task_name ILIKE $2 AND deleted_at IS NULL "
+                "ORDER BY id LIMIT $3 OFFSET $4",
+                default_user_id,
+                f"%{search_term}%",
+                limit,
+                skip
+            )
+            return fast_json(mapper.map(tasks))
+        
+        result = supabase.table("gtd_tasks").select(mapper.select).eq("user_id", default_user_id).ilike("task_name", f"%{search_term}%").is_("deleted_at", "null").range(skip, skip + limit - 1).execute()
         
-        return [{
-            "id": task["id"],
-            "name": task["task_name"] or f"Task {task['id']}",
-            "project_id": task["project_id"],
-            "field_id": task["field_id"],
-            "done_at": task["done_at"],
-            "created_at": task["created_at"],
-            "updated_at": task["updated_at"]
-        } for task in result.data]
+        return fast_json(mapper.map(result.data))
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -431,9 +434,10 @@ async def search_tasks(
         )
 
 
-@router.get("/{task_id}")
+@router.get("/{task_id}", response_class=FastJSONResponse)
 async def get_task(
     task_id: int,
+    mapper: RowMapper = Depends(SparseFields(TASK_DETAIL)),
     supabase: Client = Depends(get_db)
 ) -> dict:
     """
@@ -450,7 +454,7 @@ async def get_task(
         settings = get_settings()
         default_user_id = settings.gtd.default_user_id
         
-        result = supabase.table("gtd_tasks").select("*").eq("user_id", default_user_id).eq("id", task_id).is_("deleted_at", "null").execute()
+        result = supabase.table("gtd_tasks").select(mapper.select).eq("user_id", default_user_id).eq("id", task_id).is_("deleted_at", "null").execute()
         
         if not result.data:
             raise HTTPException(
@@ -458,24 +462,7 @@ async def get_task(
                 detail="Task not found"
             )
         
-        task = result.data[0]
-        return {
-            "id": task.get("id"),
-            "name": task.get("task_name") or f"Task {task.get('id', 'Unknown')}",
-            "project_id": task.get("project_id"),
-            "field_id": task.get("field_id"),
-            "done_at": task.get("done_at"),
-            "do_today": task.get("do_today", False),
-            "do_this_week": task.get("do_this_week", False),
-            "is_reading": task.get("is_reading", False),
-            "wait_for": task.get("wait_for", False),
-            "postponed": task.get("postponed", False),
-            "reviewed": task.get("reviewed", False),
-            "priority": task.get("priority"),
-            "due_date": task.get("do_on_date"),  # Map do_on_date to due_date
-            "created_at": task.get("created_at"),
-            "updated_at": task.get("updated_at")
-        }
+        return fast_json(mapper.one(result.data[0]))
         
     except HTTPException:
         raise
@@ -528,6 +515,7 @@ async def complete_task(
         update_data = {"done_at": (completion_time or datetime.now()).isoformat()}
         
         result = supabase.table("gtd_tasks").update(update_data).eq("id", task_id).execute()
+        get_change_bus().publish(default_user_id, "task", task_id, "update")
         
         return {"message": "Task completed successfully", "task_id": task_id}
         
@@ -580,6 +568,7 @@ async def reopen_task(
         update_data = {"done_at": None}
         
         result = supabase.table("gtd_tasks").update(update_data).eq("id", task_id).execute()
+        get_change_bus().publish(default_user_id, "task", task_id, "update")
         
         return {"message": "Task reopened successfully", "task_id": task_id}
         
@@ -632,6 +621,8 @@ async def delete_task(
             result = supabase.table("gtd_tasks").update(update_data).eq("id", task_id).execute()
             action = "soft deleted"
         
+        get_change_bus().publish(default_user_id, "task", task_id, "delete")
+        
         return {"message": f"Task {action} successfully"}
         
     except HTTPException:
@@ -4,15 +4,33 @@ Weekly Review API endpoints
 from typing import List
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from supabase import Client
 
-from app.database import get_db
+from app.database import get_db, Client
 from app.config import get_settings
+from app.direct import get_direct_db
+from app.events import get_change_bus
+from app.responses import FastJSONResponse, fast_json
+from app.schemas import PROJECT, TASK_DETAIL
 
 router = APIRouter(prefix="/weekly-review", tags=["weekly-review"])
 
+# Direct query path: the review criteria are applied in the database
+TASKS_TO_REVIEW_SQL = """
+SELECT * FROM gtd_tasks
+WHERE user_id = $1 AND deleted_at IS NULL AND done_at IS NULL
+  AND (reviewed IS NOT TRUE OR last_edited IS NULL OR last_edited < $2::timestamp)
+ORDER BY id
+"""
+
+PROJECTS_TO_REVIEW_SQL = """
+SELECT * FROM gtd_projects
+WHERE user_id = $1 AND deleted_at IS NULL AND done_status = false
+  AND (updated_at IS NULL OR updated_at < $2::timestamp)
+ORDER BY id
+"""
 
-@router.get("/tasks-to-review")
+
+@router.get("/tasks-to-review", response_class=FastJSONResponse)
 async def get_tasks_to_review(
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
@@ -33,7 +51,13 @@ async def get_tasks_to_review(
         default_user_id = settings.gtd.default_user_id
         
         # Calculate date 7 days ago
-        seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
+        seven_days_ago = datetime.now() - timedelta(days=7)
+        
+        direct = get_direct_db()
+        if direct is not None:
+            tasks = await direct.fetch("tasks_to_review", TASKS_TO_REVIEW_SQL, default_user_id, seven_days_ago)
+            return fast_json(TASK_DETAIL.map(tasks))
+        cutoff = seven_days_ago.isoformat()
         
         # Get tasks that haven't been reviewed or were reviewed more than 7 days ago
         query = supabase.table("gtd_tasks").select("*")
@@ -44,24 +68,13 @@ async def get_tasks_to_review(
         # Get all non-completed tasks first
         result = query.execute()
         
-        # Filter tasks that need review
-        tasks_to_review = []
-        for task in result.data:
-            # Include if never reviewed or reviewed more than 7 days ago
-            if not task.get("reviewed") or task.get("last_edited", "") < seven_days_ago:
-                tasks_to_review.append({
-                    "id": task.get("id"),
-                    "name": task.get("task_name") or f"Task {task.get('id', 'Unknown')}",
-                    "project_id": task.get("project_id"),
-                    "field_id": task.get("field_id"),
-                    "do_today": task.get("do_today", False),
-                    "do_this_week": task.get("do_this_week", False),
-                    "reviewed": task.get("reviewed", False),
-                    "last_edited": task.get("last_edited"),
-                    "created_at": task.get("created_at")
-                })
-        
-        return tasks_to_review
+        # Filter tasks that need review: never reviewed or reviewed more than 7 days ago
+        tasks_to_review = [
+            task for task in result.data
+            if not task.get("reviewed") or (task.get("last_edited") or "") < cutoff
+        ]
+        
+        return fast_json(TASK_DETAIL.map(tasks_to_review))
         
     except Exception as e:
         raise HTTPException(
@@ -70,7 +83,7 @@ async def get_tasks_to_review(
         )
 
 
-@router.get("/projects-to-review")
+@router.get("/projects-to-review", response_class=FastJSONResponse)
 async def get_projects_to_review(
     supabase: Client = Depends(get_db)
 ) -> List[dict]:
@@ -91,7 +104,13 @@ async def get_projects_to_review(
         default_user_id = settings.gtd.default_user_id
         
         # Calculate date 7 days ago
-        seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
+        seven_days_ago = datetime.now() - timedelta(days=7)
+        
+        direct = get_direct_db()
+        if direct is not None:
+            projects = await direct.fetch("projects_to_review", PROJECTS_TO_REVIEW_SQL, default_user_id, seven_days_ago)
+            return fast_json(PROJECT.map(projects))
+        cutoff = seven_days_ago.isoformat()
         
         # Get active projects
         query = supabase.table("gtd_projects").select("*")
@@ -101,23 +120,13 @@ async def get_projects_to_review(
         
         result = query.execute()
         
-        # Filter projects that need review
-        projects_to_review = []
-        for project in result.data:
-            # Include if not updated in last 7 days
-            if project.get("updated_at", "") < seven_days_ago:
-                projects_to_review.append({
-                    "id": project.get("id"),
-                    "name": project.get("project_name") or f"Project {project.get('id', 'Unknown')}",
-                    "field_id": project.get("field_id"),
-                    "done_status": project.get("done_status", False),
-                    "do_this_week": project.get("do_this_week", False),
-                    "keywords": project.get("keywords"),
-                    "updated_at": project.get("updated_at"),
-                    "created_at": project.get("created_at")
-                })
-        
-        return projects_to_review
+        # Filter projects that need review: not updated in last 7 days
+        projects_to_review = [
+            project for project in result.data
+            if (project.get("updated_at") or "") < cutoff
+        ]
+        
+        return fast_json(PROJECT.map(projects_to_review))
         
     except Exception as e:
         raise HTTPException(
@@ -157,6 +166,8 @@ async def mark_task_reviewed(
                 detail="Task not found"
             )
         
+        get_change_bus().publish(default_user_id, "task", task_id, "update")
+        
         return {"message": "Task marked as reviewed", "task_id": task_id}
         
     except HTTPException:
@@ -0,0 +1,197 @@
+"""
+Postgres LISTEN/NOTIFY change feed
+
+Listens for the notifications emitted by sql/create_change_notify_triggers.sql
+and dispatches them to in-process consumers (cache invalidation, the change
+bus for real-time clients), so every replica learns about writes made by other
+replicas or the ETL scripts.
+"""
+import asyncio
+import json
+import logging
+from typing import Callable, List, Optional
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Channel notify_gtd_change() publishes on; hardcoded in the SQL as well
+CHANNEL = "gtd_changes"
+
+# A handler receives a change dict, or None when changes may have been missed
+# (after (re)connecting) and everything derived from the data must be dropped.
+ChangeHandler = Callable[[Optional[dict]], None]
+
+
+class ChangeFeedListener:
+    """
+    Background task holding a LISTEN connection with automatic reconnection
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str = CHANNEL,
+        keepalive_seconds: float = 30.0,
+        reconnect_min_seconds: float = 1.0,
+        reconnect_max_seconds: float = 30.0
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.keepalive_seconds = keepalive_seconds
+        self.reconnect_min_seconds = reconnect_min_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+
+        self.connected = False
+        self.received = 0
+        self.reconnects = 0
+
+        self._handlers: List[ChangeHandler] = []
+        self._connection = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add_handler(self, handler: ChangeHandler) -> None:
+        """Register a consumer for change notifications"""
+        self._handlers.append(handler)
+
+    def start(self) -> None:
+        """Start listening in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="change-feed")
+
+    async def stop(self) -> None:
+        """Stop listening and close the connection"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Connect, listen until the connection is lost, back off, repeat"""
+        import asyncpg
+
+        delay = self.reconnect_min_seconds
+
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._connection = await asyncpg.connect(self.dsn)
+                self._connection.add_termination_listener(lambda _: lost.set())
+                await self._connection.add_listener(self.channel, self._on_notify)
+
+                self.connected = True
+                delay = self.reconnect_min_seconds
+                logger.info(f"Change feed listening on '{self.channel}'")
+
+                # Anything may have changed while we were not listening
+                self._dispatch(None)
+
+                await self._watch(lost)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change feed connection failed: {e}")
+            finally:
+                self.connected = False
+                await self._close()
+
+            self.reconnects += 1
+            logger.info(f"Change feed reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max_seconds)
+
+    async def _watch(self, lost: asyncio.Event) -> None:
+        """Wait for connection loss, probing the connection while idle"""
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), self.keepalive_seconds)
+            except asyncio.TimeoutError:
+                # Detect half-open connections that never report termination
+                await asyncio.wait_for(self._connection.fetchval("SELECT 1"), self.keepalive_seconds)
+
+        logger.warning("Change feed connection lost")
+
+    async def _close(self) -> None:
+        """Close the current connection, if any"""
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            try:
+                await asyncio.wait_for(connection.close(), 5)
+            except Exception:
+                connection.terminate()
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        """asyncpg notification callback"""
+        try:
+            data = json.loads(payload)
+            change = {
+                "entity": data["e"],
+                "id": data["id"],
+                "user_id": data["u"],
+                "op": data["op"],
+            }
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed change notification {payload!r}: {e}")
+            return
+
+        self.received += 1
+        self._dispatch(change)
+
+    def _dispatch(self, change: Optional[dict]) -> None:
+        """Hand a change to all handlers, isolating their failures"""
+        for handler in self._handlers:
+            try:
+                handler(change)
+            except Exception as e:
+                logger.error(f"Change feed handler {handler!r} failed: {e}", exc_info=True)
+
+
+# Global listener instance
+_change_feed: Optional[ChangeFeedListener] = None
+
+
+def get_change_feed() -> Optional[ChangeFeedListener]:
+    """
+    Get the running change feed listener, if any
+    """
+    return _change_feed
+
+
+def asyncpg_dsn(url: str) -> str:
+    """Convert a SQLAlchemy-style asyncpg URL to a plain libpq DSN"""
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def create_change_feed(settings: Settings) -> Optional[ChangeFeedListener]:
+    """
+    Create the global change feed listener from settings
+
+    Returns:
+        Optional[ChangeFeedListener]: Listener, or None if disabled or no
+        Postgres connection is configured
+    """
+    global _change_feed
+
+    if not settings.change_feed.enabled:
+        return None
+
+    try:
+        dsn = asyncpg_dsn(settings.database_url_asyncpg)
+    except ValueError as e:
+        logger.warning(f"Change feed disabled: {e}")
+        return None
+
+    if not dsn.startswith(("postgresql://", "postgres://")):
+        logger.warning("Change feed disabled: database URL is not a Postgres URL")
+        return None
+
+    _change_feed = ChangeFeedListener(
+        dsn,
+        keepalive_seconds=settings.change_feed.keepalive_seconds,
+        reconnect_max_seconds=settings.change_feed.reconnect_max_seconds,
+    )
+    return _change_feed
@@ -0,0 +1,357 @@
+"""
+Circuit breaker with stale-while-revalidate fallback for Supabase reads
+
+After repeated Supabase failures the circuit opens: reads fail fast instead
+of piling up on a struggling upstream, and views answered successfully
+before are served from their last known good result, flagged as stale.
+Once the reset timeout has passed a single background read probes Supabase;
+its success closes the circuit and refreshes the stale copy. A stale copy
+read before the request's own last write (see app.replica) is not served.
+"""
+import asyncio
+import logging
+import math
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+import httpx
+from fastapi import HTTPException, Request, Response, status
+
+from app.config import CircuitBreakerConfig, get_settings
+from app.deadlines import DeadlineExceeded
+from app.metrics import record_cache
+from app.replica import required_write
+from app.singleflight import coalesce, coalesce_timed, request_key
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+# SQLSTATE classes of server-side trouble: connection exception, insufficient
+# resources, operator intervention (e.g. statement timeout), system error, internal
+_UPSTREAM_SQLSTATE_CLASSES = ("08", "53", "57", "58", "XX")
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """
+    Check whether a read error means upstream is unhealthy
+
+    Transport errors, timeouts, 5xx responses and server-side SQL errors count;
+    errors caused by the request itself (bad filters, an exhausted deadline)
+    do not, so one client cannot open the circuit for everybody.
+
+    Args:
+        error: Error raised by the read
+
+    Returns:
+        bool: True if the error should count towards opening the circuit
+    """
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, (httpx.TransportError, TimeoutError, OSError)):
+        return True
+    # postgrest stays unimported until the first Supabase client is created
+    api_error = getattr(sys.modules.get("postgrest.exceptions"), "APIError", None)
+    if api_error is not None and isinstance(error, api_error):
+        if isinstance(error.code, int):
+            # No PostgREST error body: the HTTP status of the response
+            return error.code >= 500
+        # PGRST0xx: PostgREST cannot reach or use the database
+        code = error.code or ""
+        return code.startswith("PGRST0") or code[:2] in _UPSTREAM_SQLSTATE_CLASSES
+    sqlstate = getattr(error, "sqlstate", None)  # asyncpg errors of direct queries
+    return isinstance(sqlstate, str) and sqlstate[:2] in _UPSTREAM_SQLSTATE_CLASSES
+
+
+class CircuitBreaker:
+    """
+    Track upstream health from the outcome of reads
+
+    ``closed``: reads go through, consecutive failures are counted.
+    ``open``: reads are not attempted until the reset timeout has passed.
+    ``half_open``: one probe read is allowed; its outcome closes or reopens
+    the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started = 0.0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """
+        Check whether a read may be attempted now
+
+        Moves an open circuit to half-open once the reset timeout has passed;
+        the caller that gets True there is the probe.
+
+        Returns:
+            bool: True if the read should be attempted
+        """
+        now = time.monotonic()
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self._probe_started = now
+            logger.info(f"Circuit {self.name} half-open, probing upstream")
+            return True
+        if self.state == HALF_OPEN and now - self._probe_started >= self.reset_timeout:
+            # The previous probe never reported back
+            self._probe_started = now
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful read"""
+        if self.state != CLOSED:
+            logger.info(f"Circuit {self.name} closed, upstream recovered")
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """Record a failed read"""
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+            logger.warning(
+                f"Circuit {self.name} opened after {self.failures} failures, "
+                f"retrying in {self.reset_timeout:.0f}s"
+            )
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def retry_after(self) -> int:
+        """Seconds until the next probe may run"""
+        if self.state == CLOSED:
+            return 0
+        remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+        return max(1, math.ceil(remaining))
+
+    def stats(self) -> Dict[str, Any]:
+        """State and counters for the health endpoint"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "retry_after": self.retry_after(),
+        }
+
+
+class StaleCache:
+    """Last known good result per read key (least recently stored evicted)"""
+
+    def __init__(self, max_entries: int = 256, max_age: float = 86400.0):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+
+    def put(self, key: Hashable, value: Any, read_at: Optional[float] = None) -> None:
+        """
+        Store a result
+
+        Args:
+            key: Read key
+            value: Result
+            read_at: Epoch seconds the result was read at (default: now)
+        """
+        self._entries.pop(key, None)
+        self._entries[key] = (value, time.time() if read_at is None else read_at)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: Hashable, newer_than: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+        """
+        Get a stored result
+
+        Args:
+            key: Read key
+            newer_than: Epoch seconds the result must have been read after
+
+        Returns:
+            Optional[Tuple[Any, float]]: Result and its age in seconds, None if
+            missing, older than ``max_age`` or read before ``newer_than``
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if newer_than is not None and stored_at < newer_than:
+            return None
+        age = time.time() - stored_at
+        if age > self.max_age:
+            del self._entries[key]
+            return None
+        return value, age
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResilientReader:
+    """
+    Run view reads through the circuit breaker, keeping last known good results
+    """
+
+    def __init__(self, config: CircuitBreakerConfig):
+        self.config = config
+        self.breaker = CircuitBreaker(
+            "supabase",
+            failure_threshold=config.failure_threshold,
+            reset_timeout=config.reset_timeout_seconds
+        )
+        self.last_good = StaleCache(config.stale_max_entries, config.stale_max_age_seconds)
+        self.stale_served = 0
+        self._revalidations: Set[asyncio.Task] = set()
+
+    async def _fetch(self, request: Request, user_id: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Read through single-flight, feeding upstream failures to the breaker"""
+        try:
+            result, read_at = await coalesce_timed(request, user_id, fn, *args)
+        except HTTPException:
+            raise
+        except Exception as e:
+            if is_upstream_failure(e):
+                self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        self.last_good.put(request_key(request, user_id), result, read_at)
+        return result
+
+    def _revalidate(self, request: Request, user_id: str, fn: Callable[..., Any], *args: Any) -> None:
+        """Refresh a stale result in the background (the half-open probe)"""
+        async def refresh():
+            try:
+                await self._fetch(request, user_id, fn, *args)
+            except Exception as e:
+                logger.warning(f"Background revalidation of {request.url.path} failed: {e}")
+
+        task = asyncio.ensure_future(refresh())
+        self._revalidations.add(task)
+        task.add_done_callback(self._revalidations.discard)
+
+    async def read(
+        self,
+        request: Request,
+        response: Response,
+        user_id: str,
+        fn: Callable[..., Any],
+        *args: Any
+    ) -> Any:
+        """
+        Read a view, falling back to its last known good result
+
+        Stale results carry ``X-Data-Stale: true`` and an ``Age`` header and
+        lose the ETag, so clients neither cache them nor revalidate against
+        them.
+
+        Args:
+            request: Incoming request, used to key results
+            response: Sub-response receiving the stale flags
+            user_id: User the data belongs to
+            fn: Blocking or coroutine function producing the result
+            *args: Arguments for ``fn``
+
+        Returns:
+            Any: Fresh or stale result
+
+        Raises:
+            HTTPException: 503 if upstream is unavailable and nothing is cached;
+                the read's own error if the circuit breaker is disabled or the
+                error is not an upstream failure (see is_upstream_failure)
+        """
+        if not self.config.enabled:
+            return await coalesce(request, user_id, fn, *args)
+
+        stale = self.last_good.get(request_key(request, user_id), required_write())
+        error: Optional[Exception] = None
+
+        if self.breaker.state == CLOSED or stale is None:
+            if self.breaker.allow():
+                try:
+                    return await self._fetch(request, user_id, fn, *args)
+                except HTTPException:
+                    raise
+                except Exception as e:
+                    if not is_upstream_failure(e):
+                        raise
+                    error = e
+        elif self.breaker.allow():
+            # Answer from the stale copy now, probe upstream meanwhile
+            self._revalidate(request, user_id, fn, *args)
+
+        record_cache("stale_fallback", stale is not None)
+        if stale is None:
+            reason = error if error is not None else f"circuit {self.breaker.state}"
+            logger.warning(f"No stale result for {request.url.path}, upstream unavailable: {reason}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database temporarily unavailable, please retry",
+                headers={"Retry-After": str(max(1, self.breaker.retry_after()))}
+            )
+
+        value, age = stale
+        self.stale_served += 1
+        logger.info(f"Serving stale {request.url.path} ({age:.0f}s old, circuit {self.breaker.state})")
+        if "etag" in response.headers:
+            del response.headers["etag"]
+        response.headers["Cache-Control"] = "no-store"
+        response.headers["Age"] = str(int(age))
+        response.headers["X-Data-Stale"] = "true"
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state and stale cache counters for the health endpoint"""
+        return {
+            **self.breaker.stats(),
+            "stale_entries": len(self.last_good),
+            "stale_served": self.stale_served,
+        }
+
+
+# Global reader, created on first use
+_reader: Optional[ResilientReader] = None
+
+
+def get_resilient_reader() -> ResilientReader:
+    """
+    Get the process-wide resilient reader
+    """
+    global _reader
+    if _reader is None:
+        _reader = ResilientReader(get_settings().circuit_breaker)
+    return _reader
+
+
+def upstream_available() -> bool:
+    """
+    Check whether Supabase is worth querying (circuit not open)
+
+    Used by optional queries (e.g. ETag markers) that should be skipped
+    rather than wait on an unhealthy upstream.
+    """
+    reader = get_resilient_reader()
+    return not reader.config.enabled or reader.breaker.state == CLOSED
+
+
+async def resilient_read(
+    request: Request,
+    response: Response,
+    user_id: str,
+    fn: Callable[..., Any],
+    *args: Any
+) -> Any:
+    """
+    Read a view through the circuit breaker (see ResilientReader.read)
+    """
+    return await get_resilient_reader().read(request, response, user_id, fn, *args)
@@ -7,16 +7,32 @@ from pathlib import Path
 import yaml
 from pydantic import BaseModel
 from functools import lru_cache
-from dotenv import load_dotenv, find_dotenv
 
-# Load environment variables from .env file using find_dotenv()
-# This automatically searches up the directory tree to find the .env file
-dotenv_path = find_dotenv()
-if dotenv_path:
-    load_dotenv(dotenv_path)
-    print(f"Loaded .env from: {dotenv_path}")
-else:
-    print("Warning: No .env file found")
+# Resolved paths are exported to the environment so worker processes
+# inherit them instead of searching the filesystem again
+DOTENV_PATH_ENV = "GTD_DOTENV_PATH"
+CONFIG_PATH_ENV = "GTD_CONFIG_PATH"
+
+
+def _load_dotenv() -> None:
+    """Load environment variables from .env, once per process tree"""
+    if DOTENV_PATH_ENV in os.environ:
+        # Loaded by a parent process; its variables are inherited
+        return
+
+    from dotenv import load_dotenv, find_dotenv
+
+    # find_dotenv() searches up the directory tree to find the .env file
+    dotenv_path = find_dotenv()
+    if dotenv_path:
+        load_dotenv(dotenv_path)
+        print(f"Loaded .env from: {dotenv_path}")
+    else:
+        print("Warning: No .env file found")
+    os.environ[DOTENV_PATH_ENV] = dotenv_path
+
+
+_load_dotenv()
 
 
 class DatabaseConfig(BaseModel):
@@ -53,6 +69,17 @@ class ServerConfig(BaseModel):
     """Server configuration"""
     host: str
     port: int
+    # Production profile (gunicorn.conf.py); WEB_CONCURRENCY overrides workers
+    workers: Optional[int] = None  # None: one per available CPU (cgroup aware)
+    workers_per_core: float = 1.0
+    max_workers: int = 8
+    preload: bool = True  # import the app once in the master, share it copy-on-write
+    timeout_seconds: int = 60  # restart workers silent for this long
+    graceful_timeout_seconds: int = 30
+    keepalive_seconds: int = 5
+    # Proxies (addresses or CIDRs) whose X-Forwarded-For / X-Forwarded-Proto are
+    # trusted for the client address; FORWARDED_ALLOW_IPS overrides
+    forwarded_allow_ips: str = "127.0.0.1,::1"
 
 
 class ApiConfig(BaseModel):
@@ -67,6 +94,11 @@ class LoggingConfig(BaseModel):
     """Logging configuration"""
     level: str
     format: str
+    json_format: bool = False  # one JSON object per line instead of ``format``
+    queue_size: int = 10000  # records buffered for the writer thread; more are dropped
+    access_log: bool = True
+    access_sample_rate: float = 1.0  # share of successful, fast requests logged
+    slow_request_ms: int = 1000  # slower requests are always logged
 
 
 class PaginationConfig(BaseModel):
@@ -91,6 +123,124 @@ class FeaturesConfig(BaseModel):
     export_import: bool
 
 
+class RealtimeConfig(BaseModel):
+    """Real-time change stream configuration"""
+    coalesce_ms: int = 250
+    heartbeat_seconds: int = 15
+    max_pending: int = 500
+
+
+class ChangeFeedConfig(BaseModel):
+    """Postgres LISTEN/NOTIFY change feed configuration"""
+    enabled: bool = False
+    keepalive_seconds: int = 30
+    reconnect_max_seconds: int = 30
+
+
+class SingleFlightConfig(BaseModel):
+    """Coalescing of identical concurrent reads"""
+    enabled: bool = True
+
+
+class ExportConfig(BaseModel):
+    """Data export configuration"""
+    page_size: int = 1000
+
+
+class CircuitBreakerConfig(BaseModel):
+    """Circuit breaker and stale fallback for Supabase reads"""
+    enabled: bool = True
+    failure_threshold: int = 5
+    reset_timeout_seconds: float = 30.0
+    stale_max_age_seconds: float = 86400.0
+    stale_max_entries: int = 256
+
+
+class RateBudgetConfig(BaseModel):
+    """Token bucket of one request class"""
+    rate: float
+    burst: int
+    max_concurrent: Optional[int] = None
+
+
+class RateLimitConfig(BaseModel):
+    """Per-user admission control"""
+    enabled: bool = True
+    backend: str = "memory"  # memory or redis (shared by all replicas)
+    redis_url: Optional[str] = None
+    read: RateBudgetConfig = RateBudgetConfig(rate=20, burst=100)
+    expensive: RateBudgetConfig = RateBudgetConfig(rate=1, burst=10, max_concurrent=2)
+    expensive_prefixes: List[str] = [
+        "/api/export",
+        "/api/import",
+        "/api/dashboard",
+        "/api/search",
+        "/api/tasks/search",
+    ]
+    # Batches are not charged themselves; each operation is charged on dispatch
+    exempt_prefixes: List[str] = ["/api/batch", "/api/views"]
+
+
+class DeadlineConfig(BaseModel):
+    """Per-route request deadlines (milliseconds, null for no deadline)"""
+    enabled: bool = True
+    default_ms: Optional[int] = 10000
+    # Time handlers get after the deadline to answer before being cancelled
+    cancel_grace_ms: int = 250
+    # Longest matching path prefix wins
+    routes: Dict[str, Optional[int]] = {
+        "/api/export": None,
+        "/api/import": None,
+        "/api/events": None,
+    }
+
+
+class MetricsConfig(BaseModel):
+    """Prometheus metrics at /metrics"""
+    enabled: bool = True
+
+
+class TracingConfig(BaseModel):
+    """Per-request Supabase call tracing"""
+    enabled: bool = True
+    server_timing: bool = True
+    log_queries: bool = True  # at debug level
+    otel_enabled: bool = False
+    otel_endpoint: str = "http://localhost:4318/v1/traces"
+    otel_service_name: str = "gtd-backend"
+
+
+class HealthConfig(BaseModel):
+    """Background database health check behind the readiness probe"""
+    check_interval_seconds: float = 15.0
+    timeout_seconds: float = 5.0
+    failure_threshold: int = 3  # consecutive failures before not ready
+    max_age_seconds: float = 60.0  # a success this recent keeps the pod ready
+
+
+class ReplicaConfig(BaseModel):
+    """Read replica for PostgREST reads (see app/replica.py)"""
+    enabled: bool = False
+    url: Optional[str] = None  # replica API URL; SUPABASE_REPLICA_URL overrides
+    max_lag_seconds: float = 5.0  # read from the primary above this lag
+    margin_seconds: float = 0.5  # safety margin on top of the measured lag
+    lag_check_interval_seconds: float = 2.0
+    failure_cooldown_seconds: float = 30.0
+    lag_function: str = "gtd_replication_lag"
+
+
+class DirectQueryConfig(BaseModel):
+    """asyncpg pool for the heaviest reads, bypassing PostgREST (see app/direct.py)"""
+    enabled: bool = False
+    min_connections: int = 1
+    max_connections: int = 5
+    # Prepared statements kept per connection; 0 for transaction-mode
+    # poolers (Supavisor port 6543, PgBouncer) that cannot keep them
+    statement_cache_size: int = 100
+    command_timeout_seconds: float = 10.0
+    idle_timeout_seconds: float = 300.0  # close connections idle this long
+
+
 class Settings(BaseModel):
     """Main settings class that loads from YAML"""
     app: AppConfig
@@ -103,6 +253,18 @@ class Settings(BaseModel):
     pagination: PaginationConfig
     gtd: GTDConfig
     features: FeaturesConfig
+    realtime: RealtimeConfig = RealtimeConfig()
+    change_feed: ChangeFeedConfig = ChangeFeedConfig()
+    single_flight: SingleFlightConfig = SingleFlightConfig()
+    export: ExportConfig = ExportConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    circuit_breaker: CircuitBreakerConfig = CircuitBreakerConfig()
+    deadlines: DeadlineConfig = DeadlineConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    tracing: TracingConfig = TracingConfig()
+    health: HealthConfig = HealthConfig()
+    replica: ReplicaConfig = ReplicaConfig()
+    direct_queries: DirectQueryConfig = DirectQueryConfig()
     
     @classmethod
     def from_yaml(cls, config_path: Path) -> "Settings":
@@ -154,15 +316,21 @@ class Settings(BaseModel):
         return self.app.environment == "testing" or os.getenv("PYTEST_CURRENT_TEST") is not None
 
 
-@lru_cache()
-def get_settings() -> Settings:
-    """Get cached settings instance"""
-    # Determine config file path - use relative paths only
-    config_file = os.getenv("CONFIG_FILE", "config.yaml")
-    
+def resolve_config_path(config_file: str) -> Path:
+    """
+    Find a configuration file in the usual locations
+
+    Args:
+        config_file: File name, e.g. "config.yaml"
+
+    Returns:
+        Path: First existing candidate
+
+    Raises:
+        FileNotFoundError: If no candidate exists
+    """
     # Start from this file's directory (app/)
     current_path = Path(__file__).parent
-    config_path = None
     
     # Try common relative paths from app directory
     search_paths = [
@@ -193,12 +361,25 @@ def get_settings() -> Settings:
     # Find the first existing path
     for path in search_paths:
         if path.exists():
-            config_path = path
-            break
+            return path.resolve()
+    
+    searched_paths = "\n".join(str(p) for p in search_paths)
+    raise FileNotFoundError(f"Configuration file '{config_file}' not found. Searched paths:\n{searched_paths}")
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    """Get cached settings instance"""
+    # Determine config file path - use relative paths only
+    config_file = os.getenv("CONFIG_FILE", "config.yaml")
     
-    if not config_path:
-        searched_paths = "\n".join(str(p) for p in search_paths)
-        raise FileNotFoundError(f"Configuration file '{config_file}' not found. Searched paths:\n{searched_paths}")
+    # Reuse the path resolved by a parent process for the same file
+    cached = os.getenv(CONFIG_PATH_ENV)
+    if cached and Path(cached).name == Path(config_file).name and Path(cached).exists():
+        config_path = Path(cached)
+    else:
+        config_path = resolve_config_path(config_file)
+        os.environ[CONFIG_PATH_ENV] = str(config_path)
     
     return Settings.from_yaml(config_path)
 
@@ -1,9 +1,22 @@
 """
 Supabase client configuration and connection management
 """
-from typing import Optional
-from supabase import create_client, Client
+import logging
+from typing import TYPE_CHECKING, Any, Optional
 from app.config import get_settings
+from app.deadlines import install_deadline_hooks
+from app.metrics import install_metrics_transport
+from app.replica import install_replica_routing
+from app.tracing import install_tracing_transport
+
+if TYPE_CHECKING:
+    from supabase import Client
+else:
+    # supabase (auth, storage, realtime clients) takes a third of the app's
+    # import time; it is imported when the first client is created
+    Client = Any
+
+logger = logging.getLogger(__name__)
 
 # Global Supabase client instance
 _supabase_client: Optional[Client] = None
@@ -30,8 +43,16 @@ def get_supabase_client() -> Client:
             raise ValueError("Missing Supabase URL or service role key")
         
         # Create Supabase client
+        from supabase import create_client
         _supabase_client = create_client(supabase_url, service_key)
         
+        # Bound every PostgREST call by the deadline of the request making it
+        install_deadline_hooks(_supabase_client.postgrest.session)
+        # Innermost, so metrics and traces show the primary fallback as one call
+        install_replica_routing(_supabase_client.postgrest.session)
+        install_metrics_transport(_supabase_client.postgrest.session)
+        install_tracing_transport(_supabase_client.postgrest.session)
+        
     return _supabase_client
 
 def test_connection() -> bool:
@@ -44,7 +65,7 @@ def test_connection() -> bool:
         result = client.table("gtd_projects").select("count", count="exact").limit(1).execute()
         return True
     except Exception as e:
-        print(f"Supabase connection test failed: {e}")
+        logger.warning(f"Supabase connection test failed: {e}")
         return False
 
 # Dependency function for FastAPI
@@ -0,0 +1,231 @@
+"""
+Per-request deadlines propagated into outbound Supabase calls
+
+Every request gets a time budget from ``deadlines`` in the configuration
+(longest matching path prefix, else the default). The remaining budget caps
+the HTTP timeouts of each PostgREST call made while serving the request, so
+a stuck upstream cannot hold a worker longer than the deadline. When the
+deadline passes, the handler is cancelled and the client gets a 504 with
+timing details.
+"""
+import contextvars
+import json
+import logging
+import math
+import time
+from typing import Any, Dict, Optional
+
+import anyio
+import httpx
+
+from app.config import DeadlineConfig, get_settings
+
+logger = logging.getLogger(__name__)
+
+_TIMEOUT_KEYS = ("connect", "read", "write", "pool")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised instead of starting an outbound call after the deadline"""
+
+
+class Deadline:
+    """Time budget and outbound call accounting of one request"""
+
+    def __init__(self, route: str, budget: float, parent: Optional["Deadline"] = None):
+        """
+        Args:
+            route: Request path
+            budget: Seconds the request may take
+            parent: Deadline of an enclosing request (batch operations); the
+                tighter of both applies
+        """
+        self.route = route
+        self.budget = budget
+        self.started = time.monotonic()
+        self.expires_at = self.started + budget
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self.db_calls = 0
+        self.db_seconds = 0.0
+        self.pending_call: Optional[str] = None
+
+    def remaining(self) -> float:
+        """Seconds left (negative once exceeded)"""
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def details(self) -> Dict[str, Any]:
+        """Timing details for the 504 response"""
+        return {
+            "route": self.route,
+            "deadline_ms": round((self.expires_at - self.started) * 1000),
+            "elapsed_ms": round(self.elapsed() * 1000, 1),
+            "db_calls": self.db_calls,
+            "db_ms": round(self.db_seconds * 1000, 1),
+            "pending_db_call": self.pending_call,
+        }
+
+
+# Deadline of the request being served (copied into threadpool workers)
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "current_deadline", default=None
+)
+
+
+def get_current_deadline() -> Optional[Deadline]:
+    """
+    Get the deadline of the request being served, if any
+    """
+    return _current_deadline.get()
+
+
+def _describe(request: httpx.Request) -> str:
+    """Short name of an outbound call, e.g. ``GET gtd_tasks``"""
+    return f"{request.method} {request.url.path.rsplit('/', 1)[-1]}"
+
+
+def _on_request(request: httpx.Request) -> None:
+    """httpx request hook: cap the call's timeouts by the remaining budget"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return
+
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(
+            f"Deadline of {deadline.route} exceeded before {_describe(request)}"
+        )
+
+    timeout = dict(request.extensions.get("timeout") or {})
+    for key in _TIMEOUT_KEYS:
+        current = timeout.get(key)
+        timeout[key] = remaining if current is None else min(current, remaining)
+    request.extensions["timeout"] = timeout
+
+    deadline.db_calls += 1
+    deadline.pending_call = _describe(request)
+    request.extensions["deadline_started"] = time.monotonic()
+
+
+def _on_response(response: httpx.Response) -> None:
+    """httpx response hook: account the call's duration"""
+    deadline = _current_deadline.get()
+    started = response.request.extensions.get("deadline_started")
+    if deadline is None or started is None:
+        return
+    deadline.db_seconds += time.monotonic() - started
+    deadline.pending_call = None
+
+
+def install_deadline_hooks(session: httpx.Client) -> None:
+    """
+    Make an httpx client honour request deadlines
+
+    Args:
+        session: Client used for outbound calls (e.g. ``supabase.postgrest.session``)
+    """
+    if _on_request not in session.event_hooks["request"]:
+        session.event_hooks["request"].append(_on_request)
+        session.event_hooks["response"].append(_on_response)
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware enforcing per-route deadlines
+
+    Handlers usually turn failed Supabase calls into 5xx errors; a 5xx
+    produced after the deadline passed is answered as 504 instead.
+    """
+
+    def __init__(self, app, config: Optional[DeadlineConfig] = None):
+        self.app = app
+        self.config = config or get_settings().deadlines
+        self.exceeded = 0
+
+    def budget_for(self, path: str) -> Optional[float]:
+        """
+        Get the deadline of a path in seconds
+
+        Returns:
+            Optional[float]: Budget, None for routes without a deadline
+        """
+        match = None
+        for prefix in self.config.routes:
+            if path.startswith(prefix) and (match is None or len(prefix) > len(match)):
+                match = prefix
+        budget_ms = self.config.routes[match] if match is not None else self.config.default_ms
+        return budget_ms / 1000 if budget_ms else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.config.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.budget_for(scope["path"])
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        deadline = Deadline(scope["path"], budget, parent=_current_deadline.get())
+        token = _current_deadline.set(deadline)
+        started = False
+        replaced = False
+
+        # Outbound calls time out at the deadline; the handler is cancelled
+        # only a grace period later, so it can still answer (e.g. from a
+        # stale copy) or fail with the upstream timeout.
+        grace = self.config.cancel_grace_ms / 1000
+        cancel_scope = anyio.CancelScope(deadline=anyio.current_time() + max(0.0, deadline.remaining()) + grace)
+
+        async def send_with_deadline(message):
+            nonlocal started, replaced
+            if message["type"] == "http.response.start":
+                started = True
+                # Never cut off a response that has begun
+                cancel_scope.deadline = math.inf
+                if message["status"] >= 500 and deadline.expired():
+                    replaced = True
+                    await self._timeout_response(send, deadline)
+                    return
+            elif replaced:
+                return
+            await send(message)
+
+        try:
+            with cancel_scope:
+                await self.app(scope, receive, send_with_deadline)
+        finally:
+            _current_deadline.reset(token)
+
+        if cancel_scope.cancelled_caught:
+            if started:
+                logger.warning(f"Deadline exceeded after response start: {deadline.details()}")
+            else:
+                await self._timeout_response(send, deadline)
+
+    async def _timeout_response(self, send, deadline: Deadline) -> None:
+        """Send a 504 response with the request's timing details"""
+        self.exceeded += 1
+        details = deadline.details()
+        logger.warning(f"Deadline exceeded: {details}")
+        body = json.dumps({
+            "error": "Gateway Timeout",
+            "detail": f"Request exceeded its {details['deadline_ms']} ms deadline",
+            **details
+        }).encode("utf-8")
+
+        await send({
+            "type": "http.response.start",
+            "status": 504,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
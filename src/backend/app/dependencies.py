@@ -1,6 +1,54 @@
 """
-FastAPI dependencies for Supabase database connection
+FastAPI dependencies for Supabase database connection and authentication
 """
-from fastapi import HTTPException, status
+from typing import Optional
 
-# For now, disable user authentication until Supabase migration is complete
\ No newline at end of file
+from fastapi import Header, HTTPException, status
+
+from app.config import get_settings
+
+
+def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
+    """
+    Resolve the user of a request
+
+    While ``features.authentication_enabled`` is off every request acts as
+    the configured default user. Otherwise a bearer JWT signed with
+    ``security.secret_key`` is required and its ``sub`` claim is the user ID.
+
+    Returns:
+        str: User ID
+
+    Raises:
+        HTTPException: 401 if the token is missing or invalid
+    """
+    settings = get_settings()
+    if not settings.features.authentication_enabled:
+        return settings.gtd.default_user_id
+
+    unauthorized = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise unauthorized
+
+    from jose import JWTError, jwt
+
+    try:
+        claims = jwt.decode(
+            token,
+            settings.security.secret_key,
+            algorithms=[settings.security.algorithm],
+            options={"verify_aud": False}
+        )
+    except JWTError:
+        raise unauthorized
+
+    user_id = claims.get("sub")
+    if not user_id:
+        raise unauthorized
+    return user_id
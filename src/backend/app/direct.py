@@ -0,0 +1,253 @@
+"""
+Direct asyncpg queries for the heaviest reads
+
+Dashboard aggregates, the weekly review, exports and search are answered
+from an asyncpg pool on ``DATABASE_URL`` when ``direct_queries.enabled`` is
+set, instead of through PostgREST. That saves PostgREST's JSON rendering and
+our JSON parsing: asyncpg runs every query as a prepared statement (cached
+per connection) and decodes the rows from Postgres' binary format.
+
+Rows come back as dicts shaped like PostgREST's: dates, timestamps and UUIDs
+as ISO strings, numerics as floats, so the same mappers and encoders serve
+both paths. Queries honour the request deadline and are recorded in the
+request trace and the metrics under their name.
+
+Without a configured pool (or when it cannot connect at startup) the
+endpoints use PostgREST as before.
+"""
+import logging
+import time
+from operator import methodcaller
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.change_feed import asyncpg_dsn
+from app.config import DirectQueryConfig, Settings
+from app.deadlines import DeadlineExceeded, get_current_deadline
+from app.metrics import record_direct_query
+from app.tracing import QueryRecord, get_current_trace, record_query
+
+logger = logging.getLogger(__name__)
+
+# Conversions of asyncpg's decoded values to PostgREST's JSON values
+_isoformat = methodcaller("isoformat")
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "date": _isoformat,
+    "timestamp": _isoformat,
+    "timestamptz": _isoformat,
+    "time": _isoformat,
+    "timetz": _isoformat,
+    "uuid": str,
+    "numeric": float,
+}
+
+
+class RowDecoder:
+    """
+    Converter from the records of one statement to PostgREST-like dicts
+
+    The columns needing conversion are looked up once from the statement's
+    result types, not per value.
+    """
+
+    def __init__(self, attributes: Sequence[Any]):
+        """
+        Args:
+            attributes: Result columns (``PreparedStatement.get_attributes()``)
+        """
+        self.columns = tuple(attribute.name for attribute in attributes)
+        self.converters = tuple(
+            (index, _CONVERTERS[attribute.type.name])
+            for index, attribute in enumerate(attributes)
+            if attribute.type.name in _CONVERTERS
+        )
+
+    def __call__(self, records: Sequence[Any]) -> List[Dict[str, Any]]:
+        columns = self.columns
+        if not self.converters:
+            return [dict(zip(columns, record)) for record in records]
+
+        converters = self.converters
+        rows = []
+        for record in records:
+            values = list(record)
+            for index, convert in converters:
+                value = values[index]
+                if value is not None:
+                    values[index] = convert(value)
+            rows.append(dict(zip(columns, values)))
+        return rows
+
+
+def quote_columns(select: str, table: str = "") -> str:
+    """
+    Turn a PostgREST select list of plain columns into SQL
+
+    Args:
+        select: ``"*"`` or comma separated column names (``RowMapper.select``)
+        table: Table alias to qualify the columns with, for joins
+    """
+    prefix = f"{table}." if table else ""
+    if select == "*":
+        return prefix + "*"
+    return ", ".join(prefix + '"' + column.replace('"', '""') + '"' for column in select.split(","))
+
+
+class DirectDatabase:
+    """
+    asyncpg connection pool with named, traced queries
+    """
+
+    def __init__(self, dsn: str, config: DirectQueryConfig):
+        """
+        Args:
+            dsn: Postgres connection string
+            config: Pool configuration
+        """
+        self.dsn = dsn
+        self.config = config
+        self.pool = None
+        self._decoders: Dict[str, RowDecoder] = {}
+
+    async def start(self) -> bool:
+        """
+        Open the pool
+
+        Returns:
+            bool: Whether the database could be reached
+        """
+        import asyncpg
+
+        try:
+            self.pool = await asyncpg.create_pool(
+                self.dsn,
+                min_size=self.config.min_connections,
+                max_size=self.config.max_connections,
+                statement_cache_size=self.config.statement_cache_size,
+                command_timeout=self.config.command_timeout_seconds,
+                max_inactive_connection_lifetime=self.config.idle_timeout_seconds,
+            )
+        except Exception as e:
+            logger.warning(f"Direct queries disabled, using PostgREST: {e}")
+            self.pool = None
+            return False
+        return True
+
+    async def stop(self) -> None:
+        """Close the pool"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def fetch(self, name: str, query: str, *args: Any) -> List[Dict[str, Any]]:
+        """
+        Run a read query
+
+        Args:
+            name: Query name for traces and metrics, e.g. "dashboard_stats"
+            query: SQL with ``$n`` placeholders
+            *args: Parameters
+
+        Returns:
+            List[Dict[str, Any]]: Rows as PostgREST-like dicts
+
+        Raises:
+            DeadlineExceeded: If the request's deadline has already passed
+        """
+        timeout = self.config.command_timeout_seconds
+        deadline = get_current_deadline()
+        if deadline is not None:
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"Deadline of {deadline.route} exceeded before SQL {name}")
+            timeout = min(timeout, remaining)
+            deadline.db_calls += 1
+            deadline.pending_call = f"SQL {name}"
+
+        record = QueryRecord(name, "sql", "direct", time.time(), 0.0)
+        start = time.perf_counter()
+        ok = False
+        try:
+            async with self.pool.acquire(timeout=timeout) as connection:
+                # Runs as a prepared statement from the connection's cache
+                records = await connection.fetch(query, *args, timeout=timeout)
+                decode = self._decoders.get(query)
+                if decode is None or (records and decode.columns != tuple(records[0].keys())):
+                    # Result types, looked up once per query (again if "*" changed)
+                    statement = await connection.prepare(query, timeout=timeout)
+                    decode = self._decoders[query] = RowDecoder(statement.get_attributes())
+            rows = decode(records)
+            record.rows = len(rows)
+            ok = True
+            return rows
+        finally:
+            duration = time.perf_counter() - start
+            record_direct_query(name, ok, duration)
+            if deadline is not None:
+                deadline.db_seconds += duration
+                deadline.pending_call = None
+            trace = get_current_trace()
+            if trace is not None:
+                record.duration = duration
+                record_query(trace, record)
+
+    async def fetchrow(self, name: str, query: str, *args: Any) -> Optional[Dict[str, Any]]:
+        """
+        Run a query returning at most one row (see ``fetch``)
+        """
+        rows = await self.fetch(name, query, *args)
+        return rows[0] if rows else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool usage for the health endpoint"""
+        if self.pool is None:
+            return {"enabled": True, "connected": False}
+        return {
+            "enabled": True,
+            "connected": True,
+            "connections": self.pool.get_size(),
+            "idle": self.pool.get_idle_size(),
+            "max_connections": self.pool.get_max_size(),
+        }
+
+
+# Global pool, set by create_direct_db
+_direct_db: Optional[DirectDatabase] = None
+
+
+def get_direct_db() -> Optional[DirectDatabase]:
+    """
+    Get the direct query pool, if configured and connected
+
+    Returns:
+        Optional[DirectDatabase]: Pool, None to use PostgREST
+    """
+    if _direct_db is None or _direct_db.pool is None:
+        return None
+    return _direct_db
+
+
+def create_direct_db(settings: Settings) -> Optional[DirectDatabase]:
+    """
+    Create the global direct query pool from settings (started by the lifespan)
+
+    Returns:
+        Optional[DirectDatabase]: Pool, or None if disabled or no Postgres
+        connection is configured
+    """
+    global _direct_db
+
+    if not settings.direct_queries.enabled:
+        return None
+
+    try:
+        dsn = asyncpg_dsn(settings.database_url_asyncpg)
+    except ValueError as e:
+        logger.warning(f"Direct queries disabled: {e}")
+        return None
+
+    if not dsn.startswith(("postgresql://", "postgres://")):
+        logger.warning("Direct queries disabled: database URL is not a Postgres URL")
+        return None
+
+    _direct_db = DirectDatabase(dsn, settings.direct_queries)
+    return _direct_db
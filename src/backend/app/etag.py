@@ -0,0 +1,217 @@
+"""
+ETag / conditional GET support for read endpoints
+"""
+import hashlib
+import logging
+from datetime import date
+from typing import Dict, Optional, Sequence, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from app.database import get_db, Client
+from app.config import get_settings
+from app.change_feed import get_change_feed
+from app.circuit import upstream_available
+from app.metrics import record_cache
+from app.replica import primary_reads
+
+logger = logging.getLogger(__name__)
+
+# Tables of the entities reported by the change feed
+ENTITY_TABLES = {"task": "gtd_tasks", "project": "gtd_projects"}
+
+# Database function computing change markers
+MARKER_FUNCTION = "gtd_change_marker"
+
+# Change markers cached while the change feed keeps them fresh
+_marker_cache: Dict[Tuple[str, str], str] = {}
+_marker_generation = 0
+_marker_function_missing = False
+
+
+def get_change_marker(supabase: Client, table: str, user_id: str) -> str:
+    """
+    Get a cheap per-user change marker for a table
+
+    The marker combines the row count with the latest ``updated_at`` value.
+    Updates and soft deletes bump ``updated_at`` through the table trigger,
+    inserts and hard deletes change the count. Both come from the
+    ``gtd_change_marker()`` function (sql/create_change_marker_function.sql),
+    an index-only scan; without it the rows are counted through PostgREST.
+    Markers are cached, so they are read from the primary, never from a
+    lagging replica.
+
+    Args:
+        supabase: Supabase client
+        table: Table name
+        user_id: User ID
+
+    Returns:
+        str: Change marker
+    """
+    global _marker_function_missing
+
+    with primary_reads():
+        if not _marker_function_missing:
+            try:
+                # GET, so the replica routing does not take it for a write
+                result = supabase.rpc(
+                    MARKER_FUNCTION, {"p_table": table, "p_user_id": user_id}, get=True
+                ).execute()
+                return result.data
+            except Exception as e:
+                if getattr(e, "code", None) != "PGRST202":
+                    raise
+                _marker_function_missing = True
+                logger.warning(
+                    f"Function {MARKER_FUNCTION}() not found, counting rows for change markers "
+                    f"(run sql/create_change_marker_function.sql)"
+                )
+
+        result = (
+            supabase.table(table)
+            .select("updated_at", count="exact")
+            .eq("user_id", user_id)
+            .order("updated_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+    latest = result.data[0]["updated_at"] if result.data else ""
+    return f"{result.count or 0}:{latest}"
+
+
+def get_cached_change_marker(supabase: Client, table: str, user_id: str) -> str:
+    """
+    Get a change marker, served from memory while the change feed is connected
+
+    Without a connected change feed other replicas' writes would go unnoticed,
+    so the marker is then read from the database on every call.
+    """
+    feed = get_change_feed()
+    if feed is None or not feed.connected:
+        return get_change_marker(supabase, table, user_id)
+
+    key = (table, user_id)
+    marker = _marker_cache.get(key)
+    record_cache("change_marker", marker is not None)
+    if marker is None:
+        generation = _marker_generation
+        marker = get_change_marker(supabase, table, user_id)
+        # Don't cache a marker that an invalidation raced with
+        if generation == _marker_generation:
+            _marker_cache[key] = marker
+
+    return marker
+
+
+def invalidate_change_markers(change: Optional[dict]) -> None:
+    """
+    Change bus listener dropping cached markers
+
+    Args:
+        change: Change with ``user_id``, or None to drop all markers
+    """
+    global _marker_generation
+    _marker_generation += 1
+
+    if change is None:
+        _marker_cache.clear()
+    else:
+        table = ENTITY_TABLES.get(change["entity"])
+        _marker_cache.pop((table, change["user_id"]), None)
+
+
+def make_etag(*parts: str) -> str:
+    """
+    Build a strong ETag from its parts
+
+    Returns:
+        str: Quoted ETag value
+    """
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison)
+
+    Args:
+        if_none_match: Raw If-None-Match header value
+        etag: Current ETag
+
+    Returns:
+        bool: True if the client copy is still current
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+
+    return False
+
+
+class ConditionalGet:
+    """
+    Dependency adding an ETag to a read endpoint
+
+    Answers with 304 Not Modified before the endpoint runs when the client
+    sends a matching If-None-Match header, so neither the full query nor
+    the body serialization happen for unchanged data.
+    """
+
+    def __init__(self, scope: str, tables: Sequence[str], daily: bool = False):
+        """
+        Args:
+            scope: Name of the cached view, part of the ETag
+            tables: Tables whose changes invalidate the view
+            daily: Also invalidate at midnight (for date-relative data)
+        """
+        self.scope = scope
+        self.tables = tuple(tables)
+        self.daily = daily
+
+    def __call__(
+        self,
+        request: Request,
+        response: Response,
+        supabase: Client = Depends(get_db)
+    ) -> Optional[str]:
+        settings = get_settings()
+        user_id = settings.gtd.default_user_id
+
+        if not upstream_available():
+            # Don't wait on Supabase for markers while its circuit is open
+            return None
+
+        try:
+            markers = [get_cached_change_marker(supabase, table, user_id) for table in self.tables]
+        except Exception as e:
+            # Serve the request uncached rather than failing it
+            logger.warning(f"Could not compute ETag for {self.scope}: {e}")
+            return None
+
+        parts = [self.scope, user_id, request.url.query, *markers]
+        if self.daily:
+            parts.append(date.today().isoformat())
+        etag = make_etag(*parts)
+
+        matches = etag_matches(request.headers.get("if-none-match"), etag)
+        record_cache("etag", matches)
+        if matches:
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+            )
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+        return etag
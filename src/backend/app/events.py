@@ -0,0 +1,216 @@
+"""
+In-process change bus for real-time task/project updates
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    Change stream of a single client
+
+    Changes are coalesced per entity (the latest operation wins) until the
+    client reads them, so a burst of edits to one task produces a single
+    event. If a slow client lets more than ``max_pending`` distinct changes
+    pile up, they are dropped and the client is told to resync instead.
+    """
+
+    def __init__(self, user_id: str, max_pending: int):
+        self.user_id = user_id
+        self.max_pending = max_pending
+        self._loop = asyncio.get_running_loop()
+        self._pending: Dict[Tuple[str, Any], dict] = {}
+        self._overflow = False
+        self._ready = asyncio.Event()
+
+    def push(self, change: dict) -> None:
+        """Queue a change (must run on the subscriber's event loop)"""
+        if not self._overflow:
+            key = (change["entity"], change["id"])
+            self._pending.pop(key, None)
+            self._pending[key] = change
+
+            if len(self._pending) > self.max_pending:
+                self._pending.clear()
+                self._overflow = True
+
+        self._ready.set()
+
+    def resync(self) -> None:
+        """Drop pending changes and tell the client to refetch everything"""
+        self._pending.clear()
+        self._overflow = True
+        self._ready.set()
+
+    def push_threadsafe(self, change: dict) -> None:
+        """Queue a change from any thread"""
+        self._call_threadsafe(self.push, change)
+
+    def resync_threadsafe(self) -> None:
+        """Request a resync from any thread"""
+        self._call_threadsafe(self.resync)
+
+    def _call_threadsafe(self, callback, *args) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            callback(*args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    async def next_batch(self, coalesce_seconds: float, timeout: float) -> Optional[dict]:
+        """
+        Wait for the next batch of changes
+
+        Args:
+            coalesce_seconds: Time to keep collecting once a change arrived
+            timeout: Maximum time to wait for a first change
+
+        Returns:
+            Optional[dict]: Batch with ``resync`` flag and ``changes``,
+            None if nothing happened within the timeout
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        if coalesce_seconds > 0:
+            await asyncio.sleep(coalesce_seconds)
+
+        self._ready.clear()
+
+        if self._overflow:
+            self._overflow = False
+            return {"resync": True, "changes": []}
+
+        changes = list(self._pending.values())
+        self._pending.clear()
+        return {"resync": False, "changes": changes}
+
+
+class ChangeBus:
+    """
+    Fan-out of change events to the subscriptions of each user
+
+    In-process listeners (e.g. cache invalidation) see every change,
+    including the ``user_id``, or None when all derived state must be reset.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._listeners: List[Callable[[Optional[dict]], None]] = []
+        self.published = 0
+
+    def add_listener(self, listener: Callable[[Optional[dict]], None]) -> None:
+        """Register an in-process listener (idempotent)"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def _notify_listeners(self, change: Optional[dict]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(change)
+            except Exception as e:
+                logger.error(f"Change listener {listener!r} failed: {e}", exc_info=True)
+
+    def subscribe(self, user_id: str, max_pending: int) -> Subscription:
+        """Register a new subscription (call from the event loop)"""
+        subscription = Subscription(user_id, max_pending)
+        self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription"""
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self, user_id: Optional[str] = None) -> int:
+        """Number of open subscriptions, optionally for a single user"""
+        if user_id is not None:
+            return len(self._subscribers.get(user_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, user_id: str, entity: str, entity_id: Any, op: str) -> None:
+        """
+        Publish a change to all subscriptions of a user
+
+        Args:
+            user_id: Owner of the changed row
+            entity: "task" or "project"
+            entity_id: ID of the changed row
+            op: "insert", "update" or "delete"
+        """
+        self.published += 1
+        self._notify_listeners({"entity": entity, "id": entity_id, "op": op, "user_id": user_id})
+        change = {"entity": entity, "id": entity_id, "op": op}
+
+        for subscription in list(self._subscribers.get(user_id, ())):
+            try:
+                subscription.push_threadsafe(change)
+            except RuntimeError as e:
+                # Event loop of the subscriber is gone
+                logger.debug(f"Dropping stale subscription: {e}")
+                self.unsubscribe(subscription)
+
+    def _resync(self, subscriptions: List[Subscription]) -> None:
+        for subscription in subscriptions:
+            try:
+                subscription.resync_threadsafe()
+            except RuntimeError as e:
+                logger.debug(f"Dropping stale subscription: {e}")
+                self.unsubscribe(subscription)
+
+    def resync_user(self, user_id: str, entity: str) -> None:
+        """
+        Tell the subscriptions of a user to refetch after a bulk change
+
+        Listeners get a change without ``id`` (op ``"bulk"``), so they drop
+        what they derived from that user's rows of the entity.
+
+        Args:
+            user_id: Owner of the changed rows
+            entity: "task" or "project"
+        """
+        self._notify_listeners({"entity": entity, "id": None, "op": "bulk", "user_id": user_id})
+        self._resync(list(self._subscribers.get(user_id, ())))
+
+    def resync_all(self) -> None:
+        """Tell every subscription to refetch (changes may have been missed)"""
+        self._resync([
+            subscription for subscribers in list(self._subscribers.values()) for subscription in subscribers
+        ])
+
+    def publish_change(self, change: Optional[dict]) -> None:
+        """
+        Publish a change reported by the database change feed
+
+        Args:
+            change: Change with ``user_id``, or None to reset listeners
+        """
+        if change is None:
+            self._notify_listeners(None)
+            self.resync_all()
+        else:
+            self.publish(change["user_id"], change["entity"], change["id"], change["op"])
+
+
+# Global change bus instance
+change_bus = ChangeBus()
+
+
+def get_change_bus() -> ChangeBus:
+    """
+    Get the process-wide change bus
+    """
+    return change_bus
@@ -0,0 +1,48 @@
+"""
+Sparse fieldsets (``?fields=id,name,done_at``) for read endpoints
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Query, status
+
+from app.schemas import RowMapper
+
+
+class SparseFields:
+    """
+    Dependency resolving the ``fields`` query parameter to a row mapper
+
+    The returned mapper emits only the requested fields and its ``select``
+    attribute lists just the columns they need, so the selection is pushed
+    down into the Supabase query. Without the parameter the full mapper is
+    returned. Unknown fields are rejected with 422.
+    """
+
+    def __init__(self, mapper: RowMapper):
+        """
+        Args:
+            mapper: Mapper of the endpoint's full response schema
+        """
+        self.mapper = mapper
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated list of fields to return (default: all)"
+        )
+    ) -> RowMapper:
+        if not fields:
+            return self.mapper
+
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        if not names:
+            return self.mapper
+
+        try:
+            return self.mapper.project(names)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(e)
+            )
@@ -0,0 +1,192 @@
+"""
+Cached database health for liveness and readiness probes
+
+Probes never query Supabase themselves: a background task checks the
+database every ``health.check_interval_seconds`` with a cheap one-row read
+and caches the outcome. Liveness only needs the event loop to answer;
+readiness is derived from the cached state, so a slow database makes a pod
+unready only after several failed checks instead of on one slow probe.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import HealthConfig, get_settings
+from app.deadlines import Deadline, _current_deadline
+
+logger = logging.getLogger(__name__)
+
+
+def connection_pool_stats(session) -> Optional[Dict[str, Any]]:
+    """
+    Describe the connection pool of an httpx client
+
+    Args:
+        session: Client used for PostgREST calls (``supabase.postgrest.session``)
+
+    Returns:
+        Optional[Dict[str, Any]]: Open, active and idle connections, requests
+        waiting for one and the pool limit; None if not available
+    """
+    # Unwrap instrumentation transports (tracing, metrics)
+    transport = getattr(session, "_transport", None)
+    while hasattr(transport, "transport"):
+        transport = transport.transport
+    pool = getattr(transport, "_pool", None)
+    if pool is None:
+        return None
+
+    connections = list(pool.connections)
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {
+        "connections": len(connections),
+        "active": len(connections) - idle,
+        "idle": idle,
+        "waiting": sum(1 for request in getattr(pool, "_requests", []) if request.is_queued()),
+        "max_connections": getattr(pool, "_max_connections", None),
+    }
+
+
+class HealthMonitor:
+    """Check the database in the background and keep the last outcome"""
+
+    def __init__(self, config: HealthConfig):
+        self.config = config
+        self.last_check_at: Optional[float] = None
+        self.last_success_at: Optional[float] = None
+        self.last_latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _query(self) -> None:
+        """Cheap one-row read (no count); raises on failure"""
+        from app.database import get_supabase_client
+
+        get_supabase_client().table("gtd_projects").select("id").limit(1).execute()
+
+    async def check(self) -> bool:
+        """
+        Run one database check and record its outcome
+
+        Returns:
+            bool: True if the database answered
+        """
+        start = time.perf_counter()
+        # Cap the check's HTTP timeouts like a request deadline would
+        token = _current_deadline.set(Deadline("health", self.config.timeout_seconds))
+        try:
+            await asyncio.wait_for(run_in_threadpool(self._query), self.config.timeout_seconds)
+        except Exception as e:
+            self.consecutive_failures += 1
+            self.last_error = str(e) or type(e).__name__
+            if self.consecutive_failures == self.config.failure_threshold:
+                logger.warning(
+                    f"Database health check failed {self.consecutive_failures} times, "
+                    f"marking not ready: {self.last_error}"
+                )
+            return False
+        else:
+            if self.consecutive_failures >= self.config.failure_threshold:
+                logger.info("Database health check recovered")
+            self.consecutive_failures = 0
+            self.last_error = None
+            self.last_success_at = time.time()
+            return True
+        finally:
+            _current_deadline.reset(token)
+            self.last_check_at = time.time()
+            self.last_latency_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    async def _run(self) -> None:
+        """Check periodically until cancelled"""
+        while True:
+            await asyncio.sleep(self.config.check_interval_seconds)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Database health check crashed: {e}")
+
+    async def start(self) -> bool:
+        """
+        Run a first check, then keep checking in the background
+
+        Returns:
+            bool: Outcome of the first check
+        """
+        healthy = await self.check()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return healthy
+
+    async def stop(self) -> None:
+        """Stop background checks"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def success_age(self) -> Optional[float]:
+        """Seconds since the last successful check, None if none succeeded"""
+        if self.last_success_at is None:
+            return None
+        return time.time() - self.last_success_at
+
+    def ready(self) -> bool:
+        """
+        Check whether the pod should receive traffic
+
+        Ready once a check succeeded, unless the last success is older than
+        ``max_age_seconds`` and ``failure_threshold`` checks failed in a row.
+        """
+        age = self.success_age()
+        if age is None:
+            return False
+        return age <= self.config.max_age_seconds or self.consecutive_failures < self.config.failure_threshold
+
+    def stats(self) -> Dict[str, Any]:
+        """Cached database state for the health endpoints"""
+        age = self.success_age()
+        if self.last_success_at is None:
+            status = "unknown" if self.last_check_at is None else "unhealthy"
+        elif self.consecutive_failures == 0:
+            status = "healthy"
+        else:
+            status = "degraded" if self.ready() else "unhealthy"
+
+        pool = None
+        try:
+            from app.database import get_supabase_client
+            pool = connection_pool_stats(get_supabase_client().postgrest.session)
+        except Exception:
+            pass
+
+        return {
+            "status": status,
+            "last_check_age_seconds": round(time.time() - self.last_check_at, 1) if self.last_check_at else None,
+            "last_success_age_seconds": round(age, 1) if age is not None else None,
+            "last_latency_ms": self.last_latency_ms,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "pool": pool,
+        }
+
+
+# Global monitor, created on first use
+_monitor: Optional[HealthMonitor] = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    """
+    Get the process-wide health monitor
+    """
+    global _monitor
+    if _monitor is None:
+        _monitor = HealthMonitor(get_settings().health)
+    return _monitor
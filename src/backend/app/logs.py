@@ -0,0 +1,197 @@
+"""
+Non-blocking structured logging
+
+Log records are put on a bounded in-memory queue and written to stdout by a
+background thread, so request handling never waits on stdout. With
+``logging.json_format`` every record is rendered as one JSON object per
+line, fields passed via ``extra=`` included. When the queue is full, records are dropped
+and counted instead of blocking the caller.
+
+Access logging is a pure ASGI middleware emitting one record per request;
+successful, fast requests can be sampled (``logging.access_sample_rate``),
+errors and slow requests are always logged.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional, TextIO, Tuple
+
+from app.config import LoggingConfig
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("app.access")
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as single-line JSON objects"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks: records are dropped when the queue is full
+
+    Only the message is merged on the calling thread; formatting happens in
+    the writer thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# Writer thread and queue handler, set up by configure_logging
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+_configured: Optional[Tuple[LoggingConfig, Optional[TextIO]]] = None
+
+
+def configure_logging(config: LoggingConfig, stream: Optional[TextIO] = None) -> None:
+    """
+    Route all logging through a queue to a background stdout writer
+
+    Replaces the root logger's handlers; calling it again reconfigures.
+
+    Args:
+        config: Logging configuration
+        stream: Output stream (stdout by default)
+    """
+    global _listener, _queue_handler, _configured
+    stop_logging()
+    _configured = (config, stream)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if config.json_format else logging.Formatter(config.format))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=config.queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(config.level.upper())
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    """Number of records dropped because the queue was full"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def _restart_after_fork() -> None:
+    """Start a writer thread in forked workers (threads do not survive fork)"""
+    global _listener
+    if _listener is not None and _configured is not None:
+        # The parent's listener (and its queue's locks) are unusable here
+        _listener = None
+        configure_logging(*_configured)
+
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware logging one record per request
+
+    Fields: method, path, status, duration_ms and client. Requests that
+    succeeded within ``slow_request_ms`` are logged with probability
+    ``access_sample_rate``.
+    """
+
+    def __init__(self, app, config: LoggingConfig):
+        self.app = app
+        self.config = config
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.config.access_log:
+            await self.app(scope, receive, send)
+            return
+
+        status_code: Optional[int] = None
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self._log(scope, status_code or 500, duration_ms)
+
+    def _log(self, scope, status_code: int, duration_ms: float) -> None:
+        """Emit the access record, unless sampled out"""
+        if status_code < 400 and duration_ms < self.config.slow_request_ms:
+            rate = self.config.access_sample_rate
+            if rate <= 0 or (rate < 1 and random.random() >= rate):
+                return
+        if not access_logger.isEnabledFor(logging.INFO):
+            return
+
+        client = scope.get("client")
+        access_logger.info(
+            "%s %s %d %.1fms",
+            scope["method"], scope["path"], status_code, duration_ms,
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(duration_ms, 1),
+                "client": client[0] if client else None,
+            }
+        )
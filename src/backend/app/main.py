@@ -2,25 +2,30 @@
 Main FastAPI application for GTD backend
 """
 import logging
-import sys
-import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError, HTTPException
 from app.config import get_settings
-from app.database import test_connection
-from app.api import users, fields, projects, tasks, dashboard, search, quick_add, weekly_review
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from app.change_feed import create_change_feed
+from app.etag import invalidate_change_markers
+from app.events import get_change_bus
+from app.singleflight import get_single_flight
+from app.circuit import get_resilient_reader
+from app.ratelimit import RateLimitMiddleware
+from app.deadlines import DeadlineMiddleware
+from app.metrics import MetricsMiddleware, metrics_response
+from app.tracing import TracingMiddleware
+from app.logs import AccessLogMiddleware, configure_logging, dropped_records
+from app.health import get_health_monitor
+from app.replica import ConsistencyMiddleware, get_replica_router
+from app.direct import create_direct_db, get_direct_db
+from app.api import users, fields, projects, tasks, dashboard, search, quick_add, weekly_review, events, batch, export, imports
+
+# Configure logging (queued, written to stdout by a background thread)
+configure_logging(get_settings().logging)
 
 logger = logging.getLogger(__name__)
 
@@ -36,21 +41,45 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     logger.info(f"Environment: {settings.app.environment}")
     
-    # Test Supabase connection
-    try:
-        if test_connection():
-            logger.info("Supabase connection successful")
-        else:
-            logger.warning("Supabase connection test failed - some features may not work")
-    except Exception as e:
-        logger.error(f"Supabase connection failed: {e}")
+    # Check Supabase now, then keep a cached health state for the probes
+    health_monitor = get_health_monitor()
+    if await health_monitor.start():
+        logger.info("Supabase connection successful")
+    else:
+        logger.error(f"Supabase connection failed: {health_monitor.last_error}")
         logger.warning("Starting server without database connection - some features may not work")
-        # Don't raise in development to allow server to start without DB
+    
+    # Direct asyncpg pool for the heaviest reads (PostgREST if unavailable)
+    direct_db = create_direct_db(settings)
+    if direct_db is not None and await direct_db.start():
+        logger.info("Direct query pool connected")
+    
+    # Measure the read replica lag in the background
+    replica_router = get_replica_router()
+    if replica_router is not None:
+        replica_router.start()
+    
+    # Drop cached change markers on local writes and change feed events
+    bus = get_change_bus()
+    bus.add_listener(invalidate_change_markers)
+    
+    # Listen for changes made by other replicas and the ETL scripts
+    change_feed = create_change_feed(settings)
+    if change_feed is not None:
+        change_feed.add_handler(bus.publish_change)
+        change_feed.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down GTD Backend Application")
+    await health_monitor.stop()
+    if replica_router is not None:
+        await replica_router.stop()
+    if direct_db is not None:
+        await direct_db.stop()
+    if change_feed is not None:
+        await change_feed.stop()
 
 
 # Create FastAPI application
@@ -73,6 +102,15 @@ def create_app() -> FastAPI:
         redoc_url="/redoc" if settings.app.debug else None,
     )
     
+    # Read-your-writes tokens for read replica routing (no-op without replica)
+    app.add_middleware(ConsistencyMiddleware)
+    
+    # Per-route deadlines, inside the limits so only admitted requests are timed
+    app.add_middleware(DeadlineMiddleware, config=settings.deadlines)
+    
+    # Per-user admission control (inside CORS so 429s carry CORS headers)
+    app.add_middleware(RateLimitMiddleware, config=settings.rate_limit)
+    
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -80,8 +118,19 @@ def create_app() -> FastAPI:
         allow_credentials=settings.cors.allow_credentials,
         allow_methods=settings.cors.allow_methods,
         allow_headers=settings.cors.allow_headers,
+        expose_headers=["Server-Timing", "X-Consistency-Token"],
     )
     
+    # Supabase call tracing (Server-Timing header, debug log, OpenTelemetry)
+    app.add_middleware(TracingMiddleware, config=settings.tracing)
+    
+    # Request metrics, outside the limits so rejected and timed out requests count too
+    if settings.metrics.enabled:
+        app.add_middleware(MetricsMiddleware)
+    
+    # One access log record per request (sampled), outermost
+    app.add_middleware(AccessLogMiddleware, config=settings.logging)
+    
     # Include API routers
     app.include_router(users.router, prefix="/api")
     app.include_router(fields.router, prefix="/api")
@@ -91,6 +140,10 @@ def create_app() -> FastAPI:
     app.include_router(search.router, prefix="/api")
     app.include_router(quick_add.router, prefix="/api")
     app.include_router(weekly_review.router, prefix="/api")
+    app.include_router(events.router, prefix="/api")
+    app.include_router(batch.router, prefix="/api")
+    app.include_router(export.router, prefix="/api")
+    app.include_router(imports.router, prefix="/api")
     
     return app
 
@@ -110,8 +163,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "error": "Validation Error",
-            "detail": exc.errors(),
-            "body": exc.body
+            "detail": jsonable_encoder(exc.errors()),
+            "body": jsonable_encoder(exc.body)
         }
     )
 
@@ -133,40 +186,85 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
-# Health check endpoint
+# Health check endpoints
 @app.get("/health")
 async def health_check():
     """
-    Health check endpoint
+    Health report from cached state (no database query)
     
     Returns:
         dict: Health status
     """
     settings = get_settings()
-    
-    # Test database connection
-    db_status = "healthy"
-    try:
-        from app.database import test_connection
-        if not test_connection():
-            db_status = "unhealthy: Supabase connection failed"
-    except Exception as e:
-        db_status = f"unhealthy: {e}"
-        logger.error(f"Database health check failed: {e}")
+    database = get_health_monitor().stats()
+    replica_router = get_replica_router()
+    direct_db = get_direct_db()
     
     return {
-        "status": "healthy" if db_status == "healthy" else "unhealthy",
+        "status": "healthy" if database["status"] == "healthy" else "unhealthy",
         "app": {
             "name": settings.app.name,
             "version": settings.app.version,
             "environment": settings.app.environment
         },
-        "database": {
-            "status": db_status
+        "database": database,
+        "single_flight": get_single_flight().stats(),
+        "circuit_breaker": get_resilient_reader().stats(),
+        "replica": replica_router.stats() if replica_router is not None else {"enabled": False},
+        "direct_queries": direct_db.stats() if direct_db is not None else {
+            "enabled": settings.direct_queries.enabled,
+            "connected": False
+        },
+        "logging": {
+            "dropped_records": dropped_records()
         }
     }
 
 
+@app.get("/health/live")
+async def liveness_check():
+    """
+    Liveness probe: the process is serving requests
+    
+    Returns:
+        dict: Always alive
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness probe from the cached database check
+    
+    Returns:
+        JSONResponse: 200 if ready, 503 otherwise
+    """
+    monitor = get_health_monitor()
+    ready = monitor.ready()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "not ready",
+            "database": monitor.stats()
+        }
+    )
+
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics (scraped by the deployment's prometheus.io annotations)
+    
+    Returns:
+        Response: Metrics in the Prometheus text format
+    """
+    if not get_settings().metrics.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    return metrics_response()
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -185,31 +283,6 @@ async def root():
     }
 
 
-# Middleware for request logging
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """
-    Log all HTTP requests
-    """
-    start_time = time.time()
-    
-    # Log request
-    logger.info(f"{request.method} {request.url} - Started")
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Log response
-    process_time = time.time() - start_time
-    logger.info(
-        f"{request.method} {request.url} - "
-        f"Status: {response.status_code} - "
-        f"Time: {process_time:.3f}s"
-    )
-    
-    return response
-
-
 if __name__ == "__main__":
     import uvicorn
     
@@ -220,5 +293,6 @@ if __name__ == "__main__":
         host=settings.app.host,
         port=settings.app.port,
         reload=settings.app.debug,
-        access_log=True
+        forwarded_allow_ips=settings.server.forwarded_allow_ips,
+        access_log=False  # AccessLogMiddleware logs requests
     )
\ No newline at end of file
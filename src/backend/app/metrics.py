@@ -0,0 +1,261 @@
+"""
+Prometheus metrics
+
+Exposed at ``/metrics``: request latency per route template, requests in
+flight, Supabase call counts and latencies per table and operation, direct
+query counts and latencies, cache hit/miss counts and import (ETL) run
+statistics.
+"""
+import logging
+import os
+import time
+from typing import Optional, Tuple
+
+import httpx
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from cached reads to deadline-bound requests
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUESTS = Counter(
+    "gtd_http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "gtd_http_request_duration_seconds",
+    "HTTP request latency by route template (until the response has been sent)",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "gtd_http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+
+SUPABASE_REQUESTS = Counter(
+    "gtd_supabase_requests_total",
+    "PostgREST calls by table, operation and outcome (2xx, 4xx, 5xx or error)",
+    ["table", "operation", "outcome"]
+)
+SUPABASE_REQUEST_DURATION = Histogram(
+    "gtd_supabase_request_duration_seconds",
+    "PostgREST call latency by table and operation",
+    ["table", "operation"],
+    buckets=LATENCY_BUCKETS
+)
+
+DIRECT_QUERIES = Counter(
+    "gtd_direct_queries_total",
+    "Queries on the direct asyncpg pool by query name and outcome (ok or error)",
+    ["query", "outcome"]
+)
+DIRECT_QUERY_DURATION = Histogram(
+    "gtd_direct_query_duration_seconds",
+    "Direct asyncpg query latency by query name (including waiting for a connection)",
+    ["query"],
+    buckets=LATENCY_BUCKETS
+)
+
+CACHE_REQUESTS = Counter(
+    "gtd_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"]
+)
+
+ETL_RUNS = Counter(
+    "gtd_etl_runs_total",
+    "Import runs by entity and final status",
+    ["entity", "status"]
+)
+ETL_ROWS = Counter(
+    "gtd_etl_rows_total",
+    "Rows processed by import runs, by entity and outcome",
+    ["entity", "outcome"]
+)
+ETL_RUN_DURATION = Histogram(
+    "gtd_etl_run_duration_seconds",
+    "Import run duration by entity",
+    ["entity"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+)
+
+# PostgREST operations by HTTP method
+_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """
+    Count a cache lookup
+
+    Args:
+        cache: Cache name, e.g. "etag" or "single_flight"
+        hit: Whether the lookup was served from the cache
+    """
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_direct_query(query: str, ok: bool, duration: float) -> None:
+    """
+    Record a query on the direct asyncpg pool
+
+    Args:
+        query: Query name, e.g. "dashboard_stats"
+        ok: Whether the query succeeded
+        duration: Seconds including connection acquisition
+    """
+    DIRECT_QUERIES.labels(query, "ok" if ok else "error").inc()
+    DIRECT_QUERY_DURATION.labels(query).observe(duration)
+
+
+def record_etl_run(
+    entity: str,
+    status: str,
+    duration: float,
+    inserted: int,
+    failed: int,
+    skipped: int
+) -> None:
+    """
+    Record a finished import run
+
+    Args:
+        entity: Imported entity, e.g. "tasks"
+        status: Final status ("completed" or "failed")
+        duration: Run time in seconds
+        inserted: Rows inserted (or validated in a dry run)
+        failed: Rows rejected
+        skipped: Empty rows skipped
+    """
+    ETL_RUNS.labels(entity, status).inc()
+    ETL_RUN_DURATION.labels(entity).observe(duration)
+    ETL_ROWS.labels(entity, "inserted").inc(inserted)
+    ETL_ROWS.labels(entity, "failed").inc(failed)
+    ETL_ROWS.labels(entity, "skipped").inc(skipped)
+
+
+def describe_postgrest_call(request: httpx.Request) -> Tuple[str, str]:
+    """
+    Get the table and operation of a PostgREST request
+
+    Returns:
+        Tuple[str, str]: e.g. ``("gtd_tasks", "select")`` or ``("rpc", "<function>")``
+    """
+    segments = request.url.path.rstrip("/").split("/")
+    if len(segments) >= 2 and segments[-2] == "rpc":
+        return "rpc", segments[-1]
+
+    operation = _OPERATIONS.get(request.method, request.method.lower())
+    if operation == "insert" and "resolution=" in request.headers.get("prefer", ""):
+        operation = "upsert"
+    return segments[-1], operation
+
+
+class MetricsTransport(httpx.BaseTransport):
+    """httpx transport wrapper timing every PostgREST call, failures included"""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        table, operation = describe_postgrest_call(request)
+        start = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+        except Exception:
+            SUPABASE_REQUESTS.labels(table, operation, "error").inc()
+            raise
+        finally:
+            SUPABASE_REQUEST_DURATION.labels(table, operation).observe(time.perf_counter() - start)
+        SUPABASE_REQUESTS.labels(table, operation, f"{response.status_code // 100}xx").inc()
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+def install_metrics_transport(session: httpx.Client) -> None:
+    """
+    Instrument an httpx client's outbound calls
+
+    Args:
+        session: Client used for PostgREST calls (``supabase.postgrest.session``)
+    """
+    transport = getattr(session, "_transport", None)
+    if transport is None or isinstance(transport, MetricsTransport):
+        return
+    session._transport = MetricsTransport(transport)
+
+
+def route_template(scope) -> str:
+    """
+    Get the route template a request matched (e.g. ``/api/tasks/{task_id}``)
+
+    Unmatched paths, and requests rejected before routing (e.g. 429), share
+    one label so scanners cannot inflate cardinality.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return "unmatched"
+
+    # Routes of included routers may report their path without the include
+    # prefix (e.g. /tasks/{task_id} for /api/tasks/5); restore it
+    path_segments = scope["path"].strip("/").split("/")
+    template_segments = template.strip("/").split("/")
+    prefix = path_segments[:max(0, len(path_segments) - len(template_segments))]
+    return "/" + "/".join(prefix) + template if prefix else template
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency and requests in flight
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code: Optional[int] = None
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route, str(status_code or 500)).inc()
+
+
+def metrics_response() -> Response:
+    """
+    Render all metrics in the Prometheus text format
+
+    Under a multi-worker server (PROMETHEUS_MULTIPROC_DIR set) the samples
+    of all workers are aggregated.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
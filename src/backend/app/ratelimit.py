@@ -0,0 +1,237 @@
+"""
+Per-user admission control with token buckets
+
+Every API request is charged to a budget of its user: expensive endpoints
+(export, import, dashboard, search) have their own, smaller budget than
+cheap reads. A request without tokens left is rejected with 429 and a
+Retry-After header before it reaches a handler. Expensive budgets can also
+cap the number of concurrent requests per user.
+
+Buckets live in process memory, or in Redis when several replicas must
+share them (``rate_limit.backend: redis``).
+"""
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.config import RateBudgetConfig, RateLimitConfig, get_settings
+from app.dependencies import get_current_user_id
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBucketStore:
+    """Token buckets in process memory (least recently used keys evicted)"""
+
+    def __init__(self, max_keys: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, burst: int, cost: float = 1) -> Tuple[bool, float]:
+        """
+        Take tokens from a bucket
+
+        Args:
+            key: Bucket key
+            rate: Refill rate in tokens per second
+            burst: Bucket capacity
+            cost: Tokens to take
+
+        Returns:
+            Tuple[bool, float]: Whether admitted, and seconds until enough
+            tokens are available if not
+        """
+        now = self.clock()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        if tokens >= cost:
+            allowed, retry_after = True, 0.0
+            tokens -= cost
+        else:
+            allowed, retry_after = False, (cost - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+# Atomic token bucket; uses the Redis clock so replicas need not agree on time
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisBucketStore:
+    """
+    Token buckets shared by all replicas through Redis
+
+    If Redis is unreachable, requests are admitted by a process-local
+    fallback store rather than rejected.
+    """
+
+    def __init__(self, url: str, prefix: str = "gtd:ratelimit:"):
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self._redis = redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._script = self._redis.register_script(_REDIS_TOKEN_BUCKET)
+        self._fallback = MemoryBucketStore()
+
+    async def acquire(self, key: str, rate: float, burst: int, cost: float = 1) -> Tuple[bool, float]:
+        """Take tokens from a shared bucket (see MemoryBucketStore.acquire)"""
+        try:
+            allowed, retry_after = await self._script(keys=[self.prefix + key], args=[rate, burst, cost])
+            return bool(allowed), float(retry_after)
+        except Exception as e:
+            logger.warning(f"Redis rate limiting unavailable, using local buckets: {e}")
+            return await self._fallback.acquire(key, rate, burst, cost)
+
+
+def create_bucket_store(config: RateLimitConfig):
+    """
+    Create the bucket store selected in the configuration
+
+    Returns:
+        MemoryBucketStore or RedisBucketStore
+    """
+    if config.backend == "redis":
+        url = os.getenv("REDIS_URL", config.redis_url)
+        if url:
+            try:
+                return RedisBucketStore(url)
+            except ImportError:
+                logger.warning("rate_limit.backend is redis but the redis package is not installed")
+        else:
+            logger.warning("rate_limit.backend is redis but no REDIS_URL / rate_limit.redis_url is set")
+        logger.warning("Falling back to per-process rate limiting")
+    return MemoryBucketStore()
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware admitting or rejecting API requests per user and budget
+    """
+
+    def __init__(self, app, config: Optional[RateLimitConfig] = None):
+        self.app = app
+        self.config = config or get_settings().rate_limit
+        self.store = create_bucket_store(self.config)
+        self._active: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.rejected: Dict[str, int] = defaultdict(int)
+
+    def classify(self, path: str) -> Optional[str]:
+        """
+        Get the budget a path is charged to
+
+        Returns:
+            Optional[str]: Budget name, None for unlimited paths
+        """
+        if not path.startswith("/api/"):
+            return None
+        if any(path.startswith(prefix) for prefix in self.config.exempt_prefixes):
+            return None
+        if any(path.startswith(prefix) for prefix in self.config.expensive_prefixes):
+            return "expensive"
+        return "read"
+
+    def client_key(self, scope) -> str:
+        """
+        Identify the caller: user ID, or client address without valid credentials
+
+        With authentication disabled every request acts as the default user,
+        so callers are told apart by address instead of sharing one bucket.
+        Behind a proxy the address is the forwarded one, as long as the proxy
+        is listed in ``server.forwarded_allow_ips``.
+        """
+        client = scope.get("client")
+        address = "ip:" + (client[0] if client else "unknown")
+        if not get_settings().features.authentication_enabled:
+            return address
+
+        headers = dict(scope.get("headers") or [])
+        authorization = headers.get(b"authorization")
+        try:
+            return "user:" + get_current_user_id(authorization.decode("latin-1") if authorization else None)
+        except (HTTPException, ImportError):
+            return address
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.config.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        budget_name = self.classify(scope["path"])
+        if budget_name is None:
+            await self.app(scope, receive, send)
+            return
+
+        budget: RateBudgetConfig = getattr(self.config, budget_name)
+        client = self.client_key(scope)
+
+        allowed, retry_after = await self.store.acquire(f"{client}:{budget_name}", budget.rate, budget.burst)
+        if not allowed:
+            await self._reject(send, budget_name, retry_after, "Rate limit exceeded")
+            return
+
+        slot = (client, budget_name)
+        if budget.max_concurrent is not None and self._active[slot] >= budget.max_concurrent:
+            await self._reject(send, budget_name, 1.0, "Too many concurrent requests")
+            return
+
+        self._active[slot] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._active[slot] -= 1
+            if not self._active[slot]:
+                del self._active[slot]
+
+    async def _reject(self, send, budget_name: str, retry_after: float, reason: str) -> None:
+        """Send a 429 response"""
+        self.rejected[budget_name] += 1
+        retry_seconds = max(1, math.ceil(retry_after))
+        body = json.dumps({
+            "error": "Too Many Requests",
+            "detail": f"{reason} for {budget_name} requests, retry in {retry_seconds}s",
+            "budget": budget_name,
+            "retry_after": retry_seconds
+        }).encode("utf-8")
+
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(retry_seconds).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,409 @@
+"""
+Read-replica routing with read-your-writes consistency
+
+With ``replica.enabled`` PostgREST reads (GET/HEAD) are sent to the read
+replica's API and everything else to the primary. Each request carries a
+consistency token: the time of the newest write its user made, taken from
+the ``X-Consistency-Token`` header, the consistency cookie or this process'
+memory of the user's writes. A read goes to the replica only if the replica's
+measured lag proves that write has been replayed there; otherwise, and
+whenever the lag is unknown, too high or the replica fails, it goes to the
+primary. Responses to requests that wrote return a fresh token.
+
+The lag is measured in the background with the ``gtd_replication_lag()``
+function (sql/create_replication_lag_function.sql) on the replica.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.cookies import SimpleCookie
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+import httpx
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.config import ReplicaConfig, get_settings
+from app.dependencies import get_current_user_id
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = "x-consistency-token"
+TOKEN_COOKIE = "gtd_consistency"
+
+_READ_METHODS = ("GET", "HEAD")
+
+
+class ConsistencyState:
+    """What one request must observe, and whether it wrote"""
+
+    def __init__(self, user_id: Optional[str], min_write: Optional[float] = None):
+        """
+        Args:
+            user_id: User the request acts as, if known
+            min_write: Epoch seconds of the newest write the request must see
+        """
+        self.user_id = user_id
+        self.min_write = min_write
+        self.wrote_at: Optional[float] = None
+
+    def record_write(self, at: float) -> None:
+        self.wrote_at = at
+        self.min_write = max(self.min_write or 0.0, at)
+
+
+# Consistency state of the request being served (copied into threadpool
+# workers; batch operations share the state of the enclosing request)
+_current_consistency: contextvars.ContextVar[Optional[ConsistencyState]] = contextvars.ContextVar(
+    "current_consistency", default=None
+)
+
+
+# Set while reads must go to the primary regardless of the replica's lag
+_primary_only: contextvars.ContextVar[bool] = contextvars.ContextVar("primary_only", default=False)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """
+    Send the PostgREST reads made inside the block to the primary
+
+    For reads whose result is cached beyond the request (change markers):
+    a lagging replica would pin an outdated copy until the next write.
+    """
+    token = _primary_only.set(True)
+    try:
+        yield
+    finally:
+        _primary_only.reset(token)
+
+
+def required_write() -> Optional[float]:
+    """
+    Epoch seconds of the newest write the current request must observe
+
+    Shared and cached reads (single-flight, stale fallback) must not answer
+    the request with data read before that write.
+
+    Returns:
+        Optional[float]: Write time, None if the request is not tracked or
+        its user has not written
+    """
+    state = _current_consistency.get()
+    return state.min_write if state is not None else None
+
+
+def parse_token(value: Optional[str]) -> Optional[float]:
+    """Token (epoch milliseconds) to epoch seconds; None if missing or invalid"""
+    try:
+        return int(value) / 1000 if value else None
+    except ValueError:
+        return None
+
+
+def format_token(at: float) -> str:
+    return str(int(at * 1000) + 1)
+
+
+class ReplicaRouter:
+    """
+    Decide per read whether the replica may answer it
+    """
+
+    def __init__(
+        self,
+        config: ReplicaConfig,
+        replica_url: str,
+        probe: Optional[Callable[[], Awaitable[float]]] = None,
+        max_users: int = 10000
+    ):
+        """
+        Args:
+            config: Replica configuration
+            replica_url: Base URL of the replica's API (same paths as the primary)
+            probe: Coroutine function returning the replica lag in seconds;
+                defaults to calling the lag function over the replica's API
+            max_users: Users whose last write is remembered in this process
+        """
+        self.config = config
+        self.replica_url = httpx.URL(replica_url)
+        self.probe = probe or self._rpc_lag
+        self.max_users = max_users
+        self.lag: Optional[float] = None
+        self.lag_measured_at = 0.0
+        self.unavailable_until = 0.0
+        self.last_writes: "OrderedDict[str, float]" = OrderedDict()
+        self.counts: Dict[str, int] = {"replica": 0, "primary": 0, "fallback": 0}
+        self._task: Optional[asyncio.Task] = None
+        self._probe_client: Optional[httpx.Client] = None
+
+    def effective_lag(self) -> Optional[float]:
+        """
+        Replica lag to plan with
+
+        Returns:
+            Optional[float]: Seconds, None if the replica must not be used
+            (lag unknown or outdated, above ``max_lag_seconds``, or recent failure)
+        """
+        now = time.monotonic()
+        if now < self.unavailable_until or self.lag is None:
+            return None
+        if now - self.lag_measured_at > 3 * self.config.lag_check_interval_seconds:
+            return None
+        if self.lag > self.config.max_lag_seconds:
+            return None
+        return self.lag
+
+    def use_replica(self, state: Optional[ConsistencyState]) -> bool:
+        """
+        Check whether a read may go to the replica
+
+        Args:
+            state: Consistency state of the request (None: no requirement)
+        """
+        lag = self.effective_lag()
+        if lag is None:
+            return False
+        if state is None or state.min_write is None:
+            return True
+        return state.min_write < time.time() - lag - self.config.margin_seconds
+
+    def token_for(self, user_id: Optional[str], *tokens: Optional[float]) -> Optional[float]:
+        """Newest write a user's request must observe"""
+        candidates = [token for token in tokens if token is not None]
+        if user_id is not None and user_id in self.last_writes:
+            candidates.append(self.last_writes[user_id])
+        return max(candidates) if candidates else None
+
+    def record_write(self, state: Optional[ConsistencyState]) -> None:
+        """Remember a successful write of the current request"""
+        if state is None:
+            return
+        now = time.time()
+        state.record_write(now)
+        if state.user_id is not None:
+            self.last_writes.pop(state.user_id, None)
+            self.last_writes[state.user_id] = now
+            while len(self.last_writes) > self.max_users:
+                self.last_writes.popitem(last=False)
+
+    def mark_failed(self, reason: Any) -> None:
+        """Stop using the replica for ``failure_cooldown_seconds``"""
+        self.unavailable_until = time.monotonic() + self.config.failure_cooldown_seconds
+        logger.warning(
+            f"Read replica failed ({reason}), reading from the primary for "
+            f"{self.config.failure_cooldown_seconds:.0f}s"
+        )
+
+    def to_replica(self, request: httpx.Request) -> httpx.Request:
+        """Copy of a request addressed to the replica"""
+        url = request.url.copy_with(
+            scheme=self.replica_url.scheme,
+            host=self.replica_url.host,
+            port=self.replica_url.port
+        )
+        headers = request.headers.copy()
+        headers["host"] = url.netloc.decode("ascii")
+        return httpx.Request(request.method, url, headers=headers, extensions=request.extensions)
+
+    def _rpc_lag_sync(self) -> float:
+        """Call the lag function through the replica's API"""
+        from app.database import get_supabase_client
+
+        if self._probe_client is None:
+            session = get_supabase_client().postgrest.session
+            self._probe_client = httpx.Client(
+                headers={key: value for key, value in session.headers.items() if key.lower() != "host"},
+                timeout=self.config.lag_check_interval_seconds
+            )
+        response = self._probe_client.post(
+            str(self.replica_url.join(f"/rest/v1/rpc/{self.config.lag_function}")),
+            json={}
+        )
+        response.raise_for_status()
+        return float(response.json())
+
+    async def _rpc_lag(self) -> float:
+        return await run_in_threadpool(self._rpc_lag_sync)
+
+    async def check_lag(self) -> Optional[float]:
+        """
+        Measure the replica lag now
+
+        Returns:
+            Optional[float]: Lag in seconds, None if the measurement failed
+        """
+        try:
+            lag = float(await asyncio.wait_for(self.probe(), self.config.lag_check_interval_seconds))
+        except Exception as e:
+            if self.lag is not None:
+                logger.warning(f"Could not measure read replica lag, reading from the primary: {e}")
+            self.lag = None
+            return None
+        if self.lag is not None and self.lag <= self.config.max_lag_seconds < lag:
+            logger.warning(f"Read replica lags {lag:.1f}s behind, reading from the primary")
+        self.lag = lag
+        self.lag_measured_at = time.monotonic()
+        return lag
+
+    async def _run(self) -> None:
+        """Measure periodically until cancelled"""
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.config.lag_check_interval_seconds)
+
+    def start(self) -> None:
+        """Start measuring the lag in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop measuring"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Lag and routing counters for the health endpoint"""
+        return {
+            "lag_seconds": round(self.lag, 3) if self.lag is not None else None,
+            "usable": self.effective_lag() is not None,
+            "reads": dict(self.counts),
+        }
+
+
+class ReplicaRoutingTransport(httpx.BaseTransport):
+    """httpx transport wrapper sending reads to the replica when consistent"""
+
+    def __init__(self, transport: httpx.BaseTransport, router: ReplicaRouter):
+        self.transport = transport
+        self.router = router
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        state = _current_consistency.get()
+        if request.method not in _READ_METHODS:
+            response = self.transport.handle_request(request)
+            # RPC calls are POSTs and count as writes, to be safe
+            if response.status_code < 400:
+                self.router.record_write(state)
+            return response
+
+        if not _primary_only.get() and self.router.use_replica(state):
+            try:
+                response = self.transport.handle_request(self.router.to_replica(request))
+            except httpx.TransportError as e:
+                self.router.mark_failed(e)
+            else:
+                if response.status_code < 500:
+                    self.router.counts["replica"] += 1
+                    return response
+                response.close()
+                self.router.mark_failed(f"status {response.status_code}")
+            self.router.counts["fallback"] += 1
+
+        self.router.counts["primary"] += 1
+        return self.transport.handle_request(request)
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+# Global router, created on first use (None while disabled)
+_router: Optional[ReplicaRouter] = None
+_router_created = False
+
+
+def get_replica_router() -> Optional[ReplicaRouter]:
+    """
+    Get the process-wide replica router
+
+    Returns:
+        Optional[ReplicaRouter]: Router, None if no replica is configured
+    """
+    global _router, _router_created
+    if not _router_created:
+        _router_created = True
+        config = get_settings().replica
+        url = os.getenv("SUPABASE_REPLICA_URL", config.url or "")
+        if config.enabled and url:
+            _router = ReplicaRouter(config, url)
+        elif config.enabled:
+            logger.warning("replica.enabled is set but no SUPABASE_REPLICA_URL / replica.url; reading from the primary")
+    return _router
+
+
+def install_replica_routing(session: httpx.Client) -> None:
+    """
+    Route an httpx client's reads to the read replica, if one is configured
+
+    Args:
+        session: Client used for PostgREST calls (``supabase.postgrest.session``)
+    """
+    router = get_replica_router()
+    transport = getattr(session, "_transport", None)
+    if router is None or transport is None or isinstance(transport, ReplicaRoutingTransport):
+        return
+    session._transport = ReplicaRoutingTransport(transport, router)
+
+
+class ConsistencyMiddleware:
+    """
+    ASGI middleware tracking the consistency token of each request
+
+    Reads the token from the ``X-Consistency-Token`` header or the
+    consistency cookie; a request that wrote gets the new token in both.
+    """
+
+    def __init__(self, app, router: Optional[ReplicaRouter] = None):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        router = self.router or get_replica_router()
+        if scope["type"] != "http" or router is None or _current_consistency.get() is not None:
+            # No replica, or a batch operation sharing the enclosing request's state
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        header_token = parse_token(headers.get(TOKEN_HEADER.encode("latin-1"), b"").decode("latin-1"))
+        cookie_token = None
+        if b"cookie" in headers:
+            cookie = SimpleCookie()
+            cookie.load(headers[b"cookie"].decode("latin-1"))
+            if TOKEN_COOKIE in cookie:
+                cookie_token = parse_token(cookie[TOKEN_COOKIE].value)
+
+        authorization = headers.get(b"authorization")
+        try:
+            user_id: Optional[str] = get_current_user_id(authorization.decode("latin-1") if authorization else None)
+        except (HTTPException, ImportError):
+            user_id = None
+
+        state = ConsistencyState(user_id, router.token_for(user_id, header_token, cookie_token))
+        token = _current_consistency.set(state)
+
+        async def send_with_token(message):
+            if message["type"] == "http.response.start" and state.wrote_at is not None:
+                value = format_token(state.wrote_at)
+                max_age = int(router.config.max_lag_seconds + router.config.margin_seconds) + 1
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (TOKEN_HEADER.encode("latin-1"), value.encode("latin-1")),
+                    (b"set-cookie", (
+                        f"{TOKEN_COOKIE}={value}; Max-Age={max_age}; Path=/api; HttpOnly; SameSite=Lax"
+                    ).encode("latin-1")),
+                ]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_token)
+        finally:
+            _current_consistency.reset(token)
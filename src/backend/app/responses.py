@@ -0,0 +1,64 @@
+"""
+High-performance JSON responses for large list endpoints
+"""
+import dataclasses
+import json
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Fallback encoder for the stdlib json path"""
+    if dataclasses.is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when available
+
+    Falls back to compact stdlib json otherwise. Content must already be
+    JSON-compatible (dicts, lists, primitives, dates, dataclasses); it is
+    not run through ``jsonable_encoder``.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default)
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=_default,
+        ).encode("utf-8")
+
+
+def fast_json(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    Render content directly, bypassing FastAPI's response encoding
+
+    Args:
+        content: JSON-compatible content
+        response: Sub-response injected into the endpoint; headers set on it
+            by dependencies (e.g. ETag) are carried over
+
+    Returns:
+        FastJSONResponse: Rendered response
+    """
+    rendered = FastJSONResponse(content)
+    if response is not None:
+        for key, value in response.headers.items():
+            if key not in ("content-length", "content-type"):
+                rendered.headers[key] = value
+    return rendered
@@ -0,0 +1,95 @@
+"""
+Production server profile: gunicorn master with uvicorn workers
+
+The app is imported once in the gunicorn master (``preload_app``) and
+shared copy-on-write by the forked workers. The number of workers follows
+the CPUs the container may actually use (cgroup quota or CPU affinity),
+unless ``WEB_CONCURRENCY`` or ``server.workers`` sets it. Workers run on
+uvloop and httptools when installed.
+
+See ``gunicorn.conf.py``; run with ``gunicorn -c gunicorn.conf.py app.main:app``.
+"""
+import math
+import os
+from pathlib import Path
+from typing import Optional
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:  # uvicorn < 0.30 ships the worker itself
+    from uvicorn.workers import UvicornWorker
+
+
+def cgroup_cpu_limit(root: Path = Path("/sys/fs/cgroup")) -> Optional[float]:
+    """
+    Read the container's CPU quota
+
+    Args:
+        root: cgroup filesystem mount point
+
+    Returns:
+        Optional[float]: CPUs allowed by the quota (e.g. 1.5), None if unlimited
+    """
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        quota, period = (root / "cpu.max").read_text().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: quota -1 means unlimited
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> float:
+    """
+    CPUs this process can use: CPU affinity, capped by the cgroup quota
+    """
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:  # not available on macOS
+        cpus = float(os.cpu_count() or 1)
+    limit = cgroup_cpu_limit()
+    return min(cpus, limit) if limit is not None else cpus
+
+
+def worker_count(workers: Optional[int] = None, workers_per_core: float = 1.0, max_workers: int = 8) -> int:
+    """
+    Decide how many worker processes to run
+
+    ``WEB_CONCURRENCY`` wins over ``workers``; without either, one worker per
+    available CPU (times ``workers_per_core``, rounded up) up to
+    ``max_workers``.
+
+    Returns:
+        int: Number of workers, at least 1
+    """
+    override = os.getenv("WEB_CONCURRENCY")
+    if override:
+        return max(1, int(override))
+    if workers:
+        return max(1, workers)
+    return max(1, min(max_workers, math.ceil(available_cpus() * workers_per_core)))
+
+
+class ProductionWorker(UvicornWorker):
+    """
+    Uvicorn worker for the production profile
+
+    uvloop and httptools when installed (``uvicorn[standard]``), asyncio and
+    h11 otherwise; requests are logged by AccessLogMiddleware.
+    """
+
+    CONFIG_KWARGS = {
+        "loop": "auto",
+        "http": "auto",
+        "lifespan": "on",
+        "access_log": False,
+        "server_header": False,
+        # Client address from X-Forwarded-For of proxies in forwarded_allow_ips
+        "proxy_headers": True,
+    }
@@ -0,0 +1,170 @@
+"""
+Single-flight coalescing of identical concurrent reads
+
+When several devices or components request the same view at the same time,
+only the first request queries Supabase; the others wait for its result.
+A request that must observe a write (its consistency token, see app.replica)
+does not join a read that started before that write.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.metrics import record_cache
+from app.replica import required_write
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(request: Request, user_id: str) -> Tuple[Hashable, ...]:
+    """
+    Build a single-flight key from the user, endpoint and normalized query
+
+    Query parameters are sorted so ``?a=1&b=2`` and ``?b=2&a=1`` share a key.
+
+    Args:
+        request: Incoming request
+        user_id: User the data belongs to
+
+    Returns:
+        tuple: Hashable key
+    """
+    params = tuple(sorted(request.query_params.multi_items()))
+    return (user_id, request.url.path, params)
+
+
+async def call(fn: Callable[..., Any], *args: Any) -> Any:
+    """Await a coroutine function, or run a blocking one in the threadpool"""
+    if asyncio.iscoroutinefunction(fn):
+        return await fn(*args)
+    return await run_in_threadpool(fn, *args)
+
+
+class SingleFlight:
+    """
+    Share one execution of a blocking read among concurrent identical callers
+
+    Blocking reads run in the threadpool (the Supabase client is synchronous),
+    which also lets the event loop accept the duplicate requests meanwhile;
+    coroutine functions (direct queries) run as tasks.
+    A caller that disconnects does not cancel the read for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, Tuple[asyncio.Future, float]] = {}
+        self._executed: Dict[str, int] = defaultdict(int)
+        self._coalesced: Dict[str, int] = defaultdict(int)
+
+    async def run(self, key: Tuple[Hashable, ...], fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run ``fn(*args)`` unless an identical call is already in flight
+
+        Args:
+            key: Key from ``request_key``; its second element names the endpoint
+            fn: Blocking or coroutine function producing the result
+            *args: Arguments for ``fn``
+
+        Returns:
+            Any: Result of the shared call (shared, don't mutate it)
+        """
+        result, _ = await self.run_timed(key, fn, *args)
+        return result
+
+    async def run_timed(self, key: Tuple[Hashable, ...], fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+        """
+        Like ``run``, also returning when the shared read started
+
+        A call in flight is only joined if it started after the newest write
+        the current request must observe; otherwise a new read starts and
+        later identical requests join that one.
+
+        Returns:
+            Tuple[Any, float]: Result and start of the read (epoch seconds)
+        """
+        endpoint = key[1]
+        entry = self._inflight.get(key)
+        min_write = required_write()
+        if entry is not None and min_write is not None and entry[1] < min_write:
+            logger.debug(f"Not joining {endpoint} read started before the request's last write")
+            entry = None
+
+        record_cache("single_flight", entry is not None)
+        if entry is None:
+            self._executed[endpoint] += 1
+            entry = (asyncio.ensure_future(call(fn, *args)), time.time())
+            self._inflight[key] = entry
+            entry[0].add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self._coalesced[endpoint] += 1
+            logger.debug(f"Coalesced request for {endpoint}")
+
+        future, started = entry
+        return await asyncio.shield(future), started
+
+    def _finished(self, key: Tuple[Hashable, ...], future: asyncio.Future) -> None:
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the error as retrieved; all waiters may have been cancelled
+            future.exception()
+
+    def inflight(self) -> int:
+        """Number of reads currently in flight"""
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Executed and coalesced request counts per endpoint
+        """
+        return {
+            endpoint: {
+                "executed": self._executed[endpoint],
+                "coalesced": self._coalesced.get(endpoint, 0),
+            }
+            for endpoint in sorted(self._executed)
+        }
+
+
+# Global single-flight instance
+single_flight = SingleFlight()
+
+
+async def coalesce(request: Request, user_id: str, fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a read for a request through the single-flight layer (if enabled)
+
+    Args:
+        request: Incoming request, used to build the key
+        user_id: User the data belongs to
+        fn: Blocking or coroutine function producing the result
+        *args: Arguments for ``fn``
+
+    Returns:
+        Any: Result of ``fn``
+    """
+    result, _ = await coalesce_timed(request, user_id, fn, *args)
+    return result
+
+
+async def coalesce_timed(request: Request, user_id: str, fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """
+    Like ``coalesce``, also returning when the read started (epoch seconds)
+    """
+    if not get_settings().single_flight.enabled:
+        started = time.time()
+        return await call(fn, *args), started
+    return await single_flight.run_timed(request_key(request, user_id), fn, *args)
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Get the process-wide single-flight instance
+    """
+    return single_flight
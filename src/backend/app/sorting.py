@@ -0,0 +1,116 @@
+"""
+Sort orders (``?sort=priority,-due_date``) for list endpoints
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+
+# Sort keys accepted in one request
+MAX_SORT_KEYS = 3
+
+# Sortable response fields and their columns. The common orders (tasks by
+# due_date, priority, -created_at or -last_edited; projects by name or
+# -updated_at) are backed by indexes from sql/create_list_query_indexes.sql,
+# so a page is read off the index instead of sorting all matching rows.
+TASK_SORT_COLUMNS = {
+    "priority": "priority",
+    "due_date": "do_on_date",
+    "created_at": "created_at",
+    "last_edited": "last_edited",
+    "name": "task_name",
+}
+PROJECT_SORT_COLUMNS = {
+    "name": "project_name",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+
+class SortKey(NamedTuple):
+    column: str
+    descending: bool
+
+
+class Ordering:
+    """
+    Resolved sort order of a request
+
+    Empty values sort last in both directions, and the id is appended as the
+    final key so that equal values keep a stable order across pages.
+    """
+
+    def __init__(self, keys: Tuple[SortKey, ...]):
+        """
+        Args:
+            keys: Columns to order by, most significant first
+        """
+        self.keys = keys
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def apply(self, query):
+        """
+        Add the ordering to a Supabase query
+
+        Args:
+            query: Select query builder
+
+        Returns:
+            The query, ordered (unchanged without sort keys)
+        """
+        if not self.keys:
+            return query
+        for key in self.keys:
+            query = query.order(key.column, desc=key.descending, nullsfirst=False)
+        return query.order("id")
+
+
+class SortOrder:
+    """
+    Dependency resolving the ``sort`` query parameter to an ordering
+
+    The parameter lists response field names, most significant first; a
+    leading ``-`` sorts descending. Without it the database order is kept.
+    Unknown and repeated keys are rejected with 422.
+    """
+
+    def __init__(self, columns: Dict[str, str]):
+        """
+        Args:
+            columns: Sortable response fields and the columns they are read from
+        """
+        self.columns = columns
+
+    def __call__(
+        self,
+        sort: Optional[str] = Query(
+            None,
+            description="Comma-separated fields to sort by, '-' prefix for descending (e.g. priority,-created_at)"
+        )
+    ) -> Ordering:
+        if not sort:
+            return Ordering(())
+
+        names = [name.strip() for name in sort.split(",") if name.strip()]
+        keys = []
+        seen = set()
+        for name in names:
+            field = name[1:] if name.startswith("-") else name
+            if field not in self.columns:
+                self._reject(f"Unknown sort field: {field}. Allowed fields: {', '.join(self.columns)}")
+            if field in seen:
+                self._reject(f"Sort field given more than once: {field}")
+            seen.add(field)
+            keys.append(SortKey(self.columns[field], name.startswith("-")))
+
+        if len(keys) > MAX_SORT_KEYS:
+            self._reject(f"At most {MAX_SORT_KEYS} sort fields are allowed")
+        return Ordering(tuple(keys))
+
+    @staticmethod
+    def _reject(detail: str) -> None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail
+        )
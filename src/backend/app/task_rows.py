@@ -0,0 +1,204 @@
+"""
+Transformation of Notion task export rows into gtd_tasks records
+
+The backend's import endpoint cannot use src/etl_tasks.py: the ETL scripts
+are not part of the backend image and need pandas. This module produces the
+same records as ``GTDTasksETL.transform_task_row`` from plain rows (csv
+module or JSON); tests/test_imports.py checks both stay in line.
+"""
+import logging
+import math
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.database import Client
+
+logger = logging.getLogger(__name__)
+
+# Common date formats in Notion exports
+DATE_FORMATS = [
+    "%B %d, %Y %I:%M %p",  # "March 6, 2022 1:46 PM"
+    "%B %d, %Y",           # "February 28, 2022"
+    "%Y-%m-%d %H:%M:%S",   # ISO format
+    "%Y-%m-%d",            # ISO date only
+]
+
+
+def is_missing(value: Any) -> bool:
+    """None or NaN (what pandas reads for empty cells)"""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class TaskRowTransformer:
+    """Transform export rows of one user, with cached field and project lookups"""
+
+    def __init__(self, user_id: str, supabase: Client):
+        """
+        Args:
+            user_id: Owner of the imported tasks
+            supabase: Client for the field and project lookups (and inserts)
+        """
+        self.user_id = user_id
+        self.supabase = supabase
+        self.tasks_table = "gtd_tasks"
+        self.projects_table = "gtd_projects"
+        self.fields_table = "gtd_fields"
+
+        self._field_id_cache: Optional[Dict[str, int]] = None
+        self._project_mapping_cache: Optional[Dict[str, int]] = None
+
+    def get_field_id_mapping(self) -> Dict[str, int]:
+        """Get field name to ID mapping from database"""
+        if self._field_id_cache is None:
+            try:
+                result = self.supabase.table(self.fields_table).select("id, name").execute()
+                self._field_id_cache = {field["name"]: field["id"] for field in result.data}
+            except Exception as e:
+                logger.error(f"Error loading field mapping: {e}")
+                self._field_id_cache = {"Private": 1, "Work": 2}
+                logger.warning(f"Using fallback field mapping: {self._field_id_cache}")
+
+        return self._field_id_cache
+
+    def get_project_mapping(self) -> Dict[str, int]:
+        """Get project name (and readings) to ID mapping from database"""
+        if self._project_mapping_cache is None:
+            try:
+                result = (
+                    self.supabase.table(self.projects_table)
+                    .select("id, project_name, readings")
+                    .eq("user_id", self.user_id)
+                    .execute()
+                )
+                self._project_mapping_cache = {}
+                for project in result.data:
+                    if project.get("project_name"):
+                        self._project_mapping_cache[project["project_name"].strip().lower()] = project["id"]
+                    if project.get("readings"):
+                        self._project_mapping_cache[project["readings"].strip().lower()] = project["id"]
+            except Exception as e:
+                logger.error(f"Error loading project mapping: {e}")
+                self._project_mapping_cache = {}
+
+        return self._project_mapping_cache
+
+    def normalize_boolean(self, value: Any) -> bool:
+        """Convert string boolean values to Python boolean"""
+        if is_missing(value):
+            return False
+        return str(value).strip().lower() in ["yes", "true", "1"]
+
+    def normalize_field_id(self, value: Any) -> Optional[int]:
+        """Convert field value to field ID"""
+        if is_missing(value) or str(value).strip() == "":
+            return None
+
+        value_str = str(value).strip()
+        field_mapping = self.get_field_id_mapping()
+        if value_str.lower() == "private":
+            return field_mapping.get("Private")
+        if value_str.lower() == "work":
+            return field_mapping.get("Work")
+        return field_mapping.get(value_str)
+
+    def parse_project_reference(self, project_ref: Any) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Parse a "Project Name (https://www.notion.so/...)" reference
+
+        Returns:
+            Tuple[Optional[str], Optional[int]]: Project name and ID
+        """
+        if not project_ref or is_missing(project_ref):
+            return None, None
+
+        project_ref = str(project_ref).strip()
+        match = re.match(r"^([^(]+)(?:\s*\([^)]*\))?", project_ref)
+        project_name = match.group(1).strip() if match else project_ref
+
+        project_mapping = self.get_project_mapping()
+        project_id = project_mapping.get(project_name.lower())
+        if not project_id:
+            # Fuzzy matching
+            for mapped_name, mapped_id in project_mapping.items():
+                if project_name.lower() in mapped_name or mapped_name in project_name.lower():
+                    project_id = mapped_id
+                    break
+
+        return project_name, project_id
+
+    def parse_date(self, date_str: Any) -> Optional[datetime]:
+        """Parse a Notion export date"""
+        if not date_str or is_missing(date_str):
+            return None
+
+        date_str = str(date_str).strip()
+        if not date_str:
+            return None
+
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+
+        logger.warning(f"Could not parse date: {date_str}")
+        return None
+
+    def clean_value(self, value: Any) -> Any:
+        """Clean value to be JSON-compatible"""
+        if is_missing(value):
+            return None
+        if hasattr(value, "isoformat"):  # datetime and date objects
+            return value.isoformat()
+
+        str_value = str(value).strip()
+        if str_value in ["nan", "NaN", ""]:
+            return None
+        return str_value
+
+    def transform_task_row(self, row: Dict[str, Any], row_num: int, source_file: str) -> Dict[str, Any]:
+        """Transform a single export row into a gtd_tasks record"""
+        project_name, project_id = self.parse_project_reference(row.get("🚀Project"))
+
+        last_edited = self.parse_date(row.get("Last editted"))
+        date_of_creation = self.parse_date(row.get("Date of creation"))
+        do_on_date_parsed = self.parse_date(row.get("📆Do on date"))
+        do_on_date = do_on_date_parsed.date() if do_on_date_parsed else None
+
+        done_at = None
+        if self.normalize_boolean(row.get("🟩Done")):
+            # Last edit as completion time, else the creation time
+            done_at = last_edited or date_of_creation
+
+        return {
+            "user_id": self.user_id,
+            "notion_export_row": row_num,
+            "task_name": self.clean_value(row.get("Task name")) or f"Task_{row_num}",
+            "project_id": project_id,
+            "project_reference": self.clean_value(project_name),
+
+            # Status flags
+            "done_at": self.clean_value(done_at),
+            "do_today": self.normalize_boolean(row.get("✨Do today")),
+            "do_this_week": self.normalize_boolean(row.get("🌙Do this week")),
+            "is_reading": self.normalize_boolean(row.get("📙Reading")),
+            "wait_for": self.normalize_boolean(row.get("⌛Wait for")),
+            "postponed": self.normalize_boolean(row.get("Postponed")),
+            "reviewed": self.normalize_boolean(row.get("👌Reviewed")),
+
+            # Dates and timing
+            "do_on_date": self.clean_value(do_on_date),
+            "last_edited": self.clean_value(last_edited),
+            "date_of_creation": self.clean_value(date_of_creation),
+
+            # Additional fields
+            "field_id": self.normalize_field_id(row.get("👔Field")),
+            "priority": self.clean_value(row.get("Project's priority")),
+            "time_expenditure": self.clean_value(row.get("Time expenditure")),
+            "url": self.clean_value(row.get("🕸URL")),
+            "knowledge_db_entry": self.clean_value(row.get("🎓Related Knowledge DB entry")),
+
+            # Metadata
+            "source_file": source_file
+        }
@@ -0,0 +1,311 @@
+"""
+Per-request tracing of Supabase calls
+
+Every PostgREST call made while serving a request is recorded with its
+table, operation, filter shape, duration, rows and bytes returned. The
+totals are sent to the client in a ``Server-Timing`` header, the individual
+queries are logged at debug level, and optionally every request is exported
+as an OpenTelemetry trace with one span per query.
+"""
+import contextvars
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import parse_qsl
+
+import httpx
+
+from app.config import TracingConfig, get_settings
+from app.metrics import describe_postgrest_call, route_template
+
+logger = logging.getLogger(__name__)
+
+
+def _ns(seconds: float) -> int:
+    """Epoch seconds to OpenTelemetry nanoseconds"""
+    return int(seconds * 1e9)
+
+
+# Query parameters that shape a PostgREST request without being filters
+_MODIFIERS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+@dataclass
+class QueryRecord:
+    """One PostgREST call"""
+    table: str
+    operation: str
+    shape: str
+    start: float
+    duration: float
+    status: Optional[int] = None
+    rows: Optional[int] = None
+    bytes: int = 0
+
+
+@dataclass
+class RequestTrace:
+    """Queries made while serving one request"""
+    method: str
+    path: str
+    start: float = field(default_factory=time.time)
+    parent: Optional["RequestTrace"] = None
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    @property
+    def rows(self) -> int:
+        return sum(query.rows or 0 for query in self.queries)
+
+    @property
+    def bytes(self) -> int:
+        return sum(query.bytes for query in self.queries)
+
+    def server_timing(self, total: float) -> str:
+        """
+        Render the Server-Timing header value
+
+        Args:
+            total: Seconds spent on the request so far
+        """
+        desc = f"{len(self.queries)} queries, {self.rows} rows, {self.bytes} bytes"
+        return f'db;dur={self.db_seconds * 1000:.1f};desc="{desc}", total;dur={total * 1000:.1f}'
+
+
+# Trace of the request being served (copied into threadpool workers)
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+
+
+def get_current_trace() -> Optional[RequestTrace]:
+    """
+    Get the trace of the request being served, if any
+    """
+    return _current_trace.get()
+
+
+def query_shape(request: httpx.Request) -> str:
+    """
+    Describe the filters of a PostgREST request without their values
+
+    ``?user_id=eq.abc&deleted_at=is.null&select=*&limit=10`` becomes
+    ``user_id=eq,deleted_at=is,select,limit``.
+    """
+    parts = []
+    for key, value in parse_qsl(request.url.query.decode("ascii"), keep_blank_values=True):
+        if key in _MODIFIERS:
+            parts.append(key)
+        elif key in ("or", "and", "not.or", "not.and"):
+            parts.append(f"{key}(...)")
+        else:
+            operator = value.split(".", 2)
+            parts.append(f"{key}={operator[1] if operator[0] == 'not' and len(operator) > 1 else operator[0]}")
+    return ",".join(parts)
+
+
+def returned_rows(response: httpx.Response) -> Optional[int]:
+    """
+    Number of rows in a PostgREST response, from its Content-Range header
+
+    ``0-24/*`` is 25 rows, ``*/0`` or ``*/*`` none.
+    """
+    content_range = response.headers.get("content-range")
+    if not content_range:
+        return None
+    span = content_range.split("/", 1)[0]
+    if span == "*":
+        return 0
+    try:
+        first, last = span.split("-", 1)
+        return int(last) - int(first) + 1
+    except ValueError:
+        return None
+
+
+def record_query(trace: RequestTrace, record: QueryRecord) -> None:
+    """Add a query to a trace; batch operations also count towards the enclosing request"""
+    while trace is not None:
+        trace.queries.append(record)
+        trace = trace.parent
+
+
+class TracingTransport(httpx.BaseTransport):
+    """httpx transport wrapper recording PostgREST calls in the current trace"""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        trace = _current_trace.get()
+        if trace is None:
+            return self.transport.handle_request(request)
+
+        table, operation = describe_postgrest_call(request)
+        record = QueryRecord(table, operation, query_shape(request), time.time(), 0.0)
+        start = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+            # Read the body here so the duration and size include the transfer
+            response.read()
+            record.status = response.status_code
+            record.rows = returned_rows(response)
+            record.bytes = len(response.content)
+            return response
+        finally:
+            record.duration = time.perf_counter() - start
+            record_query(trace, record)
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+def install_tracing_transport(session: httpx.Client) -> None:
+    """
+    Record an httpx client's outbound calls in request traces
+
+    Args:
+        session: Client used for PostgREST calls (``supabase.postgrest.session``)
+    """
+    transport = getattr(session, "_transport", None)
+    if transport is None or isinstance(transport, TracingTransport):
+        return
+    session._transport = TracingTransport(transport)
+
+
+class OTelExporter:
+    """Export finished request traces as OpenTelemetry spans (OTLP over HTTP)"""
+
+    def __init__(self, config: TracingConfig):
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.trace import SpanKind, set_span_in_context
+
+        self._span_kind = SpanKind
+        self._set_span_in_context = set_span_in_context
+        self.provider = TracerProvider(resource=Resource.create({"service.name": config.otel_service_name}))
+        self.provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=config.otel_endpoint)))
+        self.tracer = self.provider.get_tracer(__name__)
+
+    def export(self, trace: RequestTrace, route: str, status_code: Optional[int], end: float) -> None:
+        """Emit a server span for the request and a client span per query"""
+        span = self.tracer.start_span(
+            f"{trace.method} {route}",
+            kind=self._span_kind.SERVER,
+            start_time=_ns(trace.start),
+            attributes={
+                "http.request.method": trace.method,
+                "http.route": route,
+                "url.path": trace.path,
+                "http.response.status_code": status_code or 0,
+                "db.query_count": len(trace.queries),
+            },
+        )
+        context = self._set_span_in_context(span)
+        for query in trace.queries:
+            child = self.tracer.start_span(
+                f"{query.operation} {query.table}",
+                context=context,
+                kind=self._span_kind.CLIENT,
+                start_time=_ns(query.start),
+                attributes={
+                    "db.system": "postgresql",
+                    "db.collection.name": query.table,
+                    "db.operation.name": query.operation,
+                    "db.query.summary": query.shape,
+                    "db.response.returned_rows": query.rows if query.rows is not None else -1,
+                    "http.response.status_code": query.status or 0,
+                    "http.response.body.size": query.bytes,
+                },
+            )
+            child.end(end_time=_ns(query.start + query.duration))
+        span.end(end_time=_ns(end))
+
+
+def create_otel_exporter(config: TracingConfig) -> Optional[OTelExporter]:
+    """
+    Create the OpenTelemetry exporter if enabled and installed
+
+    Returns:
+        Optional[OTelExporter]: Exporter, or None
+    """
+    if not config.otel_enabled:
+        return None
+    try:
+        return OTelExporter(config)
+    except ImportError as e:
+        logger.warning(
+            "tracing.otel_enabled is set but opentelemetry-sdk / "
+            f"opentelemetry-exporter-otlp-proto-http are not installed: {e}"
+        )
+        return None
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware collecting the Supabase calls of each request
+
+    Adds ``Server-Timing`` (and ``Timing-Allow-Origin`` for allowed CORS
+    origins, so browsers expose it to the frontend).
+    """
+
+    def __init__(self, app, config: Optional[TracingConfig] = None):
+        self.app = app
+        self.config = config or get_settings().tracing
+        self.allowed_origins = {origin.encode("latin-1") for origin in get_settings().cors.origins}
+        self.otel = create_otel_exporter(self.config)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.config.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope["method"], scope["path"], parent=_current_trace.get())
+        token = _current_trace.set(trace)
+        status_code: Optional[int] = None
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start" and self.config.server_timing:
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing(time.perf_counter() - start).encode("latin-1")))
+                origin = dict(scope.get("headers") or []).get(b"origin")
+                if origin in self.allowed_origins:
+                    headers.append((b"timing-allow-origin", origin))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            self._finish(scope, trace, status_code)
+
+    def _finish(self, scope, trace: RequestTrace, status_code: Optional[int]) -> None:
+        """Log the request's queries and export the trace"""
+        if self.config.log_queries and trace.queries and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"{trace.method} {trace.path}: {len(trace.queries)} queries, "
+                f"{trace.db_seconds * 1000:.1f} ms, {trace.rows} rows, {trace.bytes} bytes"
+            )
+            for query in trace.queries:
+                logger.debug(
+                    f"  {query.operation} {query.table} [{query.shape}] "
+                    f"{query.duration * 1000:.1f} ms, {query.rows} rows, {query.bytes} bytes, status {query.status}"
+                )
+
+        if self.otel is not None and trace.parent is None:
+            try:
+                self.otel.export(trace, route_template(scope), status_code, time.time())
+            except Exception as e:
+                logger.warning(f"OpenTelemetry export failed: {e}")
@@ -0,0 +1,66 @@
+"""
+Gunicorn configuration for the production server profile
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Workers are sized from the CPUs the container may use (see app/server.py);
+set WEB_CONCURRENCY or server.workers to pin the number.
+"""
+import os
+import shutil
+import tempfile
+
+from app.config import get_settings
+from app.server import worker_count
+
+settings = get_settings()
+server = settings.server
+
+bind = f"{server.host}:{server.port}"
+workers = worker_count(server.workers, server.workers_per_core, server.max_workers)
+worker_class = "app.server.ProductionWorker"
+preload_app = server.preload
+timeout = server.timeout_seconds
+graceful_timeout = server.graceful_timeout_seconds
+keepalive = server.keepalive_seconds
+# Client addresses from X-Forwarded-For of the ingress proxy (rate limiting)
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", server.forwarded_allow_ips)
+
+# Requests are logged by AccessLogMiddleware
+accesslog = None
+errorlog = "-"
+loglevel = settings.logging.level.lower()
+
+# Worker heartbeat files in memory; the root filesystem is read-only in k8s
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+# No gunicornc control socket (gunicorn >= 25.1 puts it under $HOME)
+control_socket_disable = True
+
+# Prometheus metrics are per process; with several workers each writes its
+# samples to a shared directory and /metrics aggregates them. Must be set
+# before the app (and prometheus_client) is imported.
+if workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="gtd-prometheus-")
+elif os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    # Samples of a previous run must not be aggregated
+    shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+
+def when_ready(arbiter):
+    arbiter.log.info(
+        f"Serving {', '.join(arbiter.cfg.bind)} with {arbiter.num_workers} workers "
+        f"(preload={arbiter.cfg.preload_app}, WEB_CONCURRENCY={os.getenv('WEB_CONCURRENCY', 'unset')})"
+    )
+
+
+def on_exit(arbiter):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+
+
+def child_exit(arbiter, worker):
+    """Drop live gauges of exited workers from the aggregated metrics"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
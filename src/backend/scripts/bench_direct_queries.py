@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark the heavy read endpoints on PostgREST versus direct asyncpg queries
+Both paths run the endpoint code against the same database: PostgREST via
+SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY, asyncpg via DATABASE_URL
+
+    DATABASE_URL=postgresql://... python scripts/bench_direct_queries.py --seed 5000
+
+--seed adds synthetic tasks and projects for the user (removed afterwards),
+so both paths see a dataset of known size. Times include mapping and JSON
+rendering, i.e. everything the endpoint does except HTTP to the client.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import direct as direct_module
+from app.api.dashboard import compute_dashboard_stats, fetch_dashboard_stats
+from app.api.export import export_stream
+from app.api.tasks import search_tasks
+from app.api.weekly_review import get_projects_to_review, get_tasks_to_review
+from app.change_feed import asyncpg_dsn
+from app.config import get_settings
+from app.database import get_supabase_client
+from app.direct import DirectDatabase
+from app.schemas import TASK_SUMMARY
+
+SEED_SOURCE = "bench_direct_queries"
+
+
+async def seed(db: DirectDatabase, user_id: str, tasks: int) -> None:
+    """Insert synthetic projects and tasks tagged with SEED_SOURCE"""
+    now = datetime.now()
+    async with db.pool.acquire() as connection:
+        await connection.executemany(
+            "INSERT INTO gtd_projects (user_id, project_name, done_status, do_this_week, source_file, "
+            "created_at, updated_at) VALUES ($1, $2, $3, $4, $5, $6, $7)",
+            [
+                (user_id, f"Bench project {i}", i % 4 == 0, i % 5 == 0, SEED_SOURCE,
+                 now - timedelta(days=i % 60), now - timedelta(days=i % 20))
+                for i in range(max(1, tasks // 10))
+            ]
+        )
+        await connection.executemany(
+            "INSERT INTO gtd_tasks (user_id, task_name, done_at, do_today, do_this_week, is_reading, wait_for, "
+            "postponed, reviewed, do_on_date, last_edited, priority, source_file, created_at, updated_at) "
+            "VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)",
+            [
+                (user_id, f"Bench task {i} {'report' if i % 10 == 0 else 'call'}",
+                 now - timedelta(days=i % 40) if i % 3 == 0 else None,
+                 i % 7 == 0, i % 5 == 0, i % 11 == 0, i % 13 == 0, False, i % 2 == 0,
+                 (now + timedelta(days=i % 30 - 15)).date() if i % 4 == 0 else None,
+                 now - timedelta(days=i % 14), 1 + i % 5, SEED_SOURCE,
+                 now - timedelta(days=i % 90), now - timedelta(days=i % 30))
+                for i in range(tasks)
+            ]
+        )
+
+
+async def unseed(db: DirectDatabase) -> None:
+    """Remove the synthetic rows"""
+    async with db.pool.acquire() as connection:
+        await connection.execute("DELETE FROM gtd_tasks WHERE source_file = $1", SEED_SOURCE)
+        await connection.execute("DELETE FROM gtd_projects WHERE source_file = $1", SEED_SOURCE)
+
+
+async def export_size(supabase, user_id: str, page_size: int) -> int:
+    """Stream the task export; return its size in bytes"""
+    size = 0
+    async for chunk in export_stream(supabase, ["tasks"], user_id, "ndjson", page_size):
+        size += len(chunk)
+    return size
+
+
+def cases(supabase, db: DirectDatabase, user_id: str, page_size: int):
+    """(name, PostgREST call, direct call); each call returns a result size"""
+    async def rest_dashboard():
+        return len(compute_dashboard_stats(supabase, user_id))
+
+    async def direct_dashboard():
+        return len(await fetch_dashboard_stats(db, user_id))
+
+    async def endpoint(fn, *args):
+        return len((await fn(*args)).body)
+
+    return [
+        ("dashboard stats", rest_dashboard, direct_dashboard),
+        ("tasks to review", lambda: endpoint(get_tasks_to_review, supabase), None),
+        ("projects to review", lambda: endpoint(get_projects_to_review, supabase), None),
+        ("search tasks", lambda: endpoint(search_tasks, "report", None, 0, 100, TASK_SUMMARY, supabase), None),
+        ("export tasks", lambda: export_size(supabase, user_id, page_size), None),
+    ]
+
+
+async def measure(call, iterations: int):
+    """Run a call repeatedly; return (median ms, p95 ms, last result size)"""
+    await call()  # warm up connections and statement caches
+    times = []
+    size = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        size = await call()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95)], size
+
+
+async def run(args) -> None:
+    settings = get_settings()
+    user_id = args.user_id or settings.gtd.default_user_id
+    supabase = get_supabase_client()
+    db = DirectDatabase(asyncpg_dsn(settings.database_url_asyncpg), settings.direct_queries)
+    if not await db.start():
+        sys.exit("Cannot connect to DATABASE_URL")
+
+    try:
+        if args.seed:
+            await seed(db, user_id, args.seed)
+
+        print("⏱️  Heavy reads: PostgREST vs direct asyncpg")
+        print(f"user {user_id}, {args.iterations} iterations per path, export page size {args.page_size}")
+        print("=" * 84)
+        print(f"{'endpoint':<20} {'PostgREST p50':>14} {'p95':>8} {'direct p50':>11} {'p95':>8} {'speedup':>8} {'size':>10}")
+
+        for name, rest_call, direct_call in cases(supabase, db, user_id, args.page_size):
+            # Endpoints pick the direct path when the global pool is set
+            direct_module._direct_db = None
+            rest_p50, rest_p95, rest_size = await measure(rest_call, args.iterations)
+            direct_module._direct_db = db
+            direct_p50, direct_p95, direct_size = await measure(direct_call or rest_call, args.iterations)
+            direct_module._direct_db = None
+
+            size = f"{rest_size}" if rest_size == direct_size else f"{rest_size}/{direct_size}"
+            print(f"{name:<20} {rest_p50:>11.1f} ms {rest_p95:>8.1f} {direct_p50:>8.1f} ms {direct_p95:>8.1f} "
+                  f"{rest_p50 / direct_p50:>7.1f}x {size:>10}")
+    finally:
+        if args.seed:
+            await unseed(db)
+        await db.stop()
+
+
+def main():
+    """Parse arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user-id", help="user whose data is read (default: gtd.default_user_id)")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic tasks to add for the run")
+    parser.add_argument("--iterations", type=int, default=20, help="timed runs per endpoint and path")
+    parser.add_argument("--page-size", type=int, default=1000, help="export page size")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
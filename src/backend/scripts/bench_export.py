@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming export on 1M task rows
+
+Rows come from a synthetic keyset source shaped like the Supabase query
+builder, generated page by page, so the measured memory is that of the
+export pipeline itself. The buffered baseline collects all pages into one
+list and renders it at once, as a client paging through get_tasks (or a
+naive export endpoint) would.
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.export import export_stream
+from app.responses import FastJSONResponse
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def make_row(i):
+    """Build a row shaped like a select("*") on gtd_tasks"""
+    return {
+        "id": i,
+        "user_id": USER_ID,
+        "notion_export_row": i + 2,
+        "task_name": f"Task {i}",
+        "project_id": i % 50,
+        "project_reference": f"Project {i % 50}",
+        "done_at": None if i % 3 else "2025-06-01T12:00:00",
+        "do_today": i % 7 == 0,
+        "do_this_week": i % 5 == 0,
+        "is_reading": False,
+        "wait_for": False,
+        "postponed": False,
+        "reviewed": i % 2 == 0,
+        "do_on_date": "2025-06-30" if i % 4 == 0 else None,
+        "last_edited": "2025-06-01T08:00:00",
+        "date_of_creation": "2025-01-01T08:00:00",
+        "field_id": 1 + i % 2,
+        "priority": 1 + i % 5,
+        "time_expenditure": None,
+        "url": None,
+        "knowledge_db_entry": None,
+        "source_file": "GTD_Tasks_all.csv",
+        "created_at": "2025-01-01T08:00:00",
+        "updated_at": "2025-06-01T08:00:00",
+        "deleted_at": None
+    }
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class KeysetSource:
+    """Minimal stand-in for the query builder serving ``id > n`` pages"""
+
+    def __init__(self, total):
+        self.total = total
+        self.queries = 0
+
+    def table(self, name):
+        self._after = 0
+        self._limit = self.total
+        return self
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def is_(self, *args):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def gt(self, column, value):
+        self._after = value
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def execute(self):
+        self.queries += 1
+        end = min(self._after + self._limit, self.total)
+        return Result([make_row(i) for i in range(self._after + 1, end + 1)])
+
+
+async def consume(stream):
+    """Drain a stream, returning the number of bytes"""
+    size = 0
+    async for chunk in stream:
+        size += len(chunk)
+    return size
+
+
+def run_streaming(total, fmt, page_size):
+    """Return (seconds, bytes, peak traced bytes, queries)"""
+    source = KeysetSource(total)
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = asyncio.run(consume(export_stream(source, ["tasks"], USER_ID, fmt, page_size)))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size, peak, source.queries
+
+
+def run_buffered(total, page_size):
+    """Collect all pages, then render one JSON array"""
+    source = KeysetSource(total)
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = []
+    after_id = 0
+    while True:
+        page = source.table("gtd_tasks").gt("id", after_id).limit(page_size).execute().data
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        after_id = page[-1]["id"]
+    size = len(FastJSONResponse(rows).body)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size, peak, source.queries
+
+
+def report(label, total, elapsed, size, peak, queries):
+    print(
+        f"{total:>9,} {label:<16} {elapsed:>8.2f} {total / elapsed:>12,.0f} "
+        f"{size / elapsed / 2**20:>8.1f} {peak / 2**20:>10.1f} {queries:>8}"
+    )
+
+
+def main():
+    """Run the export benchmark"""
+    page_size = 1000
+
+    print("⏱️  Streaming export benchmark (page size 1000)")
+    print("=" * 72)
+    print(f"{'rows':>9} {'mode':<16} {'time (s)':>8} {'rows/s':>12} {'MiB/s':>8} {'peak (MiB)':>10} {'queries':>8}")
+
+    for total in (100_000, 1_000_000):
+        report("stream ndjson", total, *run_streaming(total, "ndjson", page_size))
+        report("stream csv", total, *run_streaming(total, "csv", page_size))
+
+    # The buffered baseline grows with the data; 1M rows needs several GiB
+    report("buffered json", 100_000, *run_buffered(100_000, page_size))
+
+
+if __name__ == "__main__":
+    main()
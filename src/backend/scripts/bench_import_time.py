@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start import time of the application
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and
+reports the total and the top-level packages that take the most time
+"""
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def run_importtime(module):
+    """Import a module in a fresh interpreter; return [(self µs, cumulative µs, name)]"""
+    env = dict(os.environ)
+    env.setdefault("CONFIG_FILE", "test_config.yaml")
+    env.pop("GTD_CONFIG_PATH", None)
+    env.pop("GTD_DOTENV_PATH", None)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            rows.append((int(own), int(cumulative), name.rstrip()))
+    return rows
+
+
+def main():
+    """Run the benchmark"""
+    module = sys.argv[1] if len(sys.argv) > 1 else "app.main"
+    runs = 5
+
+    print("⏱️  Import time benchmark")
+    print(f"python -X importtime -c 'import {module}', {runs} cold runs")
+    print("=" * 72)
+
+    totals = []
+    by_package = defaultdict(list)
+    for _ in range(runs):
+        rows = run_importtime(module)
+        totals.append(next(cumulative for _, cumulative, name in rows if name.strip() == module) / 1000)
+
+        # Self time summed per top-level package, imports of the app excluded
+        packages = defaultdict(int)
+        for own, _, name in rows:
+            packages[name.strip().split(".")[0]] += own
+        for package, own in packages.items():
+            by_package[package].append(own / 1000)
+
+    print(f"total: median {statistics.median(totals):.0f} ms, best {min(totals):.0f} ms")
+    print("-" * 72)
+    print(f"{'package':<30} {'median self time (ms)':>22}")
+    ranked = sorted(by_package.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for package, samples in ranked[:20]:
+        print(f"{package:<30} {statistics.median(samples):>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
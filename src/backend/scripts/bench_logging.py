@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request overhead of request logging middleware
+Compares the former @app.middleware("http") logger (two synchronous info
+lines per request) with AccessLogMiddleware on the queued logging pipeline,
+writing to /dev/null and to a slow sink standing in for a contended stdout
+"""
+import asyncio
+import io
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+from app.config import LoggingConfig
+from app.logs import AccessLogMiddleware, configure_logging, stop_logging
+
+FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class SlowSink(io.TextIOBase):
+    """Stream whose writes take ``delay`` seconds (a pipe nobody drains quickly)"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, text):
+        time.sleep(self.delay)
+        return len(text)
+
+
+def make_app():
+    """Application with one trivial route, so logging dominates the cost"""
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    return app
+
+
+def legacy_app(stream):
+    """The former setup: basicConfig-style stdout handler and an http middleware"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    logger = logging.getLogger("app.main")
+
+    app = make_app()
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        start_time = time.time()
+        logger.info(f"{request.method} {request.url} - Started")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(
+            f"{request.method} {request.url} - "
+            f"Status: {response.status_code} - "
+            f"Time: {process_time:.3f}s"
+        )
+        return response
+
+    return app
+
+
+def queued_app(stream, json_format, sample_rate):
+    """AccessLogMiddleware on the queued pipeline"""
+    config = LoggingConfig(
+        level="INFO",
+        format=FORMAT,
+        json_format=json_format,
+        access_sample_rate=sample_rate,
+        queue_size=100_000
+    )
+    configure_logging(config, stream)
+    app = make_app()
+    app.add_middleware(AccessLogMiddleware, config=config)
+    return app
+
+
+def bare_app():
+    """No request logging at all (baseline)"""
+    logging.getLogger().handlers.clear()
+    return make_app()
+
+
+async def drive(app, count):
+    """Send ``count`` GET requests straight through the ASGI interface"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/api/ping", "raw_path": b"/api/ping",
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+
+
+def measure(app, count, repeat=3):
+    """Return best microseconds per request"""
+    asyncio.run(drive(app, 200))  # warm up (builds the middleware stack)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(drive(app, count))
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e6
+
+
+def main():
+    """Run benchmark against /dev/null and a slow sink"""
+    count = 5_000
+    print("⏱️  Request logging middleware benchmark")
+    print(f"{count} requests per run, best of 3")
+    print("=" * 72)
+    print(f"{'sink':<14} {'setup':<30} {'µs/request':>11} {'overhead (µs)':>14}")
+
+    devnull = open(os.devnull, "w")
+    sinks = [("/dev/null", devnull), ("slow (50 µs)", SlowSink(0.00005))]
+
+    for sink_name, sink in sinks:
+        baseline = measure(bare_app(), count)
+        setups = [
+            ("none (baseline)", lambda: bare_app()),
+            ("legacy http middleware", lambda: legacy_app(sink)),
+            ("queued, text", lambda: queued_app(sink, False, 1.0)),
+            ("queued, JSON", lambda: queued_app(sink, True, 1.0)),
+            ("queued, JSON, 10% sampled", lambda: queued_app(sink, True, 0.1)),
+        ]
+        for name, build in setups:
+            per_request = measure(build(), count)
+            stop_logging()
+            print(f"{sink_name:<14} {name:<30} {per_request:>11.1f} {per_request - baseline:>14.1f}")
+        print("-" * 72)
+
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
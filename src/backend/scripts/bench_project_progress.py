@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark the task counts of the active project list by project count
+Compares one task query per project (what the projects page did with
+/api/tasks/by-project/{id}) with the grouped progress query of the project
+lists, on PostgREST (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY) and on the
+direct asyncpg pool (DATABASE_URL):
+
+    DATABASE_URL=postgresql://... python scripts/bench_project_progress.py --projects 10,100,500
+
+For every size synthetic active projects with --tasks-per-project tasks are
+added for the user and removed afterwards. Round trips are the database
+calls recorded in the request trace.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.projects import attach_progress, fetch_projects_with_progress
+from app.change_feed import asyncpg_dsn
+from app.config import get_settings
+from app.database import get_supabase_client
+from app.direct import DirectDatabase
+from app.schemas import PROJECT_WITH_PROGRESS
+from app.tracing import RequestTrace, _current_trace
+
+SEED_SOURCE = "bench_project_progress"
+
+
+async def seed(db: DirectDatabase, user_id: str, projects: int, tasks_per_project: int) -> None:
+    """Insert active projects with tasks, tagged with SEED_SOURCE"""
+    now = datetime.now()
+    async with db.pool.acquire() as connection:
+        ids = await connection.fetch(
+            "INSERT INTO gtd_projects (user_id, project_name, done_status, source_file) "
+            "SELECT $1, 'Bench project ' || i, false, $2 FROM generate_series(1, $3) AS i RETURNING id",
+            user_id, SEED_SOURCE, projects
+        )
+        await connection.executemany(
+            "INSERT INTO gtd_tasks (user_id, project_id, task_name, done_at, last_edited, source_file) "
+            "VALUES ($1, $2, $3, $4, $5, $6)",
+            [
+                (user_id, row["id"], f"Bench task {i}", now - timedelta(days=i) if i % 3 == 0 else None,
+                 now - timedelta(hours=i), SEED_SOURCE)
+                for row in ids
+                for i in range(tasks_per_project)
+            ]
+        )
+
+
+async def unseed(db: DirectDatabase) -> None:
+    """Remove the synthetic rows"""
+    async with db.pool.acquire() as connection:
+        await connection.execute("DELETE FROM gtd_tasks WHERE source_file = $1", SEED_SOURCE)
+        await connection.execute("DELETE FROM gtd_projects WHERE source_file = $1", SEED_SOURCE)
+
+
+def active_projects(supabase, user_id: str):
+    query = supabase.table("gtd_projects").select("*").eq("user_id", user_id)
+    return query.is_("deleted_at", "null").eq("done_status", "false").execute().data
+
+
+def cases(supabase, db: DirectDatabase, user_id: str):
+    """(name, call); each call returns the projects with their counts"""
+    def per_project():
+        projects = active_projects(supabase, user_id)
+        for project in projects:
+            tasks = (
+                supabase.table("gtd_tasks").select("id,done_at")
+                .eq("user_id", user_id).eq("project_id", project["id"]).is_("deleted_at", "null")
+                .execute().data
+            )
+            project["open_tasks"] = sum(1 for task in tasks if task["done_at"] is None)
+            project["done_tasks"] = len(tasks) - project["open_tasks"]
+        return PROJECT_WITH_PROGRESS.map(projects)
+
+    async def per_project_call():
+        return await asyncio.to_thread(per_project)
+
+    async def grouped_postgrest():
+        return await asyncio.to_thread(
+            lambda: PROJECT_WITH_PROGRESS.map(attach_progress(supabase, active_projects(supabase, user_id)))
+        )
+
+    async def grouped_direct():
+        return await fetch_projects_with_progress(
+            db, "active_projects", PROJECT_WITH_PROGRESS, user_id, "done_status", False
+        )
+
+    return [
+        ("per project", per_project_call),
+        ("grouped PostgREST", grouped_postgrest),
+        ("grouped direct", grouped_direct),
+    ]
+
+
+async def measure(call, iterations: int):
+    """Run a call repeatedly; return (median ms, round trips, last result)"""
+    await call()  # warm up connections and statement caches
+    times = []
+    for _ in range(iterations):
+        trace = RequestTrace("GET", "/api/projects/active")
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            projects = await call()
+        finally:
+            times.append((time.perf_counter() - start) * 1000)
+            _current_trace.reset(token)
+    return statistics.median(times), len(trace.queries), projects
+
+
+async def run(args) -> None:
+    settings = get_settings()
+    user_id = args.user_id or settings.gtd.default_user_id
+    supabase = get_supabase_client()
+    db = DirectDatabase(asyncpg_dsn(settings.database_url_asyncpg), settings.direct_queries)
+    if not await db.start():
+        sys.exit("Cannot connect to DATABASE_URL")
+
+    print("⏱️  Active projects with task counts")
+    print(f"user {user_id}, {args.tasks_per_project} tasks per project, {args.iterations} iterations")
+    print("=" * 72)
+    print(f"{'projects':>8}  {'path':<18} {'p50':>10} {'round trips':>12} {'open tasks':>11}")
+
+    try:
+        for size in args.projects:
+            await seed(db, user_id, size, args.tasks_per_project)
+            try:
+                for name, call in cases(supabase, db, user_id):
+                    p50, round_trips, projects = await measure(call, args.iterations)
+                    open_tasks = sum(project["open_tasks"] for project in projects)
+                    print(f"{len(projects):>8}  {name:<18} {p50:>7.1f} ms {round_trips:>12} {open_tasks:>11}")
+            finally:
+                await unseed(db)
+    finally:
+        await db.stop()
+
+
+def main():
+    """Parse arguments and run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user-id", help="user whose projects are read (default: gtd.default_user_id)")
+    parser.add_argument("--projects", default="10,100,500",
+                        type=lambda value: [int(size) for size in value.split(",")],
+                        help="comma separated numbers of synthetic projects")
+    parser.add_argument("--tasks-per-project", type=int, default=10, help="synthetic tasks per project")
+    parser.add_argument("--iterations", type=int, default=5, help="timed runs per path and size")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled row mappers against the former per-endpoint dict loops
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.responses import FastJSONResponse
+from app.schemas import TASK_DETAIL
+
+
+def make_rows(count):
+    """Build rows shaped like a select("*") on gtd_tasks"""
+    return [{
+        "id": i,
+        "user_id": "00000000-0000-0000-0000-000000000001",
+        "notion_export_row": i + 2,
+        "task_name": f"Task {i}" if i % 10 else None,
+        "project_id": i % 50,
+        "project_reference": f"Project {i % 50}",
+        "done_at": None if i % 3 else "2025-06-01T12:00:00",
+        "do_today": i % 7 == 0,
+        "do_this_week": i % 5 == 0,
+        "is_reading": False,
+        "wait_for": False,
+        "postponed": False,
+        "reviewed": i % 2 == 0,
+        "do_on_date": "2025-06-30" if i % 4 == 0 else None,
+        "last_edited": "2025-06-01T08:00:00",
+        "date_of_creation": "2025-01-01T08:00:00",
+        "field_id": 1 + i % 2,
+        "priority": 1 + i % 5,
+        "time_expenditure": None,
+        "url": None,
+        "knowledge_db_entry": None,
+        "source_file": "GTD_Tasks_all.csv",
+        "created_at": "2025-01-01T08:00:00",
+        "updated_at": "2025-06-01T08:00:00",
+        "deleted_at": None
+    } for i in range(count)]
+
+
+def legacy_loop(rows):
+    """Dict-building loop as previously hand-written in get_tasks"""
+    tasks = []
+    for task in rows:
+        tasks.append({
+            "id": task.get("id"),
+            "name": task.get("task_name") or f"Task {task.get('id', 'Unknown')}",
+            "project_id": task.get("project_id"),
+            "field_id": task.get("field_id"),
+            "done_at": task.get("done_at"),
+            "do_today": task.get("do_today", False),
+            "do_this_week": task.get("do_this_week", False),
+            "is_reading": task.get("is_reading", False),
+            "wait_for": task.get("wait_for", False),
+            "postponed": task.get("postponed", False),
+            "reviewed": task.get("reviewed", False),
+            "priority": task.get("priority"),
+            "due_date": task.get("do_on_date"),
+            "last_edited": task.get("last_edited"),
+            "created_at": task.get("created_at"),
+            "updated_at": task.get("updated_at")
+        })
+    return tasks
+
+
+def compiled_mapper(rows):
+    """Compiled TASK_DETAIL mapper"""
+    return TASK_DETAIL.map(rows)
+
+
+def measure(func, rows, repeat):
+    """Return (best map seconds, best map+render seconds, retained bytes)"""
+    best_map = best_total = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        mapped = func(rows)
+        mapped_at = time.perf_counter()
+        FastJSONResponse(mapped)
+        end = time.perf_counter()
+        best_map = min(best_map, mapped_at - start)
+        best_total = min(best_total, end - start)
+
+    tracemalloc.start()
+    mapped = func(rows)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del mapped
+
+    return best_map, best_total, retained
+
+
+def main():
+    """Run benchmark for 1k and 10k rows"""
+    print("⏱️  Row mapper benchmark")
+    print("=" * 72)
+    print(f"{'rows':>7} {'mapper':<10} {'map (ms)':>9} {'map+render (ms)':>16} {'retained (KiB)':>15} {'speedup':>8}")
+
+    for count in (1_000, 10_000):
+        rows = make_rows(count)
+        repeat = 20 if count <= 1_000 else 5
+
+        legacy_map, legacy_total, legacy_mem = measure(legacy_loop, rows, repeat)
+        fast_map, fast_total, fast_mem = measure(compiled_mapper, rows, repeat)
+
+        print(f"{count:>7} {'legacy':<10} {legacy_map * 1000:>9.2f} {legacy_total * 1000:>16.2f} {legacy_mem / 1024:>15.1f} {'':>8}")
+        print(f"{count:>7} {'compiled':<10} {fast_map * 1000:>9.2f} {fast_total * 1000:>16.2f} {fast_mem / 1024:>15.1f} {legacy_map / fast_map:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization of large task list responses
+Compares FastAPI's default path (jsonable_encoder + JSONResponse) with FastJSONResponse
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.responses import FastJSONResponse, orjson
+
+
+def make_tasks(count):
+    """Build task dicts shaped like the get_tasks response"""
+    return [{
+        "id": i,
+        "name": f"Task {i} with a reasonably long descriptive name",
+        "project_id": i % 50,
+        "field_id": 1 + i % 2,
+        "done_at": None if i % 3 else "2025-06-01T12:00:00",
+        "do_today": i % 7 == 0,
+        "do_this_week": i % 5 == 0,
+        "is_reading": False,
+        "wait_for": False,
+        "postponed": False,
+        "reviewed": i % 2 == 0,
+        "priority": 1 + i % 5,
+        "due_date": "2025-06-30" if i % 4 == 0 else None,
+        "created_at": "2025-01-01T08:00:00",
+        "updated_at": "2025-06-01T08:00:00"
+    } for i in range(count)]
+
+
+def default_path(tasks):
+    """FastAPI's default rendering of a returned list"""
+    return JSONResponse(jsonable_encoder(tasks)).body
+
+
+def fast_path(tasks):
+    """Direct rendering with FastJSONResponse"""
+    return FastJSONResponse(tasks).body
+
+
+def measure(func, tasks, repeat):
+    """Return (best seconds per call, peak allocated bytes, body size)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(tasks)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(tasks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak, len(body)
+
+
+def main():
+    """Run benchmark for 1k and 10k rows"""
+    print("⏱️  JSON serialization benchmark")
+    print(f"orjson available: {orjson is not None}")
+    print("=" * 72)
+    print(f"{'rows':>7} {'path':<10} {'time (ms)':>10} {'peak alloc (KiB)':>17} {'body (KiB)':>11} {'speedup':>8}")
+
+    for count in (1_000, 10_000):
+        tasks = make_tasks(count)
+        repeat = 20 if count <= 1_000 else 5
+
+        default_time, default_peak, default_size = measure(default_path, tasks, repeat)
+        fast_time, fast_peak, fast_size = measure(fast_path, tasks, repeat)
+
+        print(f"{count:>7} {'default':<10} {default_time * 1000:>10.2f} {default_peak / 1024:>17.1f} {default_size / 1024:>11.1f} {'':>8}")
+        print(f"{count:>7} {'fast':<10} {fast_time * 1000:>10.2f} {fast_peak / 1024:>17.1f} {fast_size / 1024:>11.1f} {default_time / fast_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
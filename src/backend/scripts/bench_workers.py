@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark requests per second of the production server profile by worker count
+Starts ``gunicorn -c gunicorn.conf.py app.main:app`` with 1, 2, 4 and 8 workers
+and drives it with keep-alive HTTP/1.1 clients from separate processes
+
+    python scripts/bench_workers.py --path /health/live --duration 10
+
+Run it on a machine (or pod) with as many cores as the deployment gets;
+the load generator needs CPU too, so leave it some (--clients).
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def free_port():
+    """Pick an unused local port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def client_loop(port, path, connections, duration):
+    """Send requests over ``connections`` keep-alive connections; return latencies"""
+    request = f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode("latin-1")
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+
+    async def connection():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                writer.write(request)
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+                if not head.startswith(b"HTTP/1.1 200"):
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(connection() for _ in range(connections)))
+    return latencies, errors
+
+
+def client_process(port, path, connections, duration, results):
+    """Load generator process"""
+    results.put(asyncio.run(client_loop(port, path, connections, duration)))
+
+
+def pss_kib(pid):
+    """Proportional set size of a process and its children (shared pages split)"""
+    total = 0
+    pids = [pid]
+    try:
+        children = subprocess.run(["pgrep", "-P", str(pid)], capture_output=True, text=True).stdout.split()
+        pids += [int(child) for child in children]
+    except FileNotFoundError:
+        pass
+    for process in pids:
+        try:
+            for line in Path(f"/proc/{process}/smaps_rollup").read_text().splitlines():
+                if line.startswith("Pss:"):
+                    total += int(line.split()[1])
+        except OSError:
+            return None
+    return total
+
+
+def start_server(workers, port):
+    """Start gunicorn and wait until it answers"""
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers))
+    env.setdefault("CONFIG_FILE", "config.yaml")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", "app.main:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health/live", timeout=1).read()
+            time.sleep(1)  # let all workers finish booting
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"gunicorn with {workers} workers did not start")
+
+
+def run(workers, args):
+    """Benchmark one worker count; return (rps, p50 ms, p99 ms, errors, pss MiB)"""
+    port = free_port()
+    server = start_server(workers, port)
+    try:
+        results = multiprocessing.Queue()
+        per_client = max(1, args.connections // args.clients)
+        clients = [
+            multiprocessing.Process(target=client_process, args=(port, args.path, per_client, args.duration, results))
+            for _ in range(args.clients)
+        ]
+        for client in clients:
+            client.start()
+        latencies, errors = [], 0
+        for _ in clients:
+            client_latencies, client_errors = results.get()
+            latencies += client_latencies
+            errors += client_errors
+        for client in clients:
+            client.join()
+        pss = pss_kib(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    latencies.sort()
+    rps = len(latencies) / args.duration
+    p50 = statistics.median(latencies) * 1000 if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    return rps, p50, p99, errors, pss / 1024 if pss else None
+
+
+def main():
+    """Run the benchmark for each worker count"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default="1,2,4,8", help="comma separated worker counts")
+    parser.add_argument("--path", default="/health/live", help="endpoint to request")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per worker count")
+    parser.add_argument("--connections", type=int, default=64, help="concurrent keep-alive connections")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="load generator processes")
+    args = parser.parse_args()
+
+    print("⏱️  Production server profile benchmark")
+    print(f"GET {args.path}, {args.connections} connections from {args.clients} client processes, "
+          f"{args.duration:.0f}s per run, {os.cpu_count()} CPUs")
+    print("=" * 72)
+    print(f"{'workers':>7} {'req/s':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'errors':>7} {'PSS (MiB)':>10} {'scaling':>8}")
+
+    baseline = None
+    for workers in (int(count) for count in args.workers.split(",")):
+        rps, p50, p99, errors, pss = run(workers, args)
+        baseline = baseline or rps
+        pss_text = f"{pss:.0f}" if pss is not None else "n/a"
+        print(f"{workers:>7} {rps:>10.0f} {p50:>9.1f} {p99:>9.1f} {errors:>7} {pss_text:>10} {rps / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,15 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlalchemy import text, inspect
-from app.database import engine
 from app.config import get_settings
+from app.direct import DirectDatabase
+from app.change_feed import asyncpg_dsn
+
+
+def connect() -> DirectDatabase:
+    """Direct query pool on the configured database URL (not started)"""
+    settings = get_settings()
+    return DirectDatabase(asyncpg_dsn(settings.database_url_asyncpg), settings.direct_queries)
 
 
 async def check_database_status():
@@ -25,50 +31,52 @@ async def check_database_status():
     print(f"Environment: {settings.app.environment}")
     print()
     
+    db = connect()
     try:
-        async with engine.connect() as conn:
-            # Test connection
-            result = await conn.execute(text("SELECT 1"))
-            result.fetchone()
-            print("✓ Database connection: OK")
-            
-            # Check if tables exist
-            inspector = inspect(conn.sync_engine)
-            tables = await conn.run_sync(
-                lambda sync_conn: inspect(sync_conn).get_table_names()
+        if not await db.start():
+            print("❌ Database connection: FAILED")
+            return False
+        await db.fetch("status", "SELECT 1")
+        print("✓ Database connection: OK")
+        
+        # Check if tables exist
+        tables = [
+            row["tablename"] for row in await db.fetch(
+                "status", "SELECT tablename FROM pg_tables WHERE schemaname = current_schema()"
             )
-            
-            expected_tables = ["gtd_users", "gtd_fields", "gtd_projects", "gtd_tasks"]
-            
-            print("\n📊 Table Status:")
-            for table in expected_tables:
-                if table in tables:
-                    # Get row count
-                    count_result = await conn.execute(text(f"SELECT COUNT(*) FROM {table}"))
-                    count = count_result.fetchone()[0]
-                    print(f"  ✓ {table}: {count} rows")
-                else:
-                    print(f"  ❌ {table}: NOT FOUND")
-            
-            # Check for additional tables
-            other_tables = [t for t in tables if t not in expected_tables and not t.startswith('alembic_')]
-            if other_tables:
-                print(f"\n📋 Other tables: {', '.join(other_tables)}")
-            
-            # Check Alembic version
-            if "alembic_version" in tables:
-                version_result = await conn.execute(text("SELECT version_num FROM alembic_version"))
-                version = version_result.fetchone()
-                if version:
-                    print(f"\n🔄 Alembic version: {version[0]}")
-                else:
-                    print("\n🔄 Alembic: No migrations applied")
+        ]
+        
+        expected_tables = ["gtd_users", "gtd_fields", "gtd_projects", "gtd_tasks"]
+        
+        print("\n📊 Table Status:")
+        for table in expected_tables:
+            if table in tables:
+                # Get row count
+                count = (await db.fetchrow("status", f"SELECT COUNT(*) AS count FROM {table}"))["count"]
+                print(f"  ✓ {table}: {count} rows")
             else:
-                print("\n🔄 Alembic: Not initialized")
+                print(f"  ❌ {table}: NOT FOUND")
+        
+        # Check for additional tables
+        other_tables = [t for t in tables if t not in expected_tables and not t.startswith('alembic_')]
+        if other_tables:
+            print(f"\n📋 Other tables: {', '.join(other_tables)}")
+        
+        # Check Alembic version
+        if "alembic_version" in tables:
+            version = await db.fetchrow("status", "SELECT version_num FROM alembic_version")
+            if version:
+                print(f"\n🔄 Alembic version: {version['version_num']}")
+            else:
+                print("\n🔄 Alembic: No migrations applied")
+        else:
+            print("\n🔄 Alembic: Not initialized")
                 
     except Exception as e:
         print(f"❌ Database error: {e}")
         return False
+    finally:
+        await db.stop()
     
     print("\n" + "=" * 40)
     return True
@@ -79,27 +87,30 @@ async def show_sample_data():
     print("\n📋 Sample Data:")
     print("-" * 20)
     
+    db = connect()
     try:
-        async with engine.connect() as conn:
-            tables = ["gtd_users", "gtd_fields", "gtd_projects", "gtd_tasks"]
-            
-            for table in tables:
-                try:
-                    result = await conn.execute(text(f"SELECT * FROM {table} LIMIT 3"))
-                    rows = await result.fetchall()
-                    
-                    if rows:
-                        print(f"\n{table}:")
-                        for i, row in enumerate(rows, 1):
-                            print(f"  {i}. ID: {row[0]}")
-                    else:
-                        print(f"\n{table}: (empty)")
-                        
-                except Exception as e:
-                    print(f"\n{table}: Error - {e}")
+        if not await db.start():
+            return
+        tables = ["gtd_users", "gtd_fields", "gtd_projects", "gtd_tasks"]
+        
+        for table in tables:
+            try:
+                rows = await db.fetch("status", f"SELECT * FROM {table} LIMIT 3")
+                
+                if rows:
+                    print(f"\n{table}:")
+                    for i, row in enumerate(rows, 1):
+                        print(f"  {i}. ID: {next(iter(row.values()))}")
+                else:
+                    print(f"\n{table}: (empty)")
                     
+            except Exception as e:
+                print(f"\n{table}: Error - {e}")
+                
     except Exception as e:
         print(f"Error fetching sample data: {e}")
+    finally:
+        await db.stop()
 
 
 async def main():
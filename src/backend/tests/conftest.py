@@ -0,0 +1,9 @@
+"""
+Shared test setup
+
+The app reads its settings from CONFIG_FILE on first use; the tests run
+against config/test_config.yaml unless the environment names another file.
+"""
+import os
+
+os.environ.setdefault("CONFIG_FILE", "test_config.yaml")
@@ -0,0 +1,147 @@
+"""
+Integration tests for the Postgres LISTEN/NOTIFY change feed
+
+Runs against a real Postgres instance given by TEST_POSTGRES_URL, e.g.
+
+    TEST_POSTGRES_URL=postgresql://postgres@localhost/postgres pytest tests/test_change_feed.py
+
+The tables are created in a throwaway schema, so any scratch database works.
+"""
+import asyncio
+import os
+import uuid
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+asyncpg = pytest.importorskip("asyncpg")
+
+from app.change_feed import ChangeFeedListener
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+TRIGGERS_SQL = Path(__file__).resolve().parents[3] / "sql" / "create_change_notify_triggers.sql"
+SCHEMA = "change_feed_test"
+
+pytestmark = [
+    pytest.mark.asyncio,
+    pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set"),
+]
+
+
+@pytest_asyncio.fixture
+async def db():
+    """Connection with minimal GTD tables and the notify triggers installed"""
+    connection = await asyncpg.connect(POSTGRES_URL)
+    await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+    await connection.execute(f"SET search_path TO {SCHEMA}")
+    await connection.execute("""
+        CREATE TABLE gtd_tasks (
+            id SERIAL PRIMARY KEY,
+            user_id UUID NOT NULL,
+            task_name TEXT,
+            deleted_at TIMESTAMPTZ
+        );
+        CREATE TABLE gtd_projects (
+            id SERIAL PRIMARY KEY,
+            user_id UUID NOT NULL,
+            project_name TEXT,
+            deleted_at TIMESTAMPTZ
+        );
+    """)
+    await connection.execute(TRIGGERS_SQL.read_text())
+
+    yield connection
+
+    await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await connection.close()
+
+
+@pytest_asyncio.fixture
+async def feed():
+    """Started listener whose dispatched changes end up in ``feed.changes``"""
+    listener = ChangeFeedListener(POSTGRES_URL, keepalive_seconds=1, reconnect_min_seconds=0.1)
+    listener.changes = asyncio.Queue()
+    listener.add_handler(listener.changes.put_nowait)
+    listener.start()
+
+    # The initial reset is dispatched once LISTEN is active
+    assert await asyncio.wait_for(listener.changes.get(), 10) is None
+
+    yield listener
+
+    await listener.stop()
+
+
+async def next_change(feed):
+    return await asyncio.wait_for(feed.changes.get(), 5)
+
+
+async def test_task_changes_are_reported(db, feed):
+    user_id = str(uuid.uuid4())
+
+    task_id = await db.fetchval(
+        "INSERT INTO gtd_tasks (user_id, task_name) VALUES ($1, 'Write tests') RETURNING id", user_id
+    )
+    assert await next_change(feed) == {"entity": "task", "id": task_id, "user_id": user_id, "op": "insert"}
+
+    await db.execute("UPDATE gtd_tasks SET task_name = 'Write more tests' WHERE id = $1", task_id)
+    assert (await next_change(feed))["op"] == "update"
+
+    await db.execute("UPDATE gtd_tasks SET deleted_at = now() WHERE id = $1", task_id)
+    assert (await next_change(feed))["op"] == "delete"
+
+    await db.execute("DELETE FROM gtd_tasks WHERE id = $1", task_id)
+    assert (await next_change(feed))["op"] == "delete"
+
+    assert feed.received == 4
+
+
+async def test_project_changes_are_reported(db, feed):
+    user_id = str(uuid.uuid4())
+
+    project_id = await db.fetchval(
+        "INSERT INTO gtd_projects (user_id, project_name) VALUES ($1, 'Garden') RETURNING id", user_id
+    )
+    assert await next_change(feed) == {"entity": "project", "id": project_id, "user_id": user_id, "op": "insert"}
+
+
+async def test_changes_in_a_transaction_arrive_on_commit(db, feed):
+    user_id = str(uuid.uuid4())
+
+    async with db.transaction():
+        await db.execute("INSERT INTO gtd_tasks (user_id, task_name) VALUES ($1, 'A')", user_id)
+        await db.execute("INSERT INTO gtd_tasks (user_id, task_name) VALUES ($1, 'B')", user_id)
+        assert feed.changes.empty()
+
+    assert (await next_change(feed))["op"] == "insert"
+    assert (await next_change(feed))["op"] == "insert"
+
+
+async def test_reconnects_after_connection_loss(db, feed):
+    listener_pid = feed._connection.get_server_pid()
+    await db.execute("SELECT pg_terminate_backend($1)", listener_pid)
+
+    # Reconnecting dispatches a reset, as notifications may have been missed
+    assert await asyncio.wait_for(feed.changes.get(), 10) is None
+    assert feed.reconnects == 1
+    assert feed.connected
+    assert feed._connection.get_server_pid() != listener_pid
+
+    user_id = str(uuid.uuid4())
+    task_id = await db.fetchval(
+        "INSERT INTO gtd_tasks (user_id, task_name) VALUES ($1, 'After reconnect') RETURNING id", user_id
+    )
+    assert (await next_change(feed))["id"] == task_id
+
+
+async def test_malformed_payload_is_ignored(db, feed):
+    await db.execute("SELECT pg_notify('gtd_changes', 'not json')")
+    await db.execute("SELECT pg_notify('gtd_changes', '{\"e\": \"task\"}')")
+
+    user_id = str(uuid.uuid4())
+    await db.execute("INSERT INTO gtd_tasks (user_id, task_name) VALUES ($1, 'Valid')", user_id)
+
+    assert (await next_change(feed))["user_id"] == user_id
+    assert feed.received == 1
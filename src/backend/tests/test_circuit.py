@@ -0,0 +1,95 @@
+"""
+Tests for the circuit breaker and its stale fallback
+"""
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException, Request, Response
+from postgrest.exceptions import APIError
+
+from app.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ResilientReader, is_upstream_failure
+from app.config import CircuitBreakerConfig
+from app.deadlines import DeadlineExceeded
+
+
+def make_request(path="/api/x"):
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+def fail(error):
+    def read():
+        raise error
+    return read
+
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    # After the reset timeout one probe goes through; a failed probe reopens
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["rejected"] == 2
+
+
+@pytest.mark.parametrize("error, upstream", [
+    (httpx.ConnectError("refused"), True),
+    (httpx.ReadTimeout("slow"), True),
+    (APIError({"message": "Bad gateway", "code": 502}), True),
+    (APIError({"message": "Could not connect", "code": "PGRST001"}), True),
+    (APIError({"message": "canceling statement due to statement timeout", "code": "57014"}), True),
+    (APIError({"message": "failed to parse filter", "code": "PGRST100"}), False),
+    (APIError({"message": "column does not exist", "code": "42703"}), False),
+    (DeadlineExceeded("Deadline of /api/x exceeded"), False),
+    (ValueError("bug"), False),
+])
+def test_upstream_failures(error, upstream):
+    assert is_upstream_failure(error) == upstream
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_open_the_circuit():
+    reader = ResilientReader(CircuitBreakerConfig(failure_threshold=1))
+    request = make_request()
+    assert await reader.read(request, Response(), "user-1", lambda: ["fresh"]) == ["fresh"]
+
+    for error in (APIError({"message": "failed to parse filter", "code": "PGRST100"}), DeadlineExceeded("late")):
+        with pytest.raises(type(error)):
+            await reader.read(request, Response(), "user-1", fail(error))
+    assert reader.breaker.state == CLOSED
+    assert reader.stale_served == 0
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_serves_stale_copy():
+    reader = ResilientReader(CircuitBreakerConfig(failure_threshold=1))
+    request = make_request()
+    assert await reader.read(request, Response(), "user-1", lambda: ["fresh"]) == ["fresh"]
+
+    response = Response(headers={"etag": '"abc"'})
+    assert await reader.read(request, response, "user-1", fail(httpx.ConnectError("refused"))) == ["fresh"]
+    assert reader.breaker.state == OPEN
+    assert response.headers["x-data-stale"] == "true"
+    assert response.headers["age"] == "0"
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
+
+    # Views never read before get a 503 with Retry-After
+    with pytest.raises(HTTPException) as error:
+        await reader.read(make_request("/api/y"), Response(), "user-1", lambda: ["fresh"])
+    assert error.value.status_code == 503
+    assert int(error.value.headers["Retry-After"]) >= 1
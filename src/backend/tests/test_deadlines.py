@@ -0,0 +1,90 @@
+"""
+Tests for per-route request deadlines
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from app.config import DeadlineConfig
+from app.deadlines import DeadlineMiddleware, get_current_deadline, install_deadline_hooks
+
+
+def make_client(endpoint, **config):
+    """Client for a single catch-all route behind the middleware; returns (client, middleware)"""
+    app = Starlette(routes=[Route("/api/{path:path}", endpoint)])
+    middleware = DeadlineMiddleware(app, DeadlineConfig(**config))
+    transport = httpx.ASGITransport(app=middleware)
+    return httpx.AsyncClient(transport=transport, base_url="http://test"), middleware
+
+
+@pytest.mark.asyncio
+async def test_slow_handler_gets_504_and_is_cancelled():
+    cancelled = asyncio.Event()
+
+    async def endpoint(request):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return PlainTextResponse("too late")
+
+    client, middleware = make_client(endpoint, routes={"/api/slow": 50}, cancel_grace_ms=100)
+    async with client:
+        started = time.monotonic()
+        response = await client.get("/api/slow")
+        elapsed = time.monotonic() - started
+
+    assert response.status_code == 504
+    assert response.json()["deadline_ms"] == 50
+    assert response.json()["route"] == "/api/slow"
+    assert cancelled.is_set()
+    # Cancelled after the deadline plus the grace period, not before
+    assert 0.15 <= elapsed < 1
+    assert middleware.exceeded == 1
+
+
+@pytest.mark.asyncio
+async def test_outbound_timeout_is_capped_to_remaining_budget():
+    timeouts = []
+
+    def upstream(request):
+        timeouts.append(request.extensions["timeout"])
+        return httpx.Response(200, json=[])
+
+    async def endpoint(request):
+        session = httpx.Client(transport=httpx.MockTransport(upstream), timeout=30)
+        install_deadline_hooks(session)
+        session.get("http://postgrest.test/rest/v1/gtd_tasks")
+        return JSONResponse(get_current_deadline().details())
+
+    client, _ = make_client(endpoint, default_ms=500)
+    async with client:
+        details = (await client.get("/api/tasks")).json()
+
+    assert details["db_calls"] == 1
+    assert details["pending_db_call"] is None
+    assert set(timeouts[0]) == {"connect", "read", "write", "pool"}
+    assert all(0 < timeout <= 0.5 for timeout in timeouts[0].values())
+
+
+@pytest.mark.asyncio
+async def test_route_without_deadline():
+    async def endpoint(request):
+        assert get_current_deadline() is None
+        await asyncio.sleep(0.1)
+        return PlainTextResponse("done")
+
+    client, middleware = make_client(endpoint, default_ms=20, routes={"/api/export": None})
+    assert middleware.budget_for("/api/export/json") is None
+    assert middleware.budget_for("/api/tasks") == 0.02
+    async with client:
+        response = await client.get("/api/export/json")
+
+    assert response.status_code == 200
+    assert response.text == "done"
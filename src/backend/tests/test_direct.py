@@ -0,0 +1,179 @@
+"""
+Integration tests for the direct asyncpg query path
+
+Runs against a real Postgres instance given by TEST_POSTGRES_URL, e.g.
+
+    TEST_POSTGRES_URL=postgresql://postgres@localhost/postgres pytest tests/test_direct.py
+
+The tables are created in a throwaway schema, so any scratch database works.
+"""
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+asyncpg = pytest.importorskip("asyncpg")
+
+from app.api.dashboard import fetch_dashboard_stats
+from app.api.export import fetch_page_direct
+from app.api.projects import fetch_projects_with_progress
+from app.api.weekly_review import TASKS_TO_REVIEW_SQL
+from app.config import DirectQueryConfig
+from app.deadlines import Deadline, DeadlineExceeded, _current_deadline
+from app.direct import DirectDatabase, quote_columns
+from app.schemas import PROJECT_WITH_PROGRESS
+from app.tracing import RequestTrace, _current_trace
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+PROGRESS_SQL = Path(__file__).resolve().parents[3] / "sql" / "create_project_progress_view.sql"
+SCHEMA = "direct_test"
+USER_ID = str(uuid.uuid4())
+
+pytestmark = [
+    pytest.mark.asyncio,
+    pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set"),
+]
+
+
+@pytest_asyncio.fixture
+async def db():
+    """Direct query pool on minimal GTD tables with a few rows of one user"""
+    connection = await asyncpg.connect(POSTGRES_URL)
+    await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+    await connection.execute(f"SET search_path TO {SCHEMA}")
+    await connection.execute("""
+        CREATE TABLE gtd_projects (
+            id SERIAL PRIMARY KEY,
+            user_id UUID NOT NULL,
+            project_name TEXT,
+            done_status BOOLEAN,
+            created_at TIMESTAMP DEFAULT NOW(),
+            updated_at TIMESTAMP DEFAULT NOW(),
+            deleted_at TIMESTAMP
+        );
+        CREATE TABLE gtd_tasks (
+            id SERIAL PRIMARY KEY,
+            user_id UUID NOT NULL,
+            project_id INTEGER,
+            task_name TEXT,
+            done_at TIMESTAMP,
+            do_today BOOLEAN DEFAULT FALSE,
+            do_this_week BOOLEAN DEFAULT FALSE,
+            reviewed BOOLEAN DEFAULT FALSE,
+            do_on_date DATE,
+            last_edited TIMESTAMP,
+            created_at TIMESTAMP DEFAULT NOW(),
+            deleted_at TIMESTAMP
+        );
+    """)
+    now = datetime.now()
+    await connection.executemany(
+        "INSERT INTO gtd_projects (user_id, project_name, done_status, updated_at, deleted_at) VALUES ($1, $2, $3, $4, $5)",
+        [
+            (USER_ID, "Active", False, now, None),
+            (USER_ID, "Done", True, now, None),
+            (USER_ID, "Deleted", False, now, now),
+            (str(uuid.uuid4()), "Other user", False, now, None),
+        ]
+    )
+    await connection.executemany(
+        "INSERT INTO gtd_tasks (user_id, project_id, task_name, done_at, do_today, reviewed, do_on_date, "
+        "last_edited, deleted_at) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)",
+        [
+            (USER_ID, 1, "Overdue", None, True, True, date.today() - timedelta(days=3), now, None),
+            (USER_ID, 1, "Done", now, False, True, None, now, None),
+            (USER_ID, 1, "Unreviewed", None, False, False, None, now, None),
+            (USER_ID, None, "Stale review", None, False, True, None, now - timedelta(days=10), None),
+            (USER_ID, 1, "Deleted", None, True, False, None, None, now),
+        ]
+    )
+    await connection.execute(PROGRESS_SQL.read_text())
+
+    dsn = POSTGRES_URL + ("&" if "?" in POSTGRES_URL else "?") + f"search_path={SCHEMA}"
+    direct = DirectDatabase(dsn, DirectQueryConfig(enabled=True, max_connections=2))
+    assert await direct.start()
+
+    yield direct
+
+    await direct.stop()
+    await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await connection.close()
+
+
+async def test_dashboard_stats(db):
+    stats = await fetch_dashboard_stats(db, USER_ID)
+    assert stats == {
+        "total_projects": 2,
+        "active_projects": 1,
+        "completed_projects": 1,
+        "total_tasks": 4,
+        "pending_tasks": 3,
+        "completed_tasks": 1,
+        "tasks_today": 1,
+        "tasks_this_week": 0,
+        "overdue_tasks": 1,
+        "completion_rate_7d": 20.0,  # deleted tasks count here, as on the PostgREST path
+        "completion_rate_30d": 20.0,
+    }
+
+
+async def test_rows_are_shaped_like_postgrest(db):
+    rows = await db.fetch("tasks_to_review", TASKS_TO_REVIEW_SQL, USER_ID, datetime.now() - timedelta(days=7))
+    assert [row["task_name"] for row in rows] == ["Unreviewed", "Stale review"]
+    row = rows[0]
+    assert row["user_id"] == USER_ID
+    assert isinstance(row["created_at"], str) and "T" in row["created_at"]
+    assert row["done_at"] is None
+
+    overdue = await db.fetchrow("overdue", "SELECT do_on_date FROM gtd_tasks WHERE task_name = 'Overdue'")
+    assert overdue == {"do_on_date": (date.today() - timedelta(days=3)).isoformat()}
+
+
+async def test_export_pages_by_keyset(db):
+    first = await fetch_page_direct(db, "gtd_tasks", USER_ID, 0, 2)
+    second = await fetch_page_direct(db, "gtd_tasks", USER_ID, first[-1]["id"], 2)
+    everything = await fetch_page_direct(db, "gtd_tasks", USER_ID, 0, 10, include_deleted=True)
+    assert [row["task_name"] for row in first + second] == ["Overdue", "Done", "Unreviewed", "Stale review"]
+    assert len(everything) == 5
+
+
+async def test_projects_with_progress(db):
+    projects = await fetch_projects_with_progress(db, "active_projects", PROJECT_WITH_PROGRESS, USER_ID, "done_status", False)
+    assert [(project["name"], project["open_tasks"], project["done_tasks"]) for project in projects] == [("Active", 2, 1)]
+    assert projects[0]["last_activity"] is not None
+
+    # The view of the PostgREST path counts the same
+    mapper = PROJECT_WITH_PROGRESS.project(["name", "done_tasks"])
+    assert await fetch_projects_with_progress(db, "done_projects", mapper, USER_ID, "done_status", True) == [
+        {"name": "Done", "done_tasks": 0}
+    ]
+    assert await db.fetch("progress", "SELECT * FROM gtd_project_progress") == [
+        {"project_id": 1, "open_tasks": 2, "done_tasks": 1, "last_activity": projects[0]["last_activity"]}
+    ]
+
+
+async def test_selected_columns(db):
+    rows = await db.fetch("search_tasks", f"SELECT {quote_columns('id,task_name')} FROM gtd_tasks ORDER BY id LIMIT 1")
+    assert list(rows[0]) == ["id", "task_name"]
+
+
+async def test_queries_are_traced_and_bounded_by_the_deadline(db):
+    trace = RequestTrace("GET", "/api/dashboard/stats")
+    trace_token = _current_trace.set(trace)
+    deadline = Deadline("/api/dashboard/stats", 5.0)
+    deadline_token = _current_deadline.set(deadline)
+    try:
+        await fetch_dashboard_stats(db, USER_ID)
+        assert [(query.table, query.operation, query.rows) for query in trace.queries] == [("dashboard_stats", "sql", 1)]
+        assert deadline.db_calls == 1
+
+        deadline.expires_at = deadline.started
+        with pytest.raises(DeadlineExceeded):
+            await fetch_dashboard_stats(db, USER_ID)
+    finally:
+        _current_deadline.reset(deadline_token)
+        _current_trace.reset(trace_token)
@@ -0,0 +1,112 @@
+"""
+Tests for the ETags and conditional GETs of the read endpoints
+
+The endpoints run against a mock PostgREST answering the change marker
+function and every table with empty results.
+"""
+from datetime import date
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from postgrest import SyncPostgrestClient
+
+from app import etag
+from app.api import dashboard
+from app.database import get_db
+from app.etag import etag_matches, make_etag
+
+
+@pytest.fixture
+def stats():
+    """Client for /dashboard/stats; returns (client, state of the mock PostgREST)"""
+    state = SimpleNamespace(marker="3:2025-06-01 10:00:00", function_exists=True, sent=[])
+
+    def handler(request):
+        state.sent.append(request)
+        if request.url.path.endswith("/rpc/gtd_change_marker"):
+            if not state.function_exists:
+                return httpx.Response(404, json={
+                    "code": "PGRST202", "message": "Could not find the function", "details": None, "hint": None
+                })
+            return httpx.Response(200, json=state.marker)
+        return httpx.Response(200, json=[], headers={"Content-Range": "*/0"})
+
+    postgrest = SyncPostgrestClient(
+        "http://postgrest.test",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler), base_url="http://postgrest.test")
+    )
+    app = FastAPI()
+    app.include_router(dashboard.router)
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(table=postgrest.from_, rpc=postgrest.rpc)
+    return TestClient(app), state
+
+
+def test_etag_matches():
+    current = make_etag("tasks:today", "user-1", "3:2025-06-01")
+    assert etag_matches(current, current)
+    assert etag_matches(f'"other", W/{current}', current)
+    assert etag_matches("*", current)
+    assert not etag_matches('"other"', current)
+    assert not etag_matches(None, current)
+
+
+def test_if_none_match(stats):
+    client, state = stats
+    response = client.get("/dashboard/stats")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, no-cache"
+    current = response.headers["etag"]
+
+    for if_none_match in (current, f"W/{current}", "*"):
+        response = client.get("/dashboard/stats", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.headers["etag"] == current
+        assert response.content == b""
+
+    assert client.get("/dashboard/stats", headers={"If-None-Match": '"other"'}).status_code == 200
+
+    # A write changes the marker, the client copy is outdated
+    state.marker = "4:2025-06-01 10:05:00"
+    response = client.get("/dashboard/stats", headers={"If-None-Match": current})
+    assert response.status_code == 200
+    assert response.headers["etag"] != current
+
+
+def test_stats_etag_changes_at_midnight(stats, monkeypatch):
+    client, _ = stats
+    monkeypatch.setattr(etag, "date", SimpleNamespace(today=lambda: date(2025, 6, 1)))
+    current = client.get("/dashboard/stats").headers["etag"]
+    assert client.get("/dashboard/stats", headers={"If-None-Match": current}).status_code == 304
+
+    # Overdue and today counts are relative to the date
+    monkeypatch.setattr(etag, "date", SimpleNamespace(today=lambda: date(2025, 6, 2)))
+    response = client.get("/dashboard/stats", headers={"If-None-Match": current})
+    assert response.status_code == 200
+    assert response.headers["etag"] != current
+
+
+def test_marker_function_is_read_with_get(stats):
+    client, state = stats
+    client.get("/dashboard/stats")
+    calls = [request for request in state.sent if request.url.path.endswith("/rpc/gtd_change_marker")]
+    assert [call.method for call in calls] == ["GET", "GET"]
+    assert [call.url.params["p_table"] for call in calls] == ["gtd_tasks", "gtd_projects"]
+    # No exact row counts when the function exists
+    assert not any("count=exact" in request.headers.get("prefer", "") for request in state.sent)
+
+
+def test_rows_are_counted_without_marker_function(stats, monkeypatch):
+    client, state = stats
+    monkeypatch.setattr(etag, "_marker_function_missing", False)
+    state.function_exists = False
+
+    current = client.get("/dashboard/stats").headers["etag"]
+    assert client.get("/dashboard/stats", headers={"If-None-Match": current}).status_code == 304
+
+    # The missing function is asked for once, then the rows are counted
+    calls = [request for request in state.sent if request.url.path.endswith("/rpc/gtd_change_marker")]
+    assert len(calls) == 1
+    assert any("count=exact" in request.headers.get("prefer", "") for request in state.sent)
@@ -0,0 +1,25 @@
+"""
+Tests for the real-time change stream endpoint
+"""
+import pytest
+from fastapi import Request
+
+from app.api.events import stream_changes
+from app.events import get_change_bus
+
+
+@pytest.mark.asyncio
+async def test_subscription_lives_as_long_as_the_body():
+    bus = get_change_bus()
+    before = bus.subscriber_count()
+    request = Request({"type": "http", "method": "GET", "path": "/api/events/stream", "headers": []})
+
+    # A response whose body is never sent does not subscribe
+    await stream_changes(request)
+    assert bus.subscriber_count() == before
+
+    body = (await stream_changes(request)).body_iterator
+    assert (await body.__anext__()).startswith("retry:")
+    assert bus.subscriber_count() == before + 1
+    await body.aclose()
+    assert bus.subscriber_count() == before
@@ -0,0 +1,89 @@
+"""
+Import-time regression tests for the application
+
+Cold start (``import app.main`` in a fresh interpreter) is measured with
+``python -X importtime``. Heavy dependencies must stay lazy, and the total
+must stay within a budget, overridable for slow machines:
+
+    IMPORT_TIME_BUDGET_MS=2500 pytest tests/test_import_time.py
+
+``scripts/bench_import_time.py`` shows where the time goes.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+
+# Imported on first use only (client creation, import runs, tracing export, ...)
+LAZY_MODULES = [
+    "supabase",
+    "postgrest",
+    "supabase_auth",
+    "storage3",
+    "realtime",
+    "pandas",
+    "asyncpg",
+    "redis",
+    "jose",
+    # The OpenTelemetry API is imported by FastAPI itself; the SDK is ours
+    "opentelemetry.sdk",
+    "opentelemetry.exporter",
+]
+
+
+def import_times(module: str = "app.main") -> Dict[str, int]:
+    """
+    Import a module in a fresh interpreter
+
+    Returns:
+        Dict[str, int]: Cumulative import time in microseconds per module
+    """
+    env = dict(os.environ)
+    env.setdefault("CONFIG_FILE", "test_config.yaml")
+    # Cold start: no paths inherited from a parent process
+    env.pop("GTD_CONFIG_PATH", None)
+    env.pop("GTD_DOTENV_PATH", None)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # header line
+    return times
+
+
+def test_heavy_dependencies_are_lazy():
+    """Starting the app must not import clients only needed on first use"""
+    times = import_times()
+    eager = sorted(
+        name for name in times
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    )
+    assert not eager
+
+
+@pytest.mark.skipif(os.getenv("IMPORT_TIME_BUDGET_MS") == "0", reason="budget disabled")
+def test_import_time_within_budget():
+    """``import app.main`` stays within the cold start budget (best of 3)"""
+    best_ms = min(import_times()["app.main"] for _ in range(3)) / 1000
+    assert best_ms <= BUDGET_MS, f"import app.main took {best_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)"
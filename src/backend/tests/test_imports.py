@@ -0,0 +1,163 @@
+"""
+Tests for the streaming task import
+"""
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.imports import ImportJob, ImportJobRegistry, iter_records, iter_text_lines, run_import
+from app.events import ChangeBus
+from app.task_rows import TaskRowTransformer
+
+# src/, holding the command line ETL (absent in the backend image)
+ETL_DIR = Path(__file__).resolve().parents[2]
+
+
+def chunked(data: bytes, size: int):
+    """next_chunk function returning the data in chunks of a fixed size"""
+    chunks = iter([data[i:i + size] for i in range(0, len(data), size)])
+    return lambda: next(chunks, None)
+
+
+def test_csv_with_bom_and_multi_line_fields():
+    body = '\ufeffTask name,Notes\r\nBuy milk,"two\nlines, with comma"\r\nCafé,\r\n'.encode("utf-8")
+    # Two byte chunks split the BOM and the é
+    records = list(iter_records(iter_text_lines(chunked(body, 2)), "csv"))
+    assert records == [
+        (2, {"Task name": "Buy milk", "Notes": "two\nlines, with comma"}, None),
+        (3, {"Task name": "Café", "Notes": ""}, None),
+    ]
+
+
+def test_ndjson_reports_bad_rows():
+    body = b'{"Task name": "A"}\n\nnot json\n[1, 2]\n{"Task name": "B"}'
+    records = list(iter_records(iter_text_lines(chunked(body, 5)), "ndjson"))
+    assert [(row, record) for row, record, _ in records] == [
+        (1, {"Task name": "A"}), (3, None), (4, None), (5, {"Task name": "B"}),
+    ]
+    assert records[1][2].startswith("Invalid JSON")
+    assert records[2][2] == "Expected a JSON object"
+
+
+class FakeTable:
+    """Insert target rejecting batches containing a bad row, and the bad row itself"""
+
+    def __init__(self):
+        self.inserted = []
+        self._pending = None
+
+    def insert(self, rows):
+        self._pending = rows
+        return self
+
+    def execute(self):
+        rows = self._pending if isinstance(self._pending, list) else [self._pending]
+        if any(row["task_name"] == "bad" for row in rows):
+            raise ValueError("violates check constraint")
+        self.inserted.extend(rows)
+
+
+def test_failed_batch_is_retried_row_by_row():
+    table = FakeTable()
+    etl = SimpleNamespace(
+        tasks_table="gtd_tasks",
+        supabase=SimpleNamespace(table=lambda name: table),
+        transform_task_row=lambda record, row, source: {"task_name": record["Task name"]},
+    )
+    job = ImportJob("job-1", "user-1", "csv", dry_run=False)
+    body = b"Task name\nA\nbad\nB\nC\n"
+
+    run_import(job, etl, iter_text_lines(chunked(body, 1024)), "upload.csv", batch_size=3)
+
+    assert [row["task_name"] for row in table.inserted] == ["A", "B", "C"]
+    assert (job.rows, job.inserted, job.failed, job.batches) == (4, 3, 1, 2)
+    assert job.errors == [{"row": 3, "error": "violates check constraint"}]
+
+
+def test_job_ids_are_scoped_per_user():
+    registry = ImportJobRegistry()
+    mine = registry.create("upload-0001", "user-1", "csv", False)
+    theirs = registry.create("upload-0001", "user-2", "csv", False)
+
+    assert registry.get("user-1", "upload-0001") is mine
+    assert registry.get("user-2", "upload-0001") is theirs
+    assert registry.get("user-3", "upload-0001") is None
+
+    with pytest.raises(HTTPException) as error:
+        registry.create("upload-0001", "user-1", "csv", False)
+    assert error.value.status_code == 409
+
+    # Finishing and restarting one user's job leaves the other's alone
+    mine.finish("completed")
+    again = registry.create("upload-0001", "user-1", "csv", False)
+    assert registry.get("user-1", "upload-0001") is again
+    assert registry.get("user-2", "upload-0001") is theirs
+
+
+class FakeLookups:
+    """Supabase stand-in answering the field and project lookups"""
+
+    DATA = {
+        "gtd_fields": [{"id": 1, "name": "Private"}, {"id": 2, "name": "Work"}],
+        "gtd_projects": [{"id": 7, "project_name": "Garden", "readings": None}],
+    }
+
+    def table(self, name):
+        result = SimpleNamespace(data=self.DATA[name])
+        query = SimpleNamespace(execute=lambda: result)
+        query.select = query.eq = lambda *args: query
+        return query
+
+
+EXPORT_ROW = {
+    "Task name": " Plant tulips ",
+    "🚀Project": "Garden (https://www.notion.so/abc)",
+    "🟩Done": "Yes",
+    "Last editted": "March 6, 2022 1:46 PM",
+    "Date of creation": "February 28, 2022",
+    "📆Do on date": "2022-03-05",
+    "✨Do today": "No",
+    "👔Field": "Work",
+    "Time expenditure": "",
+}
+
+
+def test_transform_task_row():
+    record = TaskRowTransformer("user-1", FakeLookups()).transform_task_row(EXPORT_ROW, 2, "upload.csv")
+
+    assert record["task_name"] == "Plant tulips"
+    assert (record["project_id"], record["project_reference"]) == (7, "Garden")
+    assert record["done_at"] == "2022-03-06T13:46:00"
+    assert record["do_on_date"] == "2022-03-05"
+    assert (record["do_today"], record["field_id"], record["time_expenditure"]) == (False, 2, None)
+
+    empty = TaskRowTransformer("user-1", FakeLookups()).transform_task_row({"Task name": None}, 3, "x")
+    assert (empty["task_name"], empty["done_at"], empty["project_id"]) == ("Task_3", None, None)
+
+
+def test_transform_matches_command_line_etl(monkeypatch):
+    pytest.importorskip("pandas")
+    monkeypatch.syspath_prepend(str(ETL_DIR))
+    etl_tasks = pytest.importorskip("etl_tasks")
+
+    etl = etl_tasks.GTDTasksETL(user_id="user-1", supabase=FakeLookups())
+    transformer = TaskRowTransformer("user-1", FakeLookups())
+    for row in (EXPORT_ROW, {"Task name": "Bare"}, {**EXPORT_ROW, "🟩Done": "No", "👔Field": "Private"}):
+        assert transformer.transform_task_row(row, 5, "f.csv") == etl.transform_task_row(row, 5, "f.csv")
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_resyncs_only_the_importing_user():
+    bus = ChangeBus()
+    changes = []
+    bus.add_listener(changes.append)
+    mine = bus.subscribe("user-1", max_pending=10)
+    theirs = bus.subscribe("user-2", max_pending=10)
+
+    bus.resync_user("user-1", "task")
+
+    assert changes == [{"entity": "task", "id": None, "op": "bulk", "user_id": "user-1"}]
+    assert await mine.next_batch(0, timeout=0.1) == {"resync": True, "changes": []}
+    assert await theirs.next_batch(0, timeout=0.05) is None
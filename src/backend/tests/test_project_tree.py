@@ -0,0 +1,152 @@
+"""
+Tests for the project hierarchy
+
+The endpoint tests run against a mock PostgREST. The closure table test
+needs a real Postgres instance, e.g.
+
+    TEST_POSTGRES_URL=postgresql://postgres@localhost/postgres pytest tests/test_project_tree.py
+"""
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from postgrest import SyncPostgrestClient
+
+from app.api import projects
+from app.database import get_db
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+HIERARCHY_SQL = Path(__file__).resolve().parents[3] / "sql" / "create_project_hierarchy.sql"
+SCHEMA = "project_tree_test"
+
+# 1 ─┬─ 2 ── 3
+#    └─ 4 (deleted) ── 5
+CLOSURE = [(1, 1, 0), (1, 2, 1), (1, 3, 2), (1, 4, 1), (1, 5, 2), (2, 2, 0), (2, 3, 1)]
+PROJECTS = [
+    {"id": 1, "project_name": "Root", "parent_project_id": None},
+    {"id": 2, "project_name": "Child", "parent_project_id": 1},
+    {"id": 3, "project_name": "Grandchild", "parent_project_id": 2},
+    {"id": 5, "project_name": "Below deleted", "parent_project_id": 4},
+]
+PROGRESS = [
+    {"project_id": 1, "open_tasks": 1, "done_tasks": 0, "last_activity": None},
+    {"project_id": 3, "open_tasks": 2, "done_tasks": 5, "last_activity": None},
+    {"project_id": 5, "open_tasks": 7, "done_tasks": 7, "last_activity": None},
+]
+
+
+def select(rows, params, key):
+    """Rows whose key matches an ``eq.`` or ``in.(...)`` filter"""
+    values = {int(value) for value in params[key].partition(".")[2].strip("()").split(",")}
+    return [row for row in rows if row[key] in values]
+
+
+@pytest.fixture
+def client():
+    """Client for the projects router on a mock PostgREST; returns (client, requests sent)"""
+    sent = []
+
+    def handler(request):
+        params = request.url.params
+        sent.append((request.url.path.rsplit("/", 1)[-1], params))
+        if request.url.path.endswith("/gtd_project_closure"):
+            closure = [{"ancestor_id": a, "descendant_id": d, "depth": depth} for a, d, depth in CLOSURE]
+            return httpx.Response(200, json=select(closure, params, "ancestor_id"))
+        if request.url.path.endswith("/gtd_projects"):
+            return httpx.Response(200, json=select(PROJECTS, params, "id"))
+        if request.url.path.endswith("/gtd_project_progress"):
+            return httpx.Response(200, json=select(PROGRESS, params, "project_id"))
+        return httpx.Response(200, json=[{"id": 10, "task_name": "Task"}])
+
+    postgrest = SyncPostgrestClient(
+        "http://postgrest.test",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler), base_url="http://postgrest.test")
+    )
+    app = FastAPI()
+    app.include_router(projects.router)
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(table=postgrest.from_)
+    return TestClient(app), sent
+
+
+def test_tree_rolls_up_task_counts(client):
+    client, sent = client
+    fields = "id,parent_project_id,depth,open_tasks,subtree_open_tasks,subtree_done_tasks"
+    tree = client.get("/projects/1/tree", params={"fields": fields}).json()
+
+    # Project 5 hangs below the deleted project 4 and is left out with it
+    assert tree == [
+        {"id": 1, "parent_project_id": None, "depth": 0, "open_tasks": 1, "subtree_open_tasks": 3, "subtree_done_tasks": 5},
+        {"id": 2, "parent_project_id": 1, "depth": 1, "open_tasks": 0, "subtree_open_tasks": 2, "subtree_done_tasks": 5},
+        {"id": 3, "parent_project_id": 2, "depth": 2, "open_tasks": 2, "subtree_open_tasks": 2, "subtree_done_tasks": 5},
+    ]
+    assert [table for table, _ in sent] == ["gtd_project_closure", "gtd_projects", "gtd_project_progress"]
+    assert sent[1][1]["deleted_at"] == "is.null"
+
+
+def test_tree_tasks(client):
+    client, sent = client
+    response = client.get("/projects/2/tree/tasks", params={"sort": "-created_at"})
+    assert [task["name"] for task in response.json()] == ["Task"]
+    table, params = sent[-1]
+    assert table == "gtd_tasks"
+    assert params["project_id"] == "in.(2,3)"
+    assert params["done_at"] == "is.null"
+    assert params["order"] == "created_at.desc.nullslast,id.asc"
+
+
+def test_unknown_project_is_404(client):
+    client, sent = client
+    assert client.get("/projects/99/tree").status_code == 404
+    assert client.get("/projects/99/tree/tasks").status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+async def test_closure_table_follows_parent_ids():
+    asyncpg = pytest.importorskip("asyncpg")
+    connection = await asyncpg.connect(POSTGRES_URL)
+
+    async def closure():
+        rows = await connection.fetch("SELECT ancestor_id, descendant_id, depth FROM gtd_project_closure ORDER BY 1, 2")
+        return [tuple(row) for row in rows]
+
+    try:
+        await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+        await connection.execute(f"SET search_path TO {SCHEMA}")
+        await connection.execute("""
+            CREATE TABLE gtd_projects (
+                id SERIAL PRIMARY KEY,
+                project_name TEXT,
+                deleted_at TIMESTAMP
+            );
+            INSERT INTO gtd_projects (project_name) VALUES ('A'), ('B');
+        """)
+        await connection.execute(HIERARCHY_SQL.read_text())
+        assert await closure() == [(1, 1, 0), (2, 2, 0)]
+
+        # Inserting below a parent, moving a subtree
+        await connection.execute("""
+            INSERT INTO gtd_projects (project_name, parent_project_id) VALUES ('C', 1), ('D', 3);
+            UPDATE gtd_projects SET parent_project_id = 2 WHERE id = 3;
+        """)
+        expected = [(1, 1, 0), (2, 2, 0), (2, 3, 1), (2, 4, 2), (3, 3, 0), (3, 4, 1), (4, 4, 0)]
+        assert await closure() == expected
+
+        with pytest.raises(asyncpg.RaiseError):
+            await connection.execute("UPDATE gtd_projects SET parent_project_id = 4 WHERE id = 2")
+
+        # The backfill rebuilds the same table from the parent IDs
+        await connection.execute(HIERARCHY_SQL.read_text())
+        assert await closure() == expected
+
+        # Deleting a project detaches its subtree
+        await connection.execute("DELETE FROM gtd_projects WHERE id = 3")
+        assert await closure() == [(1, 1, 0), (2, 2, 0), (4, 4, 0)]
+    finally:
+        await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await connection.close()
@@ -0,0 +1,122 @@
+"""
+Tests for per-user admission control with token buckets
+"""
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app.config import RateBudgetConfig, RateLimitConfig
+from app.ratelimit import MemoryBucketStore, RateLimitMiddleware
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_bucket_burst_and_refill():
+    clock = FakeClock()
+    store = MemoryBucketStore(clock=clock)
+
+    assert [(await store.acquire("a", rate=2, burst=3))[0] for _ in range(4)] == [True, True, True, False]
+    assert await store.acquire("a", rate=2, burst=3) == (False, 0.5)
+
+    # Half a second refills one token, never more than the burst
+    clock.now += 0.5
+    assert (await store.acquire("a", rate=2, burst=3))[0]
+    assert not (await store.acquire("a", rate=2, burst=3))[0]
+    clock.now += 60
+    assert [(await store.acquire("a", rate=2, burst=3))[0] for _ in range(4)] == [True, True, True, False]
+
+    # Other keys have their own bucket
+    assert (await store.acquire("b", rate=2, burst=3))[0]
+
+
+def make_client(release=None, address="10.0.0.1", **config):
+    """Client for a rate limited app on a fake clock; returns (client, middleware, clock)"""
+    async def endpoint(request):
+        if release is not None:
+            await release.wait()
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/api/{path:path}", endpoint)])
+    middleware = RateLimitMiddleware(app, RateLimitConfig(**config))
+    clock = FakeClock()
+    middleware.store = MemoryBucketStore(clock=clock)
+    transport = httpx.ASGITransport(app=middleware, client=(address, 1234))
+    return httpx.AsyncClient(transport=transport, base_url="http://test"), middleware, clock
+
+
+@pytest.mark.asyncio
+async def test_rejection_has_retry_after():
+    client, middleware, clock = make_client(read=RateBudgetConfig(rate=0.5, burst=2))
+    async with client:
+        assert [(await client.get("/api/tasks")).status_code for _ in range(3)] == [200, 200, 429]
+        response = await client.get("/api/tasks")
+        assert response.headers["retry-after"] == "2"
+        assert response.json()["budget"] == "read"
+        assert middleware.rejected == {"read": 2}
+
+        clock.now += 2
+        assert (await client.get("/api/tasks")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_callers_without_authentication_have_own_buckets():
+    # Authentication is off in the test config: every request acts as the default user
+    first, middleware, _ = make_client(read=RateBudgetConfig(rate=1, burst=1))
+    second = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=middleware, client=("10.0.0.2", 1234)), base_url="http://test"
+    )
+    async with first, second:
+        assert (await first.get("/api/tasks")).status_code == 200
+        assert (await first.get("/api/tasks")).status_code == 429
+        assert (await second.get("/api/tasks")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_forwarded_clients_behind_trusted_proxy_have_own_buckets():
+    _, middleware, _ = make_client(read=RateBudgetConfig(rate=1, burst=1))
+    # What the production workers put in front of the app (proxy_headers)
+    app = ProxyHeadersMiddleware(middleware, trusted_hosts="10.0.0.0/8")
+
+    async def get(proxy, forwarded_for):
+        transport = httpx.ASGITransport(app=app, client=(proxy, 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/tasks", headers={"X-Forwarded-For": forwarded_for})
+        return response.status_code
+
+    assert await get("10.1.2.3", "203.0.113.7") == 200
+    assert await get("10.1.2.3", "198.51.100.9") == 200
+    assert await get("10.1.2.3", "203.0.113.7") == 429
+    # Untrusted peers cannot pick their bucket
+    assert await get("192.0.2.1", "198.51.100.10") == 200
+    assert await get("192.0.2.1", "198.51.100.11") == 429
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_of_expensive_requests():
+    release = asyncio.Event()
+    client, middleware, _ = make_client(
+        release, expensive=RateBudgetConfig(rate=100, burst=100, max_concurrent=2)
+    )
+    async with client:
+        running = [asyncio.ensure_future(client.get("/api/export")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        response = await client.get("/api/export")
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "1"
+        release.set()
+        assert [response.status_code for response in await asyncio.gather(*running)] == [200, 200]
+        assert (await client.get("/api/export")).status_code == 200
+        assert middleware.rejected == {"expensive": 1}
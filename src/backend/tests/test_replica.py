@@ -0,0 +1,262 @@
+"""
+Tests for read replica routing with read-your-writes consistency
+
+The routing tests run against mock transports. The replication test needs a
+primary and a streaming replica of it, e.g.
+
+    TEST_POSTGRES_URL=postgresql://postgres@localhost:5432/postgres \
+    TEST_REPLICA_POSTGRES_URL=postgresql://postgres@localhost:5433/postgres \
+    pytest tests/test_replica.py
+"""
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from fastapi import HTTPException, Request, Response
+
+from app.circuit import OPEN, ResilientReader
+from app.config import CircuitBreakerConfig, ReplicaConfig
+from app.replica import (
+    ConsistencyMiddleware,
+    ConsistencyState,
+    ReplicaRouter,
+    ReplicaRoutingTransport,
+    _current_consistency,
+    primary_reads,
+)
+from app.singleflight import SingleFlight
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+REPLICA_POSTGRES_URL = os.getenv("TEST_REPLICA_POSTGRES_URL")
+LAG_SQL = Path(__file__).resolve().parents[3] / "sql" / "create_replication_lag_function.sql"
+SCHEMA = "replica_test"
+
+
+def make_router(lag=0.0, **overrides):
+    """Router with a measured lag (None: never measured)"""
+    config = ReplicaConfig(enabled=True, margin_seconds=0.05, **overrides)
+    router = ReplicaRouter(config, "http://replica.test")
+    if lag is not None:
+        router.lag = lag
+        router.lag_measured_at = time.monotonic()
+    return router
+
+
+def make_session(router, replica_status=200):
+    """httpx client against a mock primary/replica pair; returns (client, hosts seen)"""
+    hosts = []
+
+    def handler(request):
+        hosts.append(request.url.host)
+        if request.url.host == "replica.test":
+            return httpx.Response(replica_status, json=[])
+        return httpx.Response(201 if request.method == "POST" else 200, json=[])
+
+    transport = ReplicaRoutingTransport(httpx.MockTransport(handler), router)
+    return httpx.Client(transport=transport, base_url="http://primary.test"), hosts
+
+
+def test_reads_without_writes_use_replica():
+    router = make_router()
+    session, hosts = make_session(router)
+    session.get("/rest/v1/gtd_tasks")
+    session.head("/rest/v1/gtd_tasks")
+    assert hosts == ["replica.test", "replica.test"]
+
+
+def test_read_after_write_uses_primary_until_replayed():
+    router = make_router(lag=0.2)
+    session, hosts = make_session(router)
+    state = ConsistencyState("user-1")
+    token = _current_consistency.set(state)
+    try:
+        session.post("/rest/v1/gtd_tasks", json={})
+        session.get("/rest/v1/gtd_tasks")
+        assert hosts == ["primary.test", "primary.test"]
+        assert state.wrote_at is not None
+
+        time.sleep(0.3)
+        session.get("/rest/v1/gtd_tasks")
+        assert hosts[-1] == "replica.test"
+    finally:
+        _current_consistency.reset(token)
+
+    # The user's write is remembered for requests without a token
+    assert router.token_for("user-1") == state.wrote_at
+    assert router.token_for("user-2") is None
+
+
+def test_primary_reads_bypass_the_replica():
+    router = make_router()
+    session, hosts = make_session(router)
+    with primary_reads():
+        session.get("/rest/v1/gtd_tasks")
+    session.get("/rest/v1/gtd_tasks")
+    assert hosts == ["primary.test", "replica.test"]
+
+
+@pytest.mark.parametrize("lag, measured_ago", [
+    (None, 0),     # never measured
+    (10.0, 0),     # above max_lag_seconds
+    (0.0, 60),     # measurement outdated
+])
+def test_unusable_replica_reads_from_primary(lag, measured_ago):
+    router = make_router(lag=lag)
+    router.lag_measured_at -= measured_ago
+    session, hosts = make_session(router)
+    session.get("/rest/v1/gtd_tasks")
+    assert hosts == ["primary.test"]
+
+
+def test_replica_error_falls_back_to_primary():
+    router = make_router()
+    session, hosts = make_session(router, replica_status=503)
+    response = session.get("/rest/v1/gtd_tasks")
+    assert response.status_code == 200
+    assert hosts == ["replica.test", "primary.test"]
+
+    # Cooldown: the next read skips the replica
+    session.get("/rest/v1/gtd_tasks")
+    assert hosts[-1] == "primary.test"
+    assert router.stats()["reads"] == {"replica": 0, "primary": 2, "fallback": 1}
+
+
+def test_middleware_issues_and_honours_tokens():
+    router = make_router(lag=0.0)
+
+    async def endpoint(request):
+        state = _current_consistency.get()
+        if request.method == "POST":
+            router.record_write(state)
+        return PlainTextResponse("primary" if not router.use_replica(state) else "replica")
+
+    app = ConsistencyMiddleware(Starlette(routes=[Route("/api/x", endpoint, methods=["GET", "POST"])]), router)
+    client = TestClient(app)
+
+    response = client.post("/api/x")
+    consistency_token = response.headers["x-consistency-token"]
+    assert "gtd_consistency=" in response.headers["set-cookie"]
+
+    # Forget the user's write: only the token ties the next read to the primary
+    router.last_writes.clear()
+    client.cookies.clear()
+    assert client.get("/api/x", headers={"X-Consistency-Token": consistency_token}).text == "primary"
+    client.cookies.set("gtd_consistency", consistency_token)
+    assert client.get("/api/x").text == "primary"
+    client.cookies.clear()
+    assert client.get("/api/x").text == "replica"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_read_after_write_does_not_join_older_read():
+    flight = SingleFlight()
+    key = ("user-1", "/api/x", ())
+    release = asyncio.Event()
+    calls = []
+
+    async def read(label):
+        calls.append(label)
+        await release.wait()
+        return label
+
+    before_write = asyncio.ensure_future(flight.run(key, read, "before"))
+    await asyncio.sleep(0)
+
+    # The user writes, then reads the same view with the write's token
+    token = _current_consistency.set(ConsistencyState("user-1", time.time()))
+    try:
+        after_write = asyncio.ensure_future(flight.run(key, read, "after"))
+        await asyncio.sleep(0)
+    finally:
+        _current_consistency.reset(token)
+    # Requests without a token join the newest read
+    untracked = asyncio.ensure_future(flight.run(key, read, "untracked"))
+    await asyncio.sleep(0)
+
+    release.set()
+    assert await asyncio.gather(before_write, after_write, untracked) == ["before", "after", "after"]
+    assert calls == ["before", "after"]
+    assert flight.inflight() == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_fallback_skips_results_read_before_write():
+    reader = ResilientReader(CircuitBreakerConfig(failure_threshold=1))
+    request = Request({"type": "http", "method": "GET", "path": "/api/x", "query_string": b"", "headers": []})
+
+    def failing_read():
+        raise httpx.ConnectError("upstream down")
+
+    assert await reader.read(request, Response(), "user-1", lambda: "before write") == "before write"
+    written_at = time.time()
+    response = Response()
+    assert await reader.read(request, response, "user-1", failing_read) == "before write"
+    assert response.headers["x-data-stale"] == "true"
+    assert reader.breaker.state == OPEN
+
+    # Requests that must see the write get a 503 instead of the stale copy
+    token = _current_consistency.set(ConsistencyState("user-1", written_at))
+    try:
+        with pytest.raises(HTTPException) as error:
+            await reader.read(request, Response(), "user-1", failing_read)
+    finally:
+        _current_consistency.reset(token)
+    assert error.value.status_code == 503
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not (POSTGRES_URL and REPLICA_POSTGRES_URL), reason="TEST_POSTGRES_URL / TEST_REPLICA_POSTGRES_URL not set")
+async def test_streaming_replica_read_your_writes():
+    asyncpg = pytest.importorskip("asyncpg")
+    primary = await asyncpg.connect(POSTGRES_URL)
+    replica = await asyncpg.connect(REPLICA_POSTGRES_URL)
+    try:
+        await primary.execute(LAG_SQL.read_text())
+        await primary.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await primary.execute(f"CREATE SCHEMA {SCHEMA}; CREATE TABLE {SCHEMA}.items (id INT)")
+
+        async def lag():
+            return await replica.fetchval("SELECT gtd_replication_lag()")
+
+        async def replayed(query):
+            for _ in range(100):
+                if await replica.fetchval(query):
+                    return True
+                await asyncio.sleep(0.1)
+            return False
+
+        assert await replayed(f"SELECT to_regclass('{SCHEMA}.items') IS NOT NULL")
+        assert await primary.fetchval("SELECT gtd_replication_lag()") == 0
+
+        config = ReplicaConfig(enabled=True, margin_seconds=0.1, lag_check_interval_seconds=1)
+        router = ReplicaRouter(config, "http://replica.test", probe=lag)
+        state = ConsistencyState("user-1")
+
+        await replica.execute("SELECT pg_wal_replay_pause()")
+        try:
+            await primary.execute(f"INSERT INTO {SCHEMA}.items VALUES (1)")
+            router.record_write(state)
+            await asyncio.sleep(0.5)  # WAL received, not replayed
+
+            assert await router.check_lag() > 0
+            assert not router.use_replica(state)
+            assert await replica.fetchval(f"SELECT count(*) FROM {SCHEMA}.items") == 0
+        finally:
+            await replica.execute("SELECT pg_wal_replay_resume()")
+
+        assert await replayed(f"SELECT count(*) = 1 FROM {SCHEMA}.items")
+        await asyncio.sleep(config.margin_seconds)
+        assert await router.check_lag() == 0
+        assert router.use_replica(state)
+    finally:
+        await primary.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await primary.close()
+        await replica.close()
@@ -0,0 +1,63 @@
+"""
+Tests for worker sizing of the production server profile
+"""
+import pytest
+
+pytest.importorskip("gunicorn")
+
+from app import server
+from app.server import cgroup_cpu_limit, worker_count
+
+
+def test_cgroup_v2_quota(tmp_path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert cgroup_cpu_limit(tmp_path) == 1.5
+
+
+def test_cgroup_v2_unlimited(tmp_path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert cgroup_cpu_limit(tmp_path) is None
+
+
+def test_cgroup_v1_quota(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("200000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert cgroup_cpu_limit(tmp_path) == 2.0
+
+
+def test_cgroup_v1_unlimited(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert cgroup_cpu_limit(tmp_path) is None
+
+
+def test_no_cgroup(tmp_path):
+    assert cgroup_cpu_limit(tmp_path) is None
+
+
+@pytest.mark.parametrize("cpus, per_core, expected", [
+    (0.5, 1.0, 1),   # fractional quota still gets a worker
+    (1.5, 1.0, 2),
+    (4.0, 1.0, 4),
+    (4.0, 2.0, 8),
+    (32.0, 1.0, 8),  # capped by max_workers
+])
+def test_worker_count_follows_cpus(monkeypatch, cpus, per_core, expected):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr(server, "available_cpus", lambda: cpus)
+    assert worker_count(None, per_core, 8) == expected
+
+
+def test_worker_count_overrides(monkeypatch):
+    monkeypatch.setattr(server, "available_cpus", lambda: 4.0)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert worker_count(3) == 3
+    monkeypatch.setenv("WEB_CONCURRENCY", "5")
+    assert worker_count(3) == 5
+
+
+def test_workers_trust_forwarded_headers():
+    # The trusted proxies come from server.forwarded_allow_ips (gunicorn.conf.py)
+    assert server.ProductionWorker.CONFIG_KWARGS["proxy_headers"]
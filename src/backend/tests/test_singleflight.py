@@ -0,0 +1,89 @@
+"""
+Tests for single-flight coalescing of identical concurrent reads
+"""
+import asyncio
+
+import pytest
+from fastapi import Request
+
+from app.singleflight import SingleFlight, request_key
+
+
+def make_request(query=b"", path="/api/tasks"):
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query, "headers": []})
+
+
+def counting_read():
+    """Coroutine function counting its calls, blocked until released; returns (read, calls, release)"""
+    calls = []
+    release = asyncio.Event()
+
+    async def read(label):
+        calls.append(label)
+        await release.wait()
+        return {"label": label, "call": len(calls)}
+
+    return read, calls, release
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_read():
+    flight = SingleFlight()
+    read, calls, release = counting_read()
+    keys = [request_key(make_request(query), "user-1") for query in (b"a=1&b=2", b"b=2&a=1", b"a=1&b=2")]
+
+    waiting = [asyncio.ensure_future(flight.run(key, read, "shared")) for key in keys]
+    await asyncio.sleep(0)
+    assert flight.inflight() == 1
+    release.set()
+
+    results = await asyncio.gather(*waiting)
+    assert calls == ["shared"]
+    assert results == [{"label": "shared", "call": 1}] * 3
+    assert flight.stats() == {"/api/tasks": {"executed": 1, "coalesced": 2}}
+    assert flight.inflight() == 0
+
+
+@pytest.mark.asyncio
+async def test_different_users_and_queries_do_not_share():
+    flight = SingleFlight()
+    read, calls, release = counting_read()
+    keys = {
+        "user-1": request_key(make_request(b"status=open"), "user-1"),
+        "user-2": request_key(make_request(b"status=open"), "user-2"),
+        "other query": request_key(make_request(b"status=done"), "user-1"),
+    }
+
+    waiting = [asyncio.ensure_future(flight.run(key, read, label)) for label, key in keys.items()]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert [result["label"] for result in await asyncio.gather(*waiting)] == list(keys)
+    assert sorted(calls) == sorted(keys)
+
+
+@pytest.mark.asyncio
+async def test_leader_error_reaches_waiters_only():
+    flight = SingleFlight()
+    key = request_key(make_request(), "user-1")
+    release = asyncio.Event()
+    calls = []
+
+    async def failing():
+        calls.append("failing")
+        await release.wait()
+        raise RuntimeError("upstream error")
+
+    async def succeeding():
+        calls.append("succeeding")
+        return "fresh"
+
+    waiting = [asyncio.ensure_future(flight.run(key, failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiting, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    # The failed read is not cached: the next request reads again
+    assert await flight.run(key, succeeding) == "fresh"
+    assert calls == ["failing", "succeeding"]
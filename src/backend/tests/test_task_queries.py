@@ -0,0 +1,207 @@
+"""
+Tests for the date filters and sort orders of the task and project lists
+
+The filter tests check the PostgREST request sent by the list endpoints
+against a mock transport. The index tests need a real Postgres instance, e.g.
+
+    TEST_POSTGRES_URL=postgresql://postgres@localhost/postgres pytest tests/test_task_queries.py
+"""
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from postgrest import SyncPostgrestClient
+
+from app.api import projects, tasks
+from app.database import get_db
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+INDEX_SQL = Path(__file__).resolve().parents[3] / "sql" / "create_list_query_indexes.sql"
+SCHEMA = "task_query_test"
+
+
+@pytest.fixture
+def requests():
+    """Client for the list routers on a mock PostgREST; returns (client, query params sent)"""
+    sent = []
+
+    def handler(request):
+        sent.append(request.url.params)
+        if request.url.path.endswith("/gtd_projects"):
+            return httpx.Response(200, json=[{"id": 1, "project_name": "With tasks"}, {"id": 2, "project_name": "Empty"}])
+        if request.url.path.endswith("/gtd_project_progress"):
+            return httpx.Response(200, json=[{"project_id": 1, "open_tasks": 2, "done_tasks": 3, "last_activity": "2025-06-01T10:00:00"}])
+        return httpx.Response(200, json=[])
+
+    postgrest = SyncPostgrestClient(
+        "http://postgrest.test",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler), base_url="http://postgrest.test")
+    )
+    app = FastAPI()
+    app.include_router(tasks.router)
+    app.include_router(projects.router)
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(table=postgrest.from_)
+    return TestClient(app), sent
+
+
+def test_due_date_range(requests):
+    client, sent = requests
+    response = client.get("/tasks/", params={"due_after": "2025-05-31", "due_before": "2025-07-01"})
+    assert response.status_code == 200
+    assert sent[0].get_list("do_on_date") == ["gt.2025-05-31", "lt.2025-07-01"]
+
+
+def test_overdue(requests):
+    client, sent = requests
+    today = date.today().isoformat()
+    client.get("/tasks/", params={"overdue": "true"})
+    client.get("/tasks/", params={"overdue": "false"})
+    assert sent[0]["done_at"] == "is.null"
+    assert sent[0]["do_on_date"] == f"lt.{today}"
+    assert sent[1]["or"] == f"(done_at.not.is.null,do_on_date.is.null,do_on_date.gte.{today})"
+
+
+def test_empty_date_range_is_rejected(requests):
+    client, sent = requests
+    response = client.get("/tasks/", params={"due_after": "2025-07-01", "due_before": "2025-07-01"})
+    assert response.status_code == 422
+    assert sent == []
+
+
+def test_sort(requests):
+    client, sent = requests
+    client.get("/tasks/", params={"sort": "priority,-due_date"})
+    client.get("/projects/", params={"sort": "-updated_at"})
+    client.get("/tasks/")
+    assert sent[0]["order"] == "priority.asc.nullslast,do_on_date.desc.nullslast,id.asc"
+    assert sent[1]["order"] == "updated_at.desc.nullslast,id.asc"
+    assert "order" not in sent[2]
+
+
+def test_project_progress_is_one_query_for_all_projects(requests):
+    client, sent = requests
+    projects = client.get("/projects/", params={"fields": "name,open_tasks,done_tasks"}).json()
+    assert projects == [
+        {"name": "With tasks", "open_tasks": 2, "done_tasks": 3},
+        {"name": "Empty", "open_tasks": 0, "done_tasks": 0},
+    ]
+    assert [params["select"] for params in sent] == ["project_name,id", "project_id,open_tasks,done_tasks,last_activity"]
+    assert sent[1]["project_id"] == "in.(1,2)"
+
+    # No counts requested, no second query
+    client.get("/projects/", params={"fields": "name"})
+    assert len(sent) == 3
+
+
+@pytest.mark.parametrize("path, sort", [
+    ("/tasks/", "priority,colour"),
+    ("/tasks/", "priority,-priority"),
+    ("/tasks/", "priority,due_date,created_at,name"),
+    ("/projects/", "priority"),
+])
+def test_invalid_sort_is_rejected(requests, path, sort):
+    client, sent = requests
+    assert client.get(path, params={"sort": sort}).status_code == 422
+    assert sent == []
+
+
+@pytest_asyncio.fixture
+async def connection():
+    """Connection to GTD tables with the list indexes and a few thousand rows"""
+    asyncpg = pytest.importorskip("asyncpg")
+    connection = await asyncpg.connect(POSTGRES_URL)
+    await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+    await connection.execute(f"SET search_path TO {SCHEMA}")
+    await connection.execute("""
+        CREATE TABLE gtd_projects (
+            id SERIAL PRIMARY KEY,
+            user_id UUID NOT NULL,
+            project_name TEXT,
+            created_at TIMESTAMP DEFAULT NOW(),
+            updated_at TIMESTAMP DEFAULT NOW(),
+            deleted_at TIMESTAMP
+        );
+        CREATE TABLE gtd_tasks (
+            id SERIAL PRIMARY KEY,
+            user_id UUID NOT NULL,
+            task_name TEXT,
+            done_at TIMESTAMP,
+            do_on_date DATE,
+            priority INTEGER,
+            last_edited TIMESTAMP,
+            created_at TIMESTAMP DEFAULT NOW(),
+            deleted_at TIMESTAMP
+        );
+        INSERT INTO gtd_projects (user_id, project_name, updated_at)
+        SELECT gen_random_uuid(), 'Project ' || i, now() - i * interval '1 hour'
+        FROM generate_series(1, 5000) AS i;
+        INSERT INTO gtd_tasks (user_id, task_name, done_at, do_on_date, priority, last_edited, created_at)
+        SELECT ('00000000-0000-0000-0000-00000000000' || i % 10)::uuid, 'Task ' || i,
+               CASE WHEN i % 3 = 0 THEN now() END,
+               CASE WHEN i % 4 = 0 THEN current_date + (i % 60 - 30) END,
+               CASE WHEN i % 6 > 0 THEN i % 5 + 1 END,
+               now() - (i % 500) * interval '1 hour',
+               now() - i * interval '1 minute'
+        FROM generate_series(1, 20000) AS i;
+    """)
+    await connection.execute(INDEX_SQL.read_text())
+
+    yield connection
+
+    await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await connection.close()
+
+
+async def explain(connection, query, *args):
+    rows = await connection.fetch(f"EXPLAIN (FORMAT TEXT) {query}", *args)
+    return "\n".join(row[0] for row in rows)
+
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+TASKS = "SELECT * FROM gtd_tasks WHERE user_id = $1 AND deleted_at IS NULL"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+@pytest.mark.parametrize("predicate, index", [
+    ("done_at IS NULL AND do_on_date < $2", "idx_gtd_tasks_open_do_on_date"),
+    ("do_on_date > $2 AND do_on_date < $2 + 7", "idx_gtd_tasks_user_do_on_date"),
+])
+async def test_date_filters_use_partial_indexes(connection, predicate, index):
+    plan = await explain(connection, f"{TASKS} AND {predicate}", USER_ID, date.today() - timedelta(days=10))
+    assert index in plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+@pytest.mark.parametrize("order, index", [
+    ("do_on_date ASC NULLS LAST", "idx_gtd_tasks_user_do_on_date"),
+    ("priority ASC NULLS LAST", "idx_gtd_tasks_user_priority"),
+    ("created_at DESC NULLS LAST", "idx_gtd_tasks_user_created_desc"),
+    ("last_edited DESC NULLS LAST", "idx_gtd_tasks_user_last_edited_desc"),
+])
+async def test_sorted_pages_are_read_off_an_index(connection, order, index):
+    plan = await explain(connection, f"{TASKS} ORDER BY {order}, id ASC LIMIT 20 OFFSET 20", USER_ID)
+    assert index in plan
+    assert "Sort" not in plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+@pytest.mark.parametrize("order, index", [
+    ("project_name ASC NULLS LAST", "idx_gtd_projects_name"),
+    ("updated_at DESC NULLS LAST", "idx_gtd_projects_updated_desc"),
+])
+async def test_sorted_project_pages_are_read_off_an_index(connection, order, index):
+    plan = await explain(
+        connection, f"SELECT * FROM gtd_projects WHERE deleted_at IS NULL ORDER BY {order}, id ASC LIMIT 20"
+    )
+    assert index in plan
+    assert "Sort" not in plan
@@ -5,6 +5,7 @@ Extracts, transforms and loads GTD projects from Notion CSV export into Supabase
 """
 
 import os
+import re
 import sys
 import csv
 import logging
@@ -257,6 +258,105 @@ class GTDProjectsETL:
         
         logger.info(f"Load complete: {success_count} successful, {error_count} failed")
     
+    def parse_relation(self, value: Any) -> List[str]:
+        """
+        Extract the project names from a Notion relation cell
+        
+        Notion exports relations as "Name (https://www.notion.so/...), Other (...)";
+        cells without links are split at commas.
+        """
+        value = self.clean_value(value)
+        if not value:
+            return []
+        
+        names = re.findall(r'\s*,?\s*([^,(][^(]*?)\s*\(https?://[^)]*\)', value)
+        if not names:
+            names = value.split(',')
+        return [name.strip() for name in names if name.strip()]
+    
+    def resolve_parents(self) -> Dict[int, int]:
+        """
+        Resolve the mother project relations of the loaded projects into parent IDs
+        
+        A project's parent is its "Mother project"; projects listed in another
+        project's "Related to GTD_Projects (Mother project)" (the reverse
+        relation) get that project as parent if they have none. Names match
+        project names case-insensitively. Unknown names and links that would
+        create a cycle are skipped with a warning.
+        
+        Returns:
+            Dict[int, int]: Project ID to parent project ID
+        """
+        result = self.supabase.table(self.table_name).select(
+            "id, project_name, mother_project, related_mother_projects"
+        ).eq('user_id', self.user_id).is_('deleted_at', 'null').execute()
+        projects = result.data or []
+        
+        ids_by_name: Dict[str, int] = {}
+        for project in projects:
+            name = (project.get('project_name') or '').strip().lower()
+            if name:
+                ids_by_name.setdefault(name, project['id'])
+        
+        def resolve(name: str, project: Dict[str, Any], relation: str) -> Optional[int]:
+            project_id = ids_by_name.get(name.lower())
+            if project_id is None:
+                logger.warning(f"Unknown {relation} '{name}' of project {project['id']}")
+            return project_id
+        
+        parents: Dict[int, int] = {}
+        for project in projects:
+            mothers = self.parse_relation(project.get('mother_project'))
+            if len(mothers) > 1:
+                logger.warning(f"Project {project['id']} has several mother projects, using '{mothers[0]}'")
+            if mothers:
+                parent_id = resolve(mothers[0], project, "mother project")
+                if parent_id is not None and parent_id != project['id']:
+                    parents[project['id']] = parent_id
+        
+        for project in projects:
+            for name in self.parse_relation(project.get('related_mother_projects')):
+                child_id = resolve(name, project, "subproject")
+                if child_id is not None and child_id != project['id']:
+                    parents.setdefault(child_id, project['id'])
+        
+        # Drop the links that close a cycle
+        for project_id in list(parents):
+            seen = {project_id}
+            ancestor = parents.get(project_id)
+            while ancestor is not None and ancestor not in seen:
+                seen.add(ancestor)
+                ancestor = parents.get(ancestor)
+            if ancestor == project_id:
+                logger.warning(f"Ignoring mother project {parents[project_id]} of project {project_id}: cycle")
+                del parents[project_id]
+        
+        logger.info(f"Resolved mother projects of {len(parents)} of {len(projects)} projects")
+        return parents
+    
+    def load_hierarchy(self, parents: Dict[int, int]) -> None:
+        """
+        Store the resolved parent IDs (one update per parent project)
+        
+        The closure table for subtree queries is maintained by a trigger, see
+        sql/create_project_hierarchy.sql.
+        """
+        children_by_parent: Dict[int, List[int]] = {}
+        for project_id, parent_id in parents.items():
+            children_by_parent.setdefault(parent_id, []).append(project_id)
+        
+        try:
+            for parent_id, children in children_by_parent.items():
+                self.supabase.table(self.table_name).update(
+                    {'parent_project_id': parent_id}
+                ).in_('id', children).execute()
+        except Exception as e:
+            logger.error(f"Error storing parent projects: {e}")
+            logger.error("Please create the hierarchy using sql/create_project_hierarchy.sql")
+            return
+        
+        logger.info(f"Stored parent projects for {len(parents)} projects")
+    
     def run_etl(self, csv_file_path: str, truncate: bool = True, force: bool = False) -> None:
         """Run the complete ETL process"""
         logger.info("Starting GTD Projects ETL process")
@@ -276,6 +376,9 @@ class GTDProjectsETL:
             # Load
             self.load_data(data)
             
+            # Link projects to their mother projects
+            self.load_hierarchy(self.resolve_parents())
+            
             logger.info("ETL process completed successfully")
             
         except Exception as e:
@@ -26,21 +26,33 @@ logger = logging.getLogger(__name__)
 class GTDTasksETL:
     """ETL Pipeline for GTD Tasks from Notion export"""
     
-    def __init__(self, user_id: Optional[str] = None):
-        """Initialize ETL pipeline with Supabase connection"""
+    def __init__(self, user_id: Optional[str] = None, supabase: Optional[Client] = None):
+        """
+        Initialize ETL pipeline with Supabase connection
+        
+        Args:
+            user_id: Owner of the imported tasks (default: DEFAULT_USER_ID)
+            supabase: Existing client to use (e.g. the backend's); created
+                from SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY if omitted
+        """
         load_dotenv()
         
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
         self.user_id = user_id or os.getenv("DEFAULT_USER_ID")
         
-        if not all([self.supabase_url, self.supabase_key, self.user_id]):
-            raise ValueError(
-                "Missing required environment variables: "
-                "SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, DEFAULT_USER_ID"
-            )
-        
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        if supabase is not None:
+            if not self.user_id:
+                raise ValueError("Missing user ID: pass user_id or set DEFAULT_USER_ID")
+            self.supabase: Client = supabase
+        else:
+            if not all([self.supabase_url, self.supabase_key, self.user_id]):
+                raise ValueError(
+                    "Missing required environment variables: "
+                    "SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, DEFAULT_USER_ID"
+                )
+            
+            self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
         self.tasks_table = "gtd_tasks"
         self.projects_table = "gtd_projects"
         self.fields_table = "gtd_fields"
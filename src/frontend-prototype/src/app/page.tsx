@@ -10,6 +10,7 @@ import { WeeklyProjects } from '@/components/gtd/weekly-projects';
 import { InboxItems } from '@/components/gtd/inbox-items';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
+import type { DashboardStats, HomeView, Project, Task } from '@/types';
 import { 
   PlusIcon, 
   ClockIcon,
@@ -19,31 +20,23 @@ import {
 } from '@heroicons/react/24/outline';
 
 export default function HomePage() {
-  // Fetch dashboard data
-  const { data: stats, isLoading: statsLoading } = useQuery({
-    queryKey: ['dashboard', 'stats'],
-    queryFn: () => api.dashboard.getStats(),
+  // Fetch everything the home page shows in one request. The key lives under
+  // 'dashboard' so task/project mutations and change events refresh it.
+  const { data: home, isLoading } = useQuery({
+    queryKey: ['dashboard', 'home'],
+    queryFn: () => api.views.home(),
   });
 
-  const { data: todayTasks, isLoading: todayLoading } = useQuery({
-    queryKey: ['tasks', 'today'],
-    queryFn: () => api.tasks.getToday(),
-  });
-
-  const { data: weeklyProjects, isLoading: weeklyLoading } = useQuery({
-    queryKey: ['projects', 'weekly'],
-    queryFn: () => api.projects.getWeekly(),
-  });
+  // Each part succeeds or fails on its own
+  const result = <T,>(part: keyof HomeView['results']): T | undefined => {
+    const entry = home?.results[part];
+    return entry && entry.status === 200 ? (entry.body as T) : undefined;
+  };
 
-  const { data: inboxTasks, isLoading: inboxLoading } = useQuery({
-    queryKey: ['tasks', 'inbox'],
-    queryFn: () => api.tasks.list({ 
-      limit: 10, 
-      do_today: false, 
-      do_this_week: false, 
-      is_done: false 
-    }),
-  });
+  const stats = result<DashboardStats>('stats');
+  const todayTasks = result<Task[]>('today');
+  const weeklyProjects = result<Project[]>('weekly_projects');
+  const inboxTasks = result<Task[]>('inbox');
 
   return (
     <AppLayout>
@@ -66,27 +59,27 @@ export default function HomePage() {
         <QuickCapture />
 
         {/* Dashboard Overview */}
-        <DashboardOverview stats={stats} isLoading={statsLoading} />
+        <DashboardOverview stats={stats} isLoading={isLoading} />
 
         {/* Main Content Grid */}
         <div className="grid gap-6 lg:grid-cols-3">
           {/* Today's Tasks */}
           <div className="lg:col-span-2">
-            <TodayTasks tasks={todayTasks || []} isLoading={todayLoading} />
+            <TodayTasks tasks={todayTasks || []} isLoading={isLoading} />
           </div>
 
           {/* Sidebar */}
           <div className="space-y-6">
             {/* Inbox */}
             <InboxItems 
-              tasks={inboxTasks?.items || []} 
-              isLoading={inboxLoading} 
+              tasks={inboxTasks || []} 
+              isLoading={isLoading} 
             />
 
             {/* Weekly Projects */}
             <WeeklyProjects 
               projects={weeklyProjects || []} 
-              isLoading={weeklyLoading} 
+              isLoading={isLoading} 
             />
           </div>
         </div>
@@ -102,7 +95,7 @@ export default function HomePage() {
             </CardHeader>
             <CardContent>
               <p className="text-sm text-muted-foreground">
-                {inboxTasks?.total || 0} items to process
+                {inboxTasks?.length || 0} items to process
               </p>
             </CardContent>
           </Card>
@@ -1,7 +1,7 @@
 'use client';
 
 import * as React from 'react';
-import { QueryClient, QueryClientProvider } from '@tanstack/react-query';
+import { QueryClient, QueryClientProvider, useQueryClient } from '@tanstack/react-query';
 import { ReactQueryDevtools } from '@tanstack/react-query-devtools';
 
 const queryClient = new QueryClient({
@@ -23,9 +23,43 @@ const queryClient = new QueryClient({
   },
 });
 
+// Invalidate cached views when the backend pushes task/project changes,
+// instead of polling for them.
+function ChangeStream() {
+  const client = useQueryClient();
+
+  React.useEffect(() => {
+    if (process.env.NEXT_PUBLIC_ENABLE_REALTIME === 'false' || typeof EventSource === 'undefined') {
+      return;
+    }
+
+    const source = new EventSource(`${process.env.NEXT_PUBLIC_API_URL}/api/events/stream`);
+
+    source.addEventListener('changes', (event) => {
+      const changes: { entity: 'task' | 'project' }[] = JSON.parse((event as MessageEvent).data);
+      if (changes.some((change) => change.entity === 'task')) {
+        client.invalidateQueries({ queryKey: ['tasks'] });
+      }
+      if (changes.some((change) => change.entity === 'project')) {
+        client.invalidateQueries({ queryKey: ['projects'] });
+      }
+      client.invalidateQueries({ queryKey: ['dashboard'] });
+    });
+
+    source.addEventListener('resync', () => {
+      client.invalidateQueries();
+    });
+
+    return () => source.close();
+  }, [client]);
+
+  return null;
+}
+
 export function QueryProvider({ children }: { children: React.ReactNode }) {
   return (
     <QueryClientProvider client={queryClient}>
+      <ChangeStream />
       {children}
       <ReactQueryDevtools initialIsOpen={false} />
     </QueryClientProvider>
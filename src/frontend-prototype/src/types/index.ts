@@ -128,6 +128,23 @@ export interface DashboardStats {
   completion_rate_30d: number;
 }
 
+// Batch Types (POST /api/batch, GET /api/views/*)
+export interface BatchResult<T> {
+  status: number;
+  stale?: boolean;  // last known good data, served while the database is unavailable
+  body: T | { detail: unknown };
+}
+
+export interface HomeView {
+  results: {
+    stats: BatchResult<DashboardStats>;
+    today: BatchResult<Task[]>;
+    week: BatchResult<Task[]>;
+    weekly_projects: BatchResult<Project[]>;
+    inbox: BatchResult<Task[]>;
+  };
+}
+
 export interface QuickAddRequest {
   content: string;
   type?: 'task' | 'project';
@@ -106,4 +106,5 @@ python3 -m uvicorn app.main:app \
     --port 8000 \
     --reload \
     --reload-dir app \
-    --log-level info
+    --log-level info \
+    --no-access-log
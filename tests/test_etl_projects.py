@@ -195,7 +195,59 @@ class TestGTDProjectsETL(unittest.TestCase):
         self.assertFalse(result['do_this_week'])
         self.assertEqual(result['project_name'], 'Test Project')
         self.assertEqual(result['source_file'], 'test.csv')
-    
+
+    @patch.dict(os.environ, {'SUPABASE_URL': 'https://test.supabase.co',
+                            'SUPABASE_SERVICE_ROLE_KEY': 'test_key',
+                            'DEFAULT_USER_ID': 'test-user-uuid'})
+    @patch('etl_projects.create_client')
+    @patch('etl_projects.load_dotenv')
+    def test_parse_relation(self, mock_load_dotenv, mock_create_client):
+        """Test extraction of project names from Notion relation cells"""
+        mock_create_client.return_value = self.mock_supabase
+        etl = GTDProjectsETL()
+
+        self.assertEqual(
+            etl.parse_relation('Home (https://www.notion.so/Home-1a2b), Garden, shed (https://www.notion.so/Garden-3c4d)'),
+            ['Home', 'Garden, shed']
+        )
+        self.assertEqual(etl.parse_relation('Home, Garden'), ['Home', 'Garden'])
+        self.assertEqual(etl.parse_relation(''), [])
+        self.assertEqual(etl.parse_relation(None), [])
+
+    @patch.dict(os.environ, {'SUPABASE_URL': 'https://test.supabase.co',
+                            'SUPABASE_SERVICE_ROLE_KEY': 'test_key',
+                            'DEFAULT_USER_ID': 'test-user-uuid'})
+    @patch('etl_projects.create_client')
+    @patch('etl_projects.load_dotenv')
+    def test_resolve_parents(self, mock_load_dotenv, mock_create_client):
+        """Test resolution of mother projects into parent IDs"""
+        mock_create_client.return_value = self.mock_supabase
+        etl = GTDProjectsETL()
+
+        query = self.mock_table.select.return_value.eq.return_value.is_.return_value
+        query.execute.return_value.data = [
+            {'id': 1, 'project_name': 'House', 'mother_project': None,
+             'related_mother_projects': 'Kitchen (https://www.notion.so/Kitchen-1)'},
+            {'id': 2, 'project_name': 'Kitchen', 'mother_project': None, 'related_mother_projects': None},
+            {'id': 3, 'project_name': 'Sink', 'mother_project': 'kitchen', 'related_mother_projects': None},
+            {'id': 4, 'project_name': 'Loop A', 'mother_project': 'Loop B', 'related_mother_projects': None},
+            {'id': 5, 'project_name': 'Loop B', 'mother_project': 'Loop A', 'related_mother_projects': None},
+            {'id': 6, 'project_name': 'Orphan', 'mother_project': 'Unknown', 'related_mother_projects': None},
+        ]
+
+        parents = etl.resolve_parents()
+
+        # Kitchen gets its parent from the reverse relation, one link of the loop is dropped
+        self.assertEqual(parents[2], 1)
+        self.assertEqual(parents[3], 2)
+        self.assertEqual(len([project_id for project_id in (4, 5) if project_id in parents]), 1)
+        self.assertNotIn(6, parents)
+
+        etl.load_hierarchy({2: 1, 3: 2, 7: 2})
+        updates = self.mock_table.update.call_args_list
+        self.assertEqual([call.args[0] for call in updates], [{'parent_project_id': 1}, {'parent_project_id': 2}])
+        self.mock_table.update.return_value.in_.assert_called_with('id', [3, 7])
+
     def create_test_csv(self):
         """Create a test CSV file for testing"""
         test_data = [